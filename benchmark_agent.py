@@ -0,0 +1,284 @@
+"""
+Benchmark Suite for Medicine Reminder Agent
+Measures the agent's main operations at growing schedule sizes
+
+For each size (10^2 to 10^6 reminders by default) this times add, edit,
+delete, trigger check, get_statistics, get_upcoming_reminders,
+export_schedule and import_schedule, and writes throughput, latency
+percentiles and peak memory to a JSON file. Pass --compare with an
+earlier results file to flag regressions (exits with status 1).
+
+Examples:
+    python benchmark_agent.py --sizes 100,1000,10000
+    python benchmark_agent.py --output new.json --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from medicine_reminder_core import MedicineReminderAgent
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+FREQUENCIES = ("daily", "daily", "daily", "weekly", "7_days")
+
+
+def random_time(rng: random.Random) -> str:
+    """Random HH:MM time"""
+    return f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"
+
+
+def write_schedule(filename: str, size: int, rng: random.Random):
+    """Write a synthetic schedule of `size` reminders as a JSON array"""
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("[")
+        for i in range(1, size + 1):
+            record = {
+                'id': i,
+                'medicine_name': f"Medicine {i}",
+                'time': random_time(rng),
+                'message': f"Dawai {i % 500} ka time ho gaya hai",
+                'frequency': FREQUENCIES[i % len(FREQUENCIES)],
+                'active': True,
+                'created_at': created_at,
+            }
+            f.write(("," if i > 1 else "") + json.dumps(record, ensure_ascii=False))
+        f.write("]")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns: List[int]) -> Dict:
+    """Throughput and latency percentiles (microseconds) for timed calls"""
+    values = sorted(latencies_ns)
+    total = sum(values)
+    return {
+        'calls': len(values),
+        'throughput_per_s': len(values) / (total / 1e9) if total else 0.0,
+        'latency_us': {
+            'mean': total / len(values) / 1000 if values else 0.0,
+            'p50': percentile(values, 0.50) / 1000,
+            'p90': percentile(values, 0.90) / 1000,
+            'p99': percentile(values, 0.99) / 1000,
+            'max': values[-1] / 1000 if values else 0.0,
+        },
+    }
+
+
+def time_calls(func: Callable[[int], None], calls: int,
+               setup: Optional[Callable[[int], None]] = None) -> List[int]:
+    """Time `calls` invocations of func(i), running setup(i) untimed first"""
+    latencies = []
+    for i in range(calls):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter_ns()
+        func(i)
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def peak_memory(func: Callable[[int], None]) -> int:
+    """Peak bytes allocated while running func(0) once"""
+    tracemalloc.start()
+    try:
+        func(0)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_size(size: int, ops: int, bulk_ops: int, workdir: str,
+                   seed: int, measure_memory: bool = True) -> Dict:
+    """
+    Run every operation against an agent holding `size` reminders
+
+    Args:
+        size: Number of reminders in the schedule
+        ops: Timed calls for per-reminder operations
+        bulk_ops: Timed calls for whole-schedule operations (export,
+            import, uncached statistics)
+        workdir: Scratch directory for schedule files
+        seed: Random seed, so runs are comparable
+        measure_memory: Also record peak memory per operation (slower)
+
+    Returns:
+        Dictionary with the agent's memory and per-operation results
+    """
+    rng = random.Random(seed)
+    schedule_file = os.path.join(workdir, f"schedule_{size}.json")
+    export_file = os.path.join(workdir, f"export_{size}.json")
+    write_schedule(schedule_file, size, rng)
+
+    # Audio and console output are not part of the benchmark: TTS is
+    # switched off and the agent has no event sinks, so trigger checks
+    # measure the lookup only
+    agent = MedicineReminderAgent(tts_cache=None, sinks=[])
+    agent.generate_tts_batch = lambda reminders, max_workers=None: []
+
+    if measure_memory:
+        tracemalloc.start()
+    load_start = time.perf_counter()
+    agent.import_schedule(schedule_file, stream=True)
+    load_seconds = time.perf_counter() - load_start
+    agent_bytes = tracemalloc.get_traced_memory()[0] if measure_memory else None
+    if measure_memory:
+        tracemalloc.stop()
+
+    ops = min(ops, size)
+    ids = list(range(1, size + 1))
+    rng.shuffle(ids)
+
+    operations = [
+        ('add_reminder', ops, lambda i: agent.add_reminder(
+            "Bench Medicine", random_time(rng), "Bench message"), None),
+        ('edit_reminder', ops, lambda i: agent.edit_reminder(
+            ids[i], reminder_time=random_time(rng)), None),
+        ('check_and_trigger_reminders', ops,
+         lambda i: agent.check_and_trigger_reminders(random_time(rng)), None),
+        ('get_statistics_cached', ops, lambda i: agent.get_statistics(), None),
+        # An untimed edit before each call forces a rebuild
+        ('get_statistics', bulk_ops, lambda i: agent.get_statistics(),
+         lambda i: agent.edit_reminder(ids[i], frequency="daily")),
+        ('get_upcoming_reminders', ops,
+         lambda i: agent.get_upcoming_reminders(hours=1), None),
+        ('export_schedule', bulk_ops, lambda i: agent.export_schedule(export_file), None),
+        ('import_schedule', bulk_ops, lambda i: agent.import_schedule(export_file), None),
+        ('import_schedule_stream', bulk_ops,
+         lambda i: agent.import_schedule(export_file, stream=True), None),
+        ('delete_reminder', ops, lambda i: agent.delete_reminder(ids[i]), None),
+    ]
+
+    results = []
+    for name, calls, func, setup in operations:
+        print(f"   ⏱️  {name} x{calls}", file=sys.stderr)
+        entry = {'operation': name}
+        # The memory pass doubles as a warm-up call
+        if measure_memory and name != 'delete_reminder':
+            entry['peak_memory_bytes'] = peak_memory(func)
+        entry.update(summarize(time_calls(func, calls, setup)))
+        results.append(entry)
+
+    return {
+        'size': size,
+        'load_seconds': load_seconds,
+        'agent_memory_bytes': agent_bytes,
+        'operations': results,
+    }
+
+
+def run_benchmarks(sizes, ops: int = 1000, bulk_ops: int = 3, seed: int = 42,
+                   measure_memory: bool = True) -> Dict:
+    """
+    Benchmark every size and collect the results
+
+    Returns:
+        Results dictionary (the format written by --output)
+    """
+    workdir = tempfile.mkdtemp(prefix="reminder_bench_")
+    runs = []
+    try:
+        for size in sizes:
+            print(f"📊 Benchmarking {size:,} reminders...", file=sys.stderr)
+            runs.append(benchmark_size(size, ops, bulk_ops, workdir, seed, measure_memory))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'ops': ops,
+            'bulk_ops': bulk_ops,
+            'seed': seed,
+        },
+        'runs': runs,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = 1.25) -> List[str]:
+    """
+    Find operations whose median latency grew past threshold x baseline
+
+    Returns:
+        One message per regression
+    """
+    def medians(results):
+        return {(run['size'], op['operation']): op['latency_us']['p50']
+                for run in results['runs'] for op in run['operations']}
+
+    old = medians(baseline)
+    regressions = []
+    for key, p50 in sorted(medians(current).items()):
+        before = old.get(key)
+        if before and p50 > before * threshold:
+            size, operation = key
+            regressions.append(f"{operation} @ {size:,}: p50 {before:.1f}µs -> {p50:.1f}µs "
+                               f"({p50 / before:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the medicine reminder agent")
+    parser.add_argument('--sizes', default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated schedule sizes")
+    parser.add_argument('--ops', type=int, default=1000,
+                        help="Timed calls per per-reminder operation")
+    parser.add_argument('--bulk-ops', type=int, default=3,
+                        help="Timed calls per whole-schedule operation")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip peak memory measurement")
+    parser.add_argument('--output', default="benchmark_results.json")
+    parser.add_argument('--compare', help="Earlier results file to check for regressions")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Allowed p50 slowdown factor for --compare")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run_benchmarks(sizes, args.ops, args.bulk_ops, args.seed, not args.no_memory)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{'Size':>9} {'Operation':<30} {'ops/s':>12} {'p50 µs':>10} {'p99 µs':>10}")
+    print("=" * 75)
+    for run in results['runs']:
+        for op in run['operations']:
+            print(f"{run['size']:>9,} {op['operation']:<30} {op['throughput_per_s']:>12,.0f} "
+                  f"{op['latency_us']['p50']:>10.1f} {op['latency_us']['p99']:>10.1f}")
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print("\n⚠️ Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,7 +19,7 @@ source.include_exts = py,png,jpg,kv,atlas,json
 version = 1.0
 
 # Application requirements (removed pandas due to numpy build issues on Android)
-requirements = python3,kivy,kivymd,gtts,requests
+requirements = python3,kivy,kivymd,gtts,requests,sqlite3
 
 # Main file
 android.entrypoint = org.kivy.android.PythonActivity
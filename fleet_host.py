@@ -0,0 +1,317 @@
+"""
+Medicine Reminder Agent - Fleet Host
+
+Runs many households' reminder agents in one process. A single global
+time index maps each minute-of-day to the tenants with reminders at that
+minute, so one scheduler tick fires due reminders across every household
+and only touches the tenants that are due.
+
+Tenant agents are loaded on demand through a loader callback and
+unloaded again once they have been idle for a while. The global index
+keeps a tenant's minutes while it is unloaded, so its reminders still
+fire (the agent is reloaded just in time).
+"""
+
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from medicine_reminder_core import MedicineReminderAgent, next_fire_time
+
+
+class FleetHost:
+    """
+    Host for many tenants' MedicineReminderAgent instances
+
+    Mutations must go through the host (add_reminder / edit_reminder /
+    delete_reminder, or the tenant() context manager) so that the global
+    time index stays in step with each tenant's schedule.
+    """
+
+    def __init__(self,
+                 loader: Callable[[str], MedicineReminderAgent],
+                 unloader: Optional[Callable[[str, MedicineReminderAgent], None]] = None,
+                 idle_seconds: float = 15 * 60,
+                 max_loaded: Optional[int] = None):
+        """
+        Args:
+            loader: Returns the agent for a tenant id (e.g. backed by that
+                household's SQLiteStore). Pass every agent the same
+                TTSCache so identical messages share audio, and the same
+                event sinks (or sinks=[]) rather than one console each.
+                The agent's clock is replaced with the host clock.
+            unloader: Called with (tenant id, agent) before an agent is
+                dropped from memory, e.g. to close its store
+            idle_seconds: Unload agents not used for this long
+            max_loaded: Upper bound on agents held in memory at once
+        """
+        self._loader = loader
+        self._unloader = unloader
+        self.idle_seconds = idle_seconds
+        self.max_loaded = max_loaded
+        self.clock: Callable[[], datetime] = datetime.now
+
+        # tenant id -> agent, least recently used first
+        self._agents: "OrderedDict[str, MedicineReminderAgent]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        # minute-of-day -> tenants with an active reminder at that minute
+        self._time_index: Dict[int, Set[str]] = {}
+        self._sorted_minutes: List[int] = []
+        self._tenant_minutes: Dict[str, Set[int]] = {}
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._stop_requested = False
+        # End of the range the last tick() covered. Kept by the host, as
+        # tenant agents (and their own marks) come and go with unloading
+        self._last_tick: Optional[datetime] = None
+        # Occurrences older than this are skipped rather than caught up on
+        self.max_catch_up: Optional[timedelta] = timedelta(days=1)
+
+    def __len__(self) -> int:
+        return len(self._tenant_minutes)
+
+    @property
+    def loaded_count(self) -> int:
+        """Number of tenant agents currently held in memory"""
+        return len(self._agents)
+
+    def register_tenant(self, tenant_id: str):
+        """
+        Add a tenant to the global index
+
+        The tenant's agent is loaded once to read its schedule and may be
+        unloaded again when idle.
+        """
+        with self._lock:
+            self._sync(tenant_id, self.agent(tenant_id))
+
+    def remove_tenant(self, tenant_id: str):
+        """Drop a tenant from the index and unload its agent"""
+        with self._lock:
+            for minute in self._tenant_minutes.pop(tenant_id, set()):
+                self._remove_from_minute(minute, tenant_id)
+            if tenant_id in self._agents:
+                self._unload(tenant_id)
+
+    def agent(self, tenant_id: str) -> MedicineReminderAgent:
+        """
+        Get a tenant's agent, loading it if needed
+
+        Use tenant() instead when changing the schedule.
+        """
+        with self._lock:
+            agent = self._agents.get(tenant_id)
+            if agent is None:
+                agent = self._loader(tenant_id)
+                # New reminders are anchored at host time, like the ticks
+                agent.clock = lambda: self.clock()
+                self._agents[tenant_id] = agent
+                if tenant_id not in self._tenant_minutes:
+                    self._sync(tenant_id, agent)
+            else:
+                self._agents.move_to_end(tenant_id)
+            self._last_used[tenant_id] = time.monotonic()
+
+            if self.max_loaded is not None:
+                while len(self._agents) > self.max_loaded:
+                    oldest = next(iter(self._agents))
+                    if oldest == tenant_id:
+                        break
+                    self._unload(oldest)
+            return agent
+
+    @contextmanager
+    def tenant(self, tenant_id: str) -> Iterator[MedicineReminderAgent]:
+        """
+        Context manager for changing a tenant's schedule
+
+        The global time index is updated from the agent on exit.
+        """
+        with self._lock:
+            agent = self.agent(tenant_id)
+            try:
+                yield agent
+            finally:
+                self._sync(tenant_id, agent)
+
+    def add_reminder(self, tenant_id: str, *args, **kwargs):
+        """Add a reminder for a tenant (see MedicineReminderAgent.add_reminder)"""
+        with self.tenant(tenant_id) as agent:
+            return agent.add_reminder(*args, **kwargs)
+
+    def edit_reminder(self, tenant_id: str, *args, **kwargs) -> bool:
+        """Edit a tenant's reminder (see MedicineReminderAgent.edit_reminder)"""
+        with self.tenant(tenant_id) as agent:
+            return agent.edit_reminder(*args, **kwargs)
+
+    def delete_reminder(self, tenant_id: str, reminder_id: int) -> bool:
+        """Delete a tenant's reminder"""
+        with self.tenant(tenant_id) as agent:
+            return agent.delete_reminder(reminder_id)
+
+    def _sync(self, tenant_id: str, agent: MedicineReminderAgent):
+        """Update the global index from a tenant's own trigger index"""
+        new = set(agent.scheduled_minutes())
+        old = self._tenant_minutes.get(tenant_id, set())
+        for minute in old - new:
+            self._remove_from_minute(minute, tenant_id)
+        for minute in new - old:
+            tenants = self._time_index.get(minute)
+            if tenants is None:
+                tenants = self._time_index[minute] = set()
+                bisect.insort(self._sorted_minutes, minute)
+            tenants.add(tenant_id)
+        self._tenant_minutes[tenant_id] = new
+        if new - old:
+            self._wakeup.set()
+
+    def _remove_from_minute(self, minute: int, tenant_id: str):
+        """Remove a tenant from one minute slot of the global index"""
+        tenants = self._time_index.get(minute)
+        if tenants is None:
+            return
+        tenants.discard(tenant_id)
+        if not tenants:
+            del self._time_index[minute]
+            index = bisect.bisect_left(self._sorted_minutes, minute)
+            del self._sorted_minutes[index]
+
+    def _unload(self, tenant_id: str):
+        """Drop a tenant's agent from memory"""
+        agent = self._agents.pop(tenant_id)
+        self._last_used.pop(tenant_id, None)
+        if self._unloader is not None:
+            self._unloader(tenant_id, agent)
+
+    def evict_idle(self) -> int:
+        """
+        Unload agents that have not been used for idle_seconds
+
+        Returns:
+            Number of agents unloaded
+        """
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [t for t in self._agents if self._last_used.get(t, 0) <= cutoff]
+            for tenant_id in idle:
+                self._unload(tenant_id)
+        return len(idle)
+
+    def due_tenants(self, minute_of_day: int) -> Set[str]:
+        """Tenants with an active reminder at the given minute"""
+        with self._lock:
+            return set(self._time_index.get(minute_of_day, ()))
+
+    def next_due(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Get the next time any tenant has a reminder due
+
+        Args:
+            now: Reference time. If None, uses the host clock.
+
+        Returns:
+            Datetime of the next occupied minute (the current minute counts),
+            or None if no tenant has reminders
+        """
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            if not self._sorted_minutes:
+                return None
+            index = bisect.bisect_left(self._sorted_minutes, now.hour * 60 + now.minute)
+            minute = self._sorted_minutes[index % len(self._sorted_minutes)]
+        return next_fire_time(minute, now)
+
+    def tenants_in_range(self, start: datetime, end: datetime) -> Set[str]:
+        """Tenants with an active reminder at a minute in (start, end]"""
+        tenants = set()
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        with self._lock:
+            minutes = self._sorted_minutes
+            while day <= end and minutes:
+                first = 0
+                if day <= start:
+                    first = bisect.bisect_right(minutes, (start - day).total_seconds() / 60)
+                last = bisect.bisect_right(minutes, (end - day).total_seconds() / 60)
+                for minute in minutes[first:last]:
+                    tenants |= self._time_index[minute]
+                day += timedelta(days=1)
+        return tenants
+
+    def tick(self, now: Optional[datetime] = None) -> List[Tuple[str, List[Dict]]]:
+        """
+        Fire every tenant's reminders due since the previous tick
+
+        Each tick covers (previous tick, now], so a tick that runs late
+        still fires the minutes it skipped (up to max_catch_up back) and
+        a second tick in the same minute fires nothing. Recurrence rules
+        are evaluated at the host's times, not the agents' clocks.
+
+        Args:
+            now: Time to check. If None, uses the host clock.
+
+        Returns:
+            List of (tenant id, triggered reminders) for tenants that fired
+        """
+        if now is None:
+            now = self.clock()
+        start = self._last_tick
+        if start is None or now < start:
+            # First tick, or the clock moved back: cover this minute only
+            start = now.replace(second=0, microsecond=0) - timedelta(microseconds=1)
+        if self.max_catch_up is not None:
+            start = max(start, now - self.max_catch_up)
+        self._last_tick = now
+
+        fired = []
+        for tenant_id in sorted(self.tenants_in_range(start, now)):
+            with self.tenant(tenant_id) as agent:
+                triggered = agent.trigger_range(start, now)
+            if triggered:
+                fired.append((tenant_id, triggered))
+        self.evict_idle()
+        return fired
+
+    def run_until(self,
+                  deadline: Optional[datetime] = None,
+                  on_trigger: Optional[Callable[[str, List[Dict]], None]] = None) -> int:
+        """
+        Run the shared scheduler, waking at each occupied minute
+
+        Args:
+            deadline: Stop once this time is reached. If None, runs until
+                stop() is called.
+            on_trigger: Called with (tenant id, triggered reminders)
+
+        Returns:
+            Number of reminders triggered
+        """
+        self._stop_requested = False
+        count = 0
+        while not self._stop_requested:
+            self._wakeup.clear()
+            now = self.clock()
+            minute_start = now.replace(second=0, microsecond=0)
+            for tenant_id, triggered in self.tick(now):
+                count += len(triggered)
+                if on_trigger:
+                    on_trigger(tenant_id, triggered)
+            if self._stop_requested or (deadline is not None and now >= deadline):
+                break
+
+            # Sleep to the next occupied minute after this one
+            wake = self.next_due(minute_start + timedelta(minutes=1))
+            if deadline is not None and (wake is None or deadline < wake):
+                wake = deadline
+            timeout = None if wake is None else max((wake - now).total_seconds(), 0.0)
+            self._wakeup.wait(timeout)
+        return count
+
+    def stop(self):
+        """Ask a running run_until loop to return"""
+        self._stop_requested = True
+        self._wakeup.set()
@@ -1,358 +1,3176 @@
-"""
-Medicine Reminder Agent - Core Module
-A Python-based medicine reminder system for Indian families
-
-This module contains the core MedicineReminderAgent class that can be used
-in both the Kaggle notebook demo and the future mobile app implementation.
-"""
-
-import datetime
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import json
-
-# TTS imports (conditional)
-try:
-    from gtts import gTTS
-    TTS_AVAILABLE = True
-except ImportError:
-    TTS_AVAILABLE = False
-    gTTS = None  # type: ignore
-
-
-class MedicineReminderAgent:
-    """
-    Smart Medicine Reminder Agent for Indian Families
-    
-    Features:
-    - Multilingual reminder support (Hindi, English, mixed)
-    - Custom personalized messages
-    - Voice-based reminders using TTS
-    - Easy schedule management
-    - Export/Import functionality
-    """
-    
-    def __init__(self):
-        """Initialize the reminder agent"""
-        self.reminders: List[Dict] = []
-        self.reminder_id_counter = 1
-        
-    def add_reminder(self, 
-                    medicine_name: str, 
-                    reminder_time: str, 
-                    custom_message: str,
-                    frequency: str = "daily") -> Dict:
-        """
-        Add a new medicine reminder
-        
-        Args:
-            medicine_name: Name of the medicine
-            reminder_time: Time in HH:MM format (24-hour)
-            custom_message: Personalized reminder message in any language
-            frequency: How often (daily, weekly, etc.)
-            
-        Returns:
-            Dictionary containing reminder details
-        """
-        reminder = {
-            'id': self.reminder_id_counter,
-            'medicine_name': medicine_name,
-            'time': reminder_time,
-            'message': custom_message,
-            'frequency': frequency,
-            'active': True,
-            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        self.reminders.append(reminder)
-        self.reminder_id_counter += 1
-        
-        print(f"✅ Reminder added successfully! (ID: {reminder['id']})")
-        return reminder
-    
-    def view_reminders(self) -> List[Dict]:
-        """
-        View all active reminders as a formatted list
-        
-        Returns:
-            List of active reminder dictionaries
-        """
-        if not self.reminders:
-            print("📭 No reminders scheduled yet.")
-            return []
-        
-        active_reminders = [r for r in self.reminders if r['active']]
-        
-        if not active_reminders:
-            print("📭 No active reminders.")
-            return []
-        
-        # Print in table format
-        print("\n" + "="*80)
-        print(f"{'ID':<5} {'Medicine':<20} {'Time':<10} {'Frequency':<12} {'Message':<30}")
-        print("="*80)
-        for r in active_reminders:
-            print(f"{r['id']:<5} {r['medicine_name']:<20} {r['time']:<10} {r['frequency']:<12} {r['message'][:28]:<30}")
-        print("="*80 + "\n")
-        
-        return active_reminders
-    
-    def get_reminder_by_id(self, reminder_id: int) -> Optional[Dict]:
-        """
-        Get a specific reminder by ID
-        
-        Args:
-            reminder_id: ID of the reminder
-            
-        Returns:
-            Reminder dictionary if found, None otherwise
-        """
-        for reminder in self.reminders:
-            if reminder['id'] == reminder_id and reminder['active']:
-                return reminder
-        return None
-    
-    def delete_reminder(self, reminder_id: int) -> bool:
-        """
-        Delete a reminder by ID
-        
-        Args:
-            reminder_id: ID of the reminder to delete
-            
-        Returns:
-            True if deleted, False if not found
-        """
-        for reminder in self.reminders:
-            if reminder['id'] == reminder_id and reminder['active']:
-                reminder['active'] = False
-                print(f"🗑️ Reminder {reminder_id} deleted successfully.")
-                return True
-        
-        print(f"❌ Reminder {reminder_id} not found.")
-        return False
-    
-    def edit_reminder(self, 
-                     reminder_id: int, 
-                     medicine_name: Optional[str] = None,
-                     reminder_time: Optional[str] = None,
-                     custom_message: Optional[str] = None,
-                     frequency: Optional[str] = None) -> bool:
-        """
-        Edit an existing reminder
-        
-        Args:
-            reminder_id: ID of reminder to edit
-            medicine_name: New medicine name (optional)
-            reminder_time: New time (optional)
-            custom_message: New message (optional)
-            frequency: New frequency (optional)
-            
-        Returns:
-            True if edited, False if not found
-        """
-        for reminder in self.reminders:
-            if reminder['id'] == reminder_id and reminder['active']:
-                if medicine_name:
-                    reminder['medicine_name'] = medicine_name
-                if reminder_time:
-                    reminder['time'] = reminder_time
-                if custom_message:
-                    reminder['message'] = custom_message
-                if frequency:
-                    reminder['frequency'] = frequency
-                    
-                print(f"✏️ Reminder {reminder_id} updated successfully.")
-                return True
-        
-        print(f"❌ Reminder {reminder_id} not found.")
-        return False
-    
-    def generate_tts(self, message: str, filename: str = "reminder.mp3") -> Optional[str]:
-        """
-        Generate TTS audio from message
-        
-        Args:
-            message: Text to convert to speech
-            filename: Output audio filename
-            
-        Returns:
-            Filename if successful, None otherwise
-        """
-        if not TTS_AVAILABLE or gTTS is None:
-            print("⚠️ TTS not available. Message would be: " + message)
-            return None
-        
-        try:
-            # Auto-detect language (supports Hindi, English, and mixed)
-            tts = gTTS(text=message, lang='hi', slow=False)  # type: ignore
-            tts.save(filename)
-            print(f"🔊 Audio generated: {filename}")
-            return filename
-        except Exception as e:
-            print(f"⚠️ TTS Error: {e}")
-            return None
-    
-    def check_and_trigger_reminders(self, current_time: Optional[str] = None) -> List[Dict]:
-        """
-        Check if any reminders need to be triggered
-        
-        Args:
-            current_time: Time to check (HH:MM format). If None, uses current time.
-            
-        Returns:
-            List of triggered reminders
-        """
-        if current_time is None:
-            current_time = datetime.now().strftime("%H:%M")
-        
-        triggered = []
-        
-        for reminder in self.reminders:
-            if reminder['active'] and reminder['time'] == current_time:
-                triggered.append(reminder)
-                print(f"\n⏰ REMINDER TRIGGERED at {current_time}")
-                print(f"💊 Medicine: {reminder['medicine_name']}")
-                print(f"📢 Message: {reminder['message']}")
-                print("─" * 50)
-                
-                # Generate TTS
-                self.generate_tts(reminder['message'], f"reminder_{reminder['id']}.mp3")
-        
-        return triggered
-    
-    def simulate_day(self, times_to_check: List[str]):
-        """
-        Simulate checking reminders at multiple times throughout a day
-        
-        Args:
-            times_to_check: List of times in HH:MM format
-        """
-        print("\n🌅 Starting Day Simulation...\n")
-        
-        for check_time in sorted(times_to_check):
-            print(f"\n🕐 Current Time: {check_time}")
-            triggered = self.check_and_trigger_reminders(check_time)
-            
-            if not triggered:
-                print("   No reminders at this time.")
-        
-        print("\n🌙 Day Simulation Complete!\n")
-    
-    def export_schedule(self, filename: str = "medicine_schedule.json"):
-        """
-        Export reminder schedule to JSON file
-        
-        Args:
-            filename: Output JSON filename
-        """
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.reminders, f, ensure_ascii=False, indent=2)
-        print(f"💾 Schedule exported to {filename}")
-    
-    def import_schedule(self, filename: str = "medicine_schedule.json"):
-        """
-        Import reminder schedule from JSON file
-        
-        Args:
-            filename: Input JSON filename
-        """
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                self.reminders = json.load(f)
-            
-            # Update counter to avoid ID conflicts
-            if self.reminders:
-                max_id = max(r['id'] for r in self.reminders)
-                self.reminder_id_counter = max_id + 1
-            
-            print(f"📥 Schedule imported from {filename}")
-        except FileNotFoundError:
-            print(f"❌ File {filename} not found.")
-    
-    def get_statistics(self) -> Dict:
-        """
-        Get statistics about the reminder schedule
-        
-        Returns:
-            Dictionary containing various statistics
-        """
-        active_reminders = [r for r in self.reminders if r['active']]
-        
-        stats = {
-            'total_created': self.reminder_id_counter - 1,
-            'active': len(active_reminders),
-            'deleted': len(self.reminders) - len(active_reminders),
-            'times': {},
-            'medicines': []
-        }
-        
-        # Count reminders per time
-        for reminder in active_reminders:
-            time = reminder['time']
-            stats['times'][time] = stats['times'].get(time, 0) + 1
-            stats['medicines'].append({
-                'name': reminder['medicine_name'],
-                'time': reminder['time']
-            })
-        
-        return stats
-    
-    def get_upcoming_reminders(self, hours: int = 24) -> List[Dict]:
-        """
-        Get reminders scheduled within the next N hours
-        
-        Args:
-            hours: Number of hours to look ahead
-            
-        Returns:
-            List of upcoming reminders sorted by time
-        """
-        current_time = datetime.now()
-        current_hour_min = current_time.strftime("%H:%M")
-        
-        upcoming = []
-        
-        for reminder in self.reminders:
-            if reminder['active']:
-                # For simplicity, just check if time is after current time today
-                if reminder['time'] >= current_hour_min:
-                    upcoming.append(reminder)
-        
-        # Sort by time
-        upcoming.sort(key=lambda x: x['time'])
-        
-        return upcoming
-
-
-# Sample usage demonstration
-if __name__ == "__main__":
-    print("🤖 Medicine Reminder Agent - Core Module")
-    print("=" * 60)
-    
-    # Create agent instance
-    agent = MedicineReminderAgent()
-    
-    # Add sample reminders
-    agent.add_reminder(
-        "Amlodipine (BP)",
-        "08:00",
-        "Are uncle, aapki BP ki dawai ka time ho gaya hai!"
-    )
-    
-    agent.add_reminder(
-        "Metformin (Diabetes)",
-        "08:30",
-        "Good morning! Time for your diabetes medicine."
-    )
-    
-    # View schedule
-    print("\n📅 Current Schedule:")
-    print(agent.view_reminders())
-    
-    # Get statistics
-    stats = agent.get_statistics()
-    print(f"\n📊 Statistics:")
-    print(f"   Active Reminders: {stats['active']}")
-    print(f"   Total Created: {stats['total_created']}")
-    
-    print("\n✅ Module demonstration complete!")
+"""
+Medicine Reminder Agent - Core Module
+A Python-based medicine reminder system for Indian families
+
+This module contains the core MedicineReminderAgent class that can be used
+in both the Kaggle notebook demo and the future mobile app implementation.
+"""
+
+import datetime
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from functools import lru_cache, wraps
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+import bisect
+import heapq
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+
+if TYPE_CHECKING:
+    from reminder_storage import ReminderStore
+
+# TTS engines, imported on first use so that loading this module (and
+# short CLI runs that never speak) stay fast. The *_AVAILABLE flags are
+# None until the first attempt.
+gTTS = None
+TTS_AVAILABLE: Optional[bool] = None
+pyttsx3 = None
+PYTTSX3_AVAILABLE: Optional[bool] = None
+
+
+def _load_gtts():
+    """Import gTTS on first use; returns the class, or None if not installed"""
+    global gTTS, TTS_AVAILABLE
+    if TTS_AVAILABLE is None:
+        try:
+            from gtts import gTTS as gtts_class
+        except ImportError:
+            TTS_AVAILABLE = False
+        else:
+            gTTS = gtts_class
+            TTS_AVAILABLE = True
+    return gTTS if TTS_AVAILABLE else None
+
+
+def tts_available() -> bool:
+    """Check whether online text-to-speech can be used (imports gTTS if needed)"""
+    return _load_gtts() is not None
+
+
+def _load_pyttsx3():
+    """Import pyttsx3 on first use; returns the module, or None if not installed"""
+    global pyttsx3, PYTTSX3_AVAILABLE
+    if PYTTSX3_AVAILABLE is None:
+        try:
+            import pyttsx3 as pyttsx3_module
+        except ImportError:
+            PYTTSX3_AVAILABLE = False
+        else:
+            pyttsx3 = pyttsx3_module
+            PYTTSX3_AVAILABLE = True
+    return pyttsx3 if PYTTSX3_AVAILABLE else None
+
+
+def time_to_minute(value: str) -> Optional[int]:
+    """
+    Convert an HH:MM time string to minute-of-day
+    
+    Args:
+        value: Time in HH:MM format (24-hour)
+        
+    Returns:
+        Minutes since midnight, or None if the time cannot be parsed
+    """
+    try:
+        hours, minutes = value.split(':')
+        minute_of_day = int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    if not 0 <= int(minutes) < 60 or not 0 <= minute_of_day < 24 * 60:
+        return None
+    return minute_of_day
+
+
+def next_fire_time(minute_of_day: int, now: datetime) -> datetime:
+    """
+    Get the next time a minute-of-day slot comes around
+    
+    A slot that matches the current minute counts as due now.
+    
+    Args:
+        minute_of_day: Minutes since midnight
+        now: Reference time
+        
+    Returns:
+        Datetime of the next occurrence at or after the start of this minute
+    """
+    fire = now.replace(hour=minute_of_day // 60, minute=minute_of_day % 60,
+                       second=0, microsecond=0)
+    if fire < now.replace(second=0, microsecond=0):
+        fire += timedelta(days=1)
+    return fire
+
+
+CREATED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class Reminder(MutableMapping):
+    """
+    Compact record for a single reminder
+    
+    Uses __slots__ and stores the time as an int minute-of-day and
+    created_at as epoch seconds, which takes far less memory than a
+    7-key dict per reminder. It still behaves like the old dictionary:
+    reminder['time'] returns "HH:MM", reminder['created_at'] returns the
+    formatted timestamp, and dict(reminder) or to_dict() gives a plain
+    dict for JSON export.
+    
+    Values that cannot be stored compactly (an unparseable time, an
+    unusual created_at, or extra keys from an imported file) are kept
+    as-is in a small side dict, so nothing is lost on round trips.
+    
+    Once the time or frequency has been edited, 'scheduled_at' records
+    when; recurrences are counted from then instead of from creation.
+    """
+    
+    __slots__ = ('id', 'medicine_name', 'minute', 'message', 'frequency',
+                 'active', 'created_ts', 'scheduled_ts', '_extra')
+    
+    KEYS = ('id', 'medicine_name', 'time', 'message', 'frequency', 'active', 'created_at')
+    _PLAIN = frozenset(('id', 'medicine_name', 'message', 'frequency', 'active'))
+    
+    def __init__(self, id: int, medicine_name: str, time: str, message: str,
+                 frequency: str = "daily", active: bool = True,
+                 created_at=None):
+        """
+        Args:
+            id: Reminder ID
+            medicine_name: Name of the medicine
+            time: Time in HH:MM format (24-hour)
+            message: Reminder message
+            frequency: How often (daily, weekly, etc.)
+            active: False once deleted
+            created_at: Epoch seconds or a "%Y-%m-%d %H:%M:%S" string.
+                If None, uses the current time.
+        """
+        self.id = id
+        self.medicine_name = medicine_name
+        self.message = message
+        self.frequency = frequency
+        self.active = active
+        self.scheduled_ts: Optional[int] = None
+        self._extra: Optional[Dict] = None
+        self['time'] = time
+        if created_at is None:
+            self.created_ts = int(datetime.now().timestamp())
+        else:
+            self['created_at'] = created_at
+    
+    @classmethod
+    def from_dict(cls, record: Dict) -> "Reminder":
+        """Build a Reminder from a plain reminder dictionary"""
+        reminder = cls(record['id'], record['medicine_name'], record['time'],
+                       record['message'], record.get('frequency', 'daily'),
+                       record.get('active', True), record.get('created_at', ''))
+        for key, value in record.items():
+            if key not in Reminder.KEYS:
+                reminder[key] = value
+        return reminder
+    
+    def to_dict(self) -> Dict:
+        """Convert to a plain dictionary (the export format)"""
+        return dict(self.items())
+    
+    @property
+    def time(self) -> str:
+        """Time in HH:MM format"""
+        return self['time']
+    
+    @property
+    def rule(self) -> "RecurrenceRule":
+        """Recurrence rule parsed from the frequency"""
+        return parse_frequency(self.frequency)
+    
+    @property
+    def anchor(self) -> Optional[datetime]:
+        """
+        First occurrence: the first fire time at or after the schedule
+        started (the last time or frequency edit, else creation)
+        
+        None if the time or the start time is unknown.
+        """
+        start_ts = self.scheduled_ts if self.scheduled_ts is not None else self.created_ts
+        if self.minute < 0 or start_ts is None:
+            return None
+        start = datetime.fromtimestamp(start_ts)
+        return next_fire_time(self.minute, start.replace(second=0))
+    
+    def __getitem__(self, key):
+        if key in Reminder._PLAIN:
+            return getattr(self, key)
+        if key == 'time':
+            if self.minute >= 0:
+                return f"{self.minute // 60:02d}:{self.minute % 60:02d}"
+            return self._extra['time']
+        if key == 'created_at':
+            if self.created_ts is not None:
+                return datetime.fromtimestamp(self.created_ts).strftime(CREATED_AT_FORMAT)
+            return self._extra['created_at']
+        if key == 'scheduled_at' and self.scheduled_ts is not None:
+            return datetime.fromtimestamp(self.scheduled_ts).strftime(CREATED_AT_FORMAT)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        if key in Reminder._PLAIN:
+            setattr(self, key, value)
+        elif key == 'time':
+            minute = time_to_minute(value)
+            self.minute = -1 if minute is None else minute
+            self._set_raw('time', None if minute is not None else value)
+        elif key == 'created_at':
+            ts = self._parse_timestamp(value)
+            self.created_ts = ts
+            self._set_raw('created_at', None if ts is not None else value)
+        elif key == 'scheduled_at':
+            ts = self._parse_timestamp(value)
+            self.scheduled_ts = ts
+            self._set_raw('scheduled_at', None if ts is not None or value is None else value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+    
+    @staticmethod
+    def _parse_timestamp(value) -> Optional[int]:
+        """Epoch seconds from epoch seconds or a CREATED_AT_FORMAT string"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return int(value)
+        if isinstance(value, str):
+            try:
+                return int(datetime.strptime(value, CREATED_AT_FORMAT).timestamp())
+            except (ValueError, OverflowError, OSError):
+                return None
+        return None
+    
+    def _set_raw(self, key: str, value):
+        """Keep (or clear) the original value of a field stored compactly"""
+        if value is not None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        elif self._extra is not None:
+            self._extra.pop(key, None)
+            if not self._extra:
+                self._extra = None
+    
+    def __delitem__(self, key):
+        if key == 'scheduled_at' and self.scheduled_ts is not None:
+            self.scheduled_ts = None
+            return
+        if key in Reminder.KEYS or self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+    
+    def __iter__(self):
+        yield from Reminder.KEYS
+        if self.scheduled_ts is not None:
+            yield 'scheduled_at'
+        if self._extra is not None:
+            for key in self._extra:
+                if key not in Reminder.KEYS:
+                    yield key
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"Reminder({self.to_dict()!r})"
+
+
+WEEKDAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+class RecurrenceRule:
+    """
+    Parsed form of a reminder's frequency string
+    
+    Kinds:
+    - "daily": every day (also used for unrecognised frequencies)
+    - "once": only the first occurrence after the reminder was created
+    - "days": every day for `count` days ("7_days")
+    - "weekly": every 7 days from the first occurrence
+    - "weekdays": on the given weekdays ("weekdays", "mon,wed,fri")
+    - "hours": every `count` hours from the first occurrence ("every_8_hours")
+    
+    Finite rules ("once", "days") have a last occurrence, after which the
+    reminder is retired. Rules are immutable and shared between reminders
+    with the same frequency.
+    """
+    
+    __slots__ = ('kind', 'count', 'weekdays')
+    
+    def __init__(self, kind: str, count: int = 1, weekdays: frozenset = frozenset()):
+        self.kind = kind
+        self.count = count
+        self.weekdays = weekdays
+    
+    @property
+    def is_finite(self) -> bool:
+        """True if the rule stops after a fixed number of occurrences"""
+        return self.kind in ('once', 'days')
+    
+    def slot_minutes(self, minute: int) -> List[int]:
+        """
+        Minutes of the day at which the rule can fire
+        
+        Args:
+            minute: The reminder's own minute-of-day
+        """
+        if self.kind != 'hours':
+            return [minute]
+        step = math.gcd(self.count * 60, 1440)
+        return sorted((minute + k * step) % 1440 for k in range(1440 // step))
+    
+    def occurs_at(self, anchor: Optional[datetime], fire: datetime) -> bool:
+        """
+        Check whether the rule fires at a given slot time
+        
+        Args:
+            anchor: First occurrence (see Reminder.anchor). If None (the
+                creation time is unknown), every slot counts.
+            fire: Candidate fire time, on one of slot_minutes()
+        """
+        kind = self.kind
+        if kind == 'daily':
+            return True
+        if kind == 'weekdays':
+            return fire.weekday() in self.weekdays
+        if anchor is None:
+            return True
+        if fire < anchor:
+            return False
+        if kind == 'once':
+            return fire == anchor
+        if kind == 'days':
+            return (fire.date() - anchor.date()).days < self.count
+        if kind == 'weekly':
+            return (fire.date() - anchor.date()).days % 7 == 0
+        # hours
+        elapsed = int((fire - anchor).total_seconds()) // 60
+        return elapsed % (self.count * 60) == 0
+    
+    def last_occurrence(self, anchor: Optional[datetime]) -> Optional[datetime]:
+        """Final fire time of a finite rule, or None if it never ends"""
+        if anchor is None or not self.is_finite:
+            return None
+        return anchor + timedelta(days=self.count - 1)
+    
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, RecurrenceRule) and self.kind == other.kind and
+                self.count == other.count and self.weekdays == other.weekdays)
+    
+    def __hash__(self) -> int:
+        return hash((self.kind, self.count, self.weekdays))
+    
+    def __repr__(self) -> str:
+        return f"RecurrenceRule({self.kind!r}, {self.count}, {sorted(self.weekdays)})"
+
+
+DAILY_RULE = RecurrenceRule('daily')
+
+
+@lru_cache(maxsize=256)
+def parse_frequency(frequency: str) -> RecurrenceRule:
+    """
+    Parse a frequency string into a RecurrenceRule
+    
+    Accepts "daily", "once", "weekly", "<N>_days", "every_<N>_hours" (or
+    "<N>_hours"), "weekdays", "weekends" and comma-separated day names
+    such as "mon,wed,fri". Spaces work in place of underscores. Anything
+    unrecognised is treated as daily, as before.
+    
+    Args:
+        frequency: Frequency string from a reminder
+        
+    Returns:
+        The (shared) rule for that frequency
+    """
+    text = str(frequency or '').strip().lower().replace(' ', '_').replace('-', '_')
+    if text in ('', 'daily'):
+        return DAILY_RULE
+    if text == 'once':
+        return RecurrenceRule('once')
+    if text == 'weekly':
+        return RecurrenceRule('weekly')
+    if text == 'weekdays':
+        return RecurrenceRule('weekdays', weekdays=frozenset(range(5)))
+    if text == 'weekends':
+        return RecurrenceRule('weekdays', weekdays=frozenset((5, 6)))
+    
+    parts = text.split('_')
+    if parts[0] == 'every':
+        parts = parts[1:]
+    if len(parts) == 2 and parts[0].isdigit() and int(parts[0]) > 0:
+        count = int(parts[0])
+        if parts[1] in ('day', 'days'):
+            return RecurrenceRule('days', count)
+        if parts[1] in ('hour', 'hours', 'hr', 'hrs', 'h'):
+            return RecurrenceRule('hours', count)
+    
+    days = set()
+    for name in text.replace(',', '_').split('_'):
+        if not name:
+            continue
+        if name[:3] not in WEEKDAY_NAMES:
+            return DAILY_RULE
+        days.add(WEEKDAY_NAMES.index(name[:3]))
+    if days:
+        return RecurrenceRule('weekdays', weekdays=frozenset(days))
+    return DAILY_RULE
+
+
+def validate_reminder_record(record) -> Reminder:
+    """
+    Check an imported reminder record and fill in optional fields
+    
+    Args:
+        record: Parsed JSON object
+        
+    Returns:
+        Reminder built from the record
+        
+    Raises:
+        ValueError: If a required field is missing or has the wrong type
+    """
+    if not isinstance(record, dict):
+        raise ValueError("reminder record must be an object")
+    if not isinstance(record.get('id'), int) or isinstance(record.get('id'), bool):
+        raise ValueError("reminder id must be an integer")
+    for field in ('medicine_name', 'time', 'message'):
+        if not isinstance(record.get(field), str):
+            raise ValueError(f"reminder {field} must be a string")
+    
+    reminder = Reminder.from_dict(record)
+    reminder.active = bool(reminder.active)
+    return reminder
+
+
+def iter_schedule_records(filename: str, chunk_size: int = 64 * 1024) -> Iterator:
+    """
+    Stream records from a schedule file without loading it whole
+    
+    Accepts either a JSON array of reminders (the export_schedule format)
+    or JSON Lines with one reminder per line.
+    
+    Args:
+        filename: Schedule file to read
+        chunk_size: Characters read per refill for JSON arrays
+        
+    Yields:
+        Parsed records, one at a time
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        buf = ''
+        while not buf.strip():
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buf += chunk
+        buf = buf.lstrip()
+        
+        if not buf.startswith('['):
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+        
+        decoder = json.JSONDecoder()
+        pos = 1
+        eof = False
+        while True:
+            # Skip separators, refilling the buffer when it runs dry
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    raise ValueError(f"unterminated JSON array in {filename}")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            if buf[pos] == ']':
+                return
+            
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Record spans the end of the buffer
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield record
+            pos = end
+            if pos > chunk_size:
+                buf, pos = buf[pos:], 0
+
+
+# Common Hindi/English spelling mistakes in caregiver-typed messages.
+# Keys may span several words; matching ignores case and extra spaces.
+CORRECTIONS = {
+    # Common Hindi medicine words
+    'dwai': 'dawai',
+    'dawa': 'dawai',
+    'dwae': 'dawai',
+    'dwaii': 'dawai',
+    'dwayi': 'dawai',
+    'dwaayi': 'dawai',
+    'dwa': 'dawai',
+    
+    # Time related
+    'tym': 'time',
+    'tyme': 'time',
+    'ho gya': 'ho gaya',
+    'hogya': 'ho gaya',
+    'hogaya': 'ho gaya',
+    
+    # Common words
+    'lelo': 'le lo',
+    'lelijiye': 'le lijiye',
+    'lelena': 'le lena',
+    'bad': 'baad',
+    'pahle': 'pehle',
+    'pahele': 'pehle',
+    'subha': 'subah',
+    'subh': 'subah',
+    'rat': 'raat',
+    'dophar': 'dopahar',
+    'dopaher': 'dopahar',
+    
+    # Medicine types
+    'bp': 'BP',
+    'dabetes': 'diabetes',
+    'diabetis': 'diabetes',
+    'diabeties': 'diabetes',
+    'thyrod': 'thyroid',
+    'thyrode': 'thyroid',
+    'hart': 'heart',
+    'hert': 'heart',
+    
+    # Actions
+    'bhul': 'bhool',
+    'bhule': 'bhoole',
+    'bhulna': 'bhoolna',
+    'yad': 'yaad',
+    'dyan': 'dhyan',
+}
+
+
+class AutoCorrector:
+    """
+    Phrase corrector compiled into a character trie
+    
+    Matches start only at word starts and must end at a word boundary, so
+    a scan walks each position at most once per phrase it could begin and
+    the whole text is corrected in one left-to-right pass. The longest
+    phrase wins ('ho gya' over 'ho'); punctuation around a word does not
+    stop it matching, and runs of whitespace inside a phrase count as one
+    space.
+    """
+    
+    _END = ''
+    
+    def __init__(self, table: Dict[str, str]):
+        """
+        Compile the trie
+        
+        Args:
+            table: Misspelled phrase -> correction
+        """
+        self._root: Dict[str, dict] = {}
+        for phrase, replacement in table.items():
+            key = ' '.join(phrase.lower().split())
+            if not key or key == replacement:
+                continue
+            node = self._root
+            for char in key:
+                node = node.setdefault(char, {})
+            node[self._END] = replacement
+    
+    def correct(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Correct one message
+        
+        The case of each corrected phrase follows the original: all caps
+        stay all caps and a leading capital is kept.
+        
+        Args:
+            text: Message to correct
+            
+        Returns:
+            Tuple of (corrected text, list of "'old' → 'new'" changes)
+        """
+        root, end_key = self._root, self._END
+        parts = []
+        changes = []
+        copied = 0
+        i, n = 0, len(text)
+        while i < n:
+            if not text[i].isalnum():
+                i += 1
+                continue
+            
+            # i starts a word: walk the trie as far as the text allows
+            node, j = root, i
+            match_end, match = -1, None
+            while j < n:
+                char = text[j]
+                if char.isspace():
+                    node = node.get(' ')
+                    while j < n and text[j].isspace():
+                        j += 1
+                else:
+                    node = node.get(char.lower())
+                    j += 1
+                if node is None:
+                    break
+                if end_key in node and (j == n or not text[j].isalnum()):
+                    match_end, match = j, node[end_key]
+            
+            if match is None:
+                while i < n and text[i].isalnum():
+                    i += 1
+                continue
+            
+            original = text[i:match_end]
+            if original.isupper():
+                corrected = match.upper()
+            elif original[0].isupper():
+                corrected = match.capitalize()
+            else:
+                corrected = match
+            if corrected != original:
+                parts.append(text[copied:i])
+                parts.append(corrected)
+                copied = match_end
+                changes.append(f"'{original}' → '{corrected}'")
+            i = match_end
+        
+        if not parts:
+            return text, changes
+        parts.append(text[copied:])
+        return ''.join(parts), changes
+    
+    def correct_batch(self, texts: Iterable[str]) -> List[str]:
+        """
+        Correct many messages, e.g. every message of an imported schedule
+        
+        Each distinct message is corrected once; schedules repeat the
+        same few messages many times.
+        
+        Args:
+            texts: Messages to correct
+            
+        Returns:
+            Corrected messages, in order
+        """
+        memo: Dict[str, str] = {}
+        results = []
+        for text in texts:
+            corrected = memo.get(text)
+            if corrected is None:
+                corrected = memo[text] = self.correct(text)[0]
+            results.append(corrected)
+        return results
+
+
+# Shared corrector for CORRECTIONS, compiled once at import
+AUTO_CORRECTOR = AutoCorrector(CORRECTIONS)
+
+
+def auto_correct_message(text: str) -> Tuple[str, List[str]]:
+    """
+    Auto-correct common Hindi/English spelling mistakes in a message
+    
+    Returns:
+        Tuple of (corrected text, list of changes made)
+    """
+    return AUTO_CORRECTOR.correct(text)
+
+
+def auto_correct_messages(texts: Iterable[str]) -> List[str]:
+    """Auto-correct many messages at once (see AutoCorrector.correct_batch)"""
+    return AUTO_CORRECTOR.correct_batch(texts)
+
+
+class TTSUnavailableError(RuntimeError):
+    """Raised when no text-to-speech engine is installed"""
+
+
+# File types the TTS backends write
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.aiff')
+
+
+class TTSBackend:
+    """
+    Base class for text-to-speech engines
+    
+    A backend writes the audio for one message to a file. Its name is part
+    of the TTS cache key, so audio from different engines never mixes.
+    """
+    
+    name = 'base'
+    extension = '.mp3'
+    
+    def __init__(self, lang: str = 'hi', slow: bool = False):
+        """
+        Args:
+            lang: Language code for the spoken text
+            slow: Speak slowly (where the engine supports it)
+        """
+        self.lang = lang
+        self.slow = slow
+    
+    def is_available(self) -> bool:
+        """Check whether the engine is installed"""
+        raise NotImplementedError
+    
+    def synthesize(self, text: str, path: str):
+        """Write speech for text to path, raising on failure"""
+        raise NotImplementedError
+    
+    def warm(self):
+        """Start the engine ahead of the first request (if it has any startup cost)"""
+    
+    def close(self):
+        """Release any resources held by the backend"""
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(lang={self.lang!r})"
+
+
+class GTTSBackend(TTSBackend):
+    """
+    Google Translate speech through gTTS (needs network access)
+    
+    Best Hindi voice, but every miss is a network round-trip, so latency
+    depends on the connection and it fails when offline.
+    """
+    
+    name = 'gtts'
+    extension = '.mp3'
+    
+    def is_available(self) -> bool:
+        return _load_gtts() is not None
+    
+    def synthesize(self, text: str, path: str):
+        tts_class = _load_gtts()
+        if tts_class is None:
+            raise TTSUnavailableError("gTTS not installed")
+        tts_class(text=text, lang=self.lang, slow=self.slow).save(path)
+
+
+class _SpeechJob:
+    """One synthesis request handed to a Pyttsx3Backend engine thread"""
+    
+    __slots__ = ('text', 'path', 'done', 'error')
+    
+    def __init__(self, text: str, path: str):
+        self.text = text
+        self.path = path
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class Pyttsx3Backend(TTSBackend):
+    """
+    Offline speech through the platform engine (SAPI5, NSSpeech, eSpeak)
+    
+    Starting an engine takes far longer than speaking one reminder, so a
+    small pool of engines is kept warm between calls. Each engine lives on
+    its own thread (the drivers are not thread-safe) and takes requests
+    from a shared queue, so pool_size messages render at once.
+    """
+    
+    name = 'pyttsx3'
+    # NSSpeechSynthesizer writes AIFF; SAPI5 and eSpeak write WAV
+    extension = '.aiff' if sys.platform == 'darwin' else '.wav'
+    
+    def __init__(self, lang: str = 'hi', slow: bool = False, pool_size: int = 2,
+                 rate: Optional[int] = None, timeout: float = 60.0):
+        """
+        Args:
+            lang: Language code; a voice for it is picked when installed
+            slow: Speak at 70% of the default rate (ignored if rate is set)
+            pool_size: Number of engines kept running
+            rate: Words per minute, or None for the engine default
+            timeout: Seconds to wait for one message before giving up
+        """
+        super().__init__(lang, slow)
+        self.pool_size = pool_size
+        self.rate = rate
+        self.timeout = timeout
+        self._jobs: "queue.Queue[Optional[_SpeechJob]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+    
+    def is_available(self) -> bool:
+        return _load_pyttsx3() is not None
+    
+    def warm(self):
+        """Start any engines of the pool that are not running yet"""
+        if not self.is_available():
+            return
+        with self._lock:
+            self._workers = [t for t in self._workers if t.is_alive()]
+            while len(self._workers) < self.pool_size:
+                worker = threading.Thread(target=self._run, daemon=True,
+                                          name=f"tts-engine-{len(self._workers)}")
+                worker.start()
+                self._workers.append(worker)
+    
+    def synthesize(self, text: str, path: str):
+        if not self.is_available():
+            raise TTSUnavailableError("pyttsx3 not installed")
+        self.warm()
+        job = _SpeechJob(text, path)
+        self._jobs.put(job)
+        if not job.done.wait(self.timeout):
+            raise TimeoutError(f"pyttsx3 did not finish within {self.timeout}s")
+        if job.error is not None:
+            raise job.error
+    
+    def close(self):
+        """Stop the engines"""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.join(self.timeout)
+    
+    def _create_engine(self):
+        """Start one engine with the configured voice and rate"""
+        if sys.platform == 'win32':
+            # SAPI5 is a COM server; every thread using it must join COM
+            import comtypes
+            comtypes.CoInitialize()
+        # pyttsx3.init() hands out one shared engine per driver, so the
+        # pool builds its engines directly
+        engine = _load_pyttsx3().Engine()
+        voice = self._find_voice(engine)
+        if voice is not None:
+            engine.setProperty('voice', voice)
+        if self.rate is not None:
+            engine.setProperty('rate', self.rate)
+        elif self.slow:
+            engine.setProperty('rate', int(engine.getProperty('rate') * 0.7))
+        return engine
+    
+    def _find_voice(self, engine) -> Optional[str]:
+        """Get the id of an installed voice for self.lang, if any"""
+        lang = self.lang.lower()
+        for voice in engine.getProperty('voices'):
+            for code in getattr(voice, 'languages', None) or ():
+                if isinstance(code, bytes):
+                    # eSpeak prefixes its codes with a priority byte
+                    code = code[1:].decode('ascii', 'ignore')
+                code = code.lower().replace('_', '-')
+                if code == lang or code.startswith(lang + '-'):
+                    return voice.id
+        return None
+    
+    def _run(self):
+        """Engine thread: serve queued jobs until a None sentinel arrives"""
+        engine, startup_error = None, None
+        try:
+            engine = self._create_engine()
+        except Exception as e:
+            startup_error = e
+        
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            try:
+                if engine is None:
+                    raise startup_error
+                engine.save_to_file(job.text, job.path)
+                engine.runAndWait()
+                if not os.path.exists(job.path):
+                    raise RuntimeError("pyttsx3 wrote no audio")
+            except Exception as e:
+                job.error = e
+            job.done.set()
+        
+        if engine is not None:
+            engine.stop()
+
+
+# Backends selectable by name in tts_backends_from_config()
+TTS_BACKENDS: Dict[str, Callable[..., TTSBackend]] = {
+    'gtts': GTTSBackend,
+    'pyttsx3': Pyttsx3Backend,
+}
+
+# Environment variable naming the backends to use, in order of preference
+TTS_BACKENDS_ENV = "MEDICINE_REMINDER_TTS"
+DEFAULT_TTS_BACKENDS = "gtts,pyttsx3"
+
+
+def tts_backends_from_config(spec: Optional[str] = None, lang: str = 'hi') -> List[TTSBackend]:
+    """
+    Build the TTS fallback chain from a configuration string
+    
+    Args:
+        spec: Comma-separated backend names in order of preference, e.g.
+            "pyttsx3" (offline only) or "gtts,pyttsx3". If None, the
+            MEDICINE_REMINDER_TTS environment variable is used, falling
+            back to DEFAULT_TTS_BACKENDS.
+        lang: Language code passed to every backend
+        
+    Returns:
+        List of backends
+    """
+    if spec is None:
+        spec = os.environ.get(TTS_BACKENDS_ENV) or DEFAULT_TTS_BACKENDS
+    backends = []
+    for name in spec.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in TTS_BACKENDS:
+            raise ValueError(f"Unknown TTS backend {name!r} "
+                             f"(choose from {', '.join(sorted(TTS_BACKENDS))})")
+        backends.append(TTS_BACKENDS[name](lang=lang))
+    return backends
+
+
+class TTSCache:
+    """
+    Content-addressed on-disk cache for synthesized reminder audio
+    
+    Audio is stored once per (text, language, slow, backend) combination
+    and evicted least-recently-used first when the total size of the cache
+    exceeds max_bytes. File modification times record recency, so the LRU
+    order survives restarts.
+    """
+    
+    def __init__(self, directory: str = "tts_cache", max_bytes: int = 50 * 1024 * 1024):
+        """
+        Initialize the cache, picking up audio left by earlier runs
+        
+        Args:
+            directory: Folder holding the cached audio files
+            max_bytes: Size budget for the whole cache
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # key -> file size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        # key -> audio file extension (backends write different formats)
+        self._extensions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        
+        if os.path.isdir(directory):
+            found = []
+            for name in os.listdir(directory):
+                key, extension = os.path.splitext(name)
+                # Scratch files are named "<key>.<thread>.tmp<ext>"
+                if extension not in AUDIO_EXTENSIONS or '.' in key:
+                    continue
+                stat = os.stat(os.path.join(directory, name))
+                found.append((stat.st_mtime, key, extension, stat.st_size))
+            for _, key, extension, size in sorted(found):
+                self._entries[key] = size
+                self._extensions[key] = extension
+                self.total_bytes += size
+    
+    @staticmethod
+    def make_key(text: str, lang: str, slow: bool, backend: str) -> str:
+        """
+        Build the cache key for a synthesis request
+        
+        Returns:
+            Hex digest identifying the audio content
+        """
+        import hashlib  # loads OpenSSL; only needed once audio is requested
+        
+        payload = json.dumps([text, lang, slow, backend], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def path_for(self, key: str) -> str:
+        """Get the cache file path for a key"""
+        return os.path.join(self.directory, key + self._extensions.get(key, '.mp3'))
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached audio and mark it as recently used
+        
+        Returns:
+            Path to the audio file on a hit, None on a miss
+        """
+        path = self.path_for(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            if not os.path.exists(path):
+                self.total_bytes -= self._entries.pop(key)
+                self._extensions.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+    
+    def put(self, key: str, source: str, extension: str = '.mp3') -> str:
+        """
+        Move a freshly synthesized file into the cache
+        
+        Args:
+            key: Cache key from make_key()
+            source: Path of the audio file to store (moved, not copied)
+            extension: Audio file extension, e.g. ".mp3" or ".wav"
+            
+        Returns:
+            Path to the cached audio file
+        """
+        path = os.path.join(self.directory, key + extension)
+        size = os.path.getsize(source)
+        os.replace(source, path)
+        with self._lock:
+            self.total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._extensions[key] = extension
+            self._evict(keep=key)
+        return path
+    
+    def temp_path(self, key: str, extension: str = '') -> str:
+        """Get a scratch path inside the cache folder to synthesize into"""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{key}.{threading.get_ident()}.tmp{extension}")
+    
+    def _evict(self, keep: str):
+        """Drop least recently used entries until within the size budget"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            path = self.path_for(key)
+            del self._entries[key]
+            self._extensions.pop(key, None)
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TTSPrerenderer:
+    """
+    Background worker that renders reminder audio before it is due
+    
+    Every interval it renders audio for the reminders due within the
+    look-ahead window, and it renders edited reminders as soon as they are
+    queued. With a TTS cache in place, triggering then only plays a file.
+    """
+    
+    def __init__(self, agent: "MedicineReminderAgent", hours: float = 3,
+                 interval: float = 15 * 60):
+        """
+        Args:
+            agent: Agent whose reminders are rendered
+            hours: Look-ahead window in hours
+            interval: Seconds between full passes over the window
+        """
+        self.agent = agent
+        self.hours = hours
+        self.interval = interval
+        self._queue: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+    
+    def start(self):
+        """Start the worker thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="tts-prerender", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker thread"""
+        self._stopping = True
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def request(self, reminder_id: int):
+        """Queue a reminder to be rendered again (e.g. after its message changed)"""
+        self._queue.put(reminder_id)
+    
+    def _run(self):
+        """Worker loop: full pass, then serve requests until the next pass"""
+        while not self._stopping:
+            try:
+                self.agent.prerender_upcoming(self.hours)
+            except Exception as e:
+                self.agent._emit('prerender_error', error=str(e))
+            
+            # Requests queued before stop() are still served
+            deadline = time.monotonic() + self.interval
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    reminder_id = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if reminder_id is None:
+                    break
+                reminder = self.agent.get_reminder_by_id(reminder_id)
+                if reminder is not None:
+                    self.agent.prerender_reminder(reminder)
+
+
+class AudioPlaybackError(RuntimeError):
+    """Raised when no way to play audio is available"""
+
+
+# Command-line players tried in order: (program, arguments, file types it
+# plays or None for any)
+AUDIO_PLAYERS = (
+    ('afplay', ('afplay',), None),
+    ('ffplay', ('ffplay', '-nodisp', '-autoexit', '-loglevel', 'quiet'), None),
+    ('mpg123', ('mpg123', '-q'), ('.mp3',)),
+    ('paplay', ('paplay',), ('.wav', '.aiff')),
+    ('aplay', ('aplay', '-q'), ('.wav',)),
+)
+
+
+def play_audio(path: str):
+    """
+    Play an audio file, blocking until it has finished
+    
+    Uses the first installed command-line player that handles the file
+    type, then playsound, then (on Windows) the default application, which
+    returns as soon as playback has started.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    
+    import shutil
+    extension = os.path.splitext(path)[1].lower()
+    for program, args, types in AUDIO_PLAYERS:
+        if (types is None or extension in types) and shutil.which(program):
+            import subprocess
+            subprocess.run([*args, path], check=True, stdin=subprocess.DEVNULL,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return
+    
+    try:
+        from playsound import playsound
+    except ImportError:
+        pass
+    else:
+        playsound(path)
+        return
+    
+    if sys.platform == 'win32':
+        os.startfile(path)
+        return
+    raise AudioPlaybackError("No audio player found (install playsound or ffmpeg)")
+
+
+class _Playback:
+    """One queued audio file and how often it still has to play"""
+    
+    __slots__ = ('handle', 'path', 'plays', 'interval', 'reminder_id', 'started')
+    
+    def __init__(self, handle: int, path: str, plays: int, interval: float,
+                 reminder_id: Optional[int]):
+        self.handle = handle
+        self.path = path
+        self.plays = plays
+        self.interval = interval
+        self.reminder_id = reminder_id
+        # Plays begun so far
+        self.started = 0
+
+
+class PlaybackQueue:
+    """
+    Plays reminder audio in the background and repeats it on timers
+    
+    A single timer thread keeps a heap of (due time, handle) entries and
+    hands every due play to its own short-lived thread, so play() returns
+    at once, a long file never delays another reminder, and repeats of
+    overlapping reminders interleave instead of queueing behind each other.
+    The next repeat of a file is only queued once its current play has
+    finished, so one reminder never talks over itself.
+    """
+    
+    def __init__(self, player: Optional[Callable[[str], None]] = None,
+                 emit: Optional[Callable[..., None]] = None):
+        """
+        Args:
+            player: Plays one file, blocking until done. If None, uses
+                play_audio.
+            emit: Called as emit(kind, **data) with playback_started and
+                playback_error events (e.g. an agent's _emit)
+        """
+        self.player = player if player is not None else play_audio
+        self._emit = emit
+        # (monotonic due time, handle), cancelled handles are skipped lazily
+        self._heap: List[Tuple[float, int]] = []
+        # handle -> playback, until its last play has finished
+        self._playbacks: Dict[int, _Playback] = {}
+        self._next_handle = 1
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+    
+    def play(self, path: str, repeat: int = 1, interval: float = 0.0,
+             reminder_id: Optional[int] = None) -> int:
+        """
+        Queue a file to play now and repeat - 1 more times
+        
+        Args:
+            path: Audio file to play
+            repeat: Total number of plays
+            interval: Seconds from the end of one play to the start of the next
+            reminder_id: Reminder the audio belongs to (reported in events)
+            
+        Returns:
+            Handle for cancel()
+        """
+        with self._cond:
+            handle = self._next_handle
+            self._next_handle += 1
+            self._playbacks[handle] = _Playback(handle, path, max(1, repeat),
+                                                max(0.0, interval), reminder_id)
+            heapq.heappush(self._heap, (time.monotonic(), handle))
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="playback", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return handle
+    
+    def cancel(self, handle: int) -> bool:
+        """
+        Drop the remaining repeats of a playback (a running play finishes)
+        
+        Returns:
+            True if the playback was still pending
+        """
+        with self._cond:
+            found = self._playbacks.pop(handle, None) is not None
+            self._cond.notify_all()
+        return found
+    
+    @property
+    def pending(self) -> int:
+        """Number of playbacks with plays still queued or running"""
+        with self._cond:
+            return len(self._playbacks)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued play has finished
+        
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._playbacks, timeout)
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Cancel everything queued and stop the timer thread"""
+        with self._cond:
+            self._stopping = True
+            self._playbacks.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        """Timer thread: start each play when it falls due"""
+        with self._cond:
+            while not self._stopping:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, handle = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                playback = self._playbacks.get(handle)
+                if playback is None:
+                    continue
+                playback.started += 1
+                threading.Thread(target=self._play, args=(playback, playback.started),
+                                 name=f"playback-{handle}", daemon=True).start()
+    
+    def _play(self, playback: _Playback, number: int):
+        """Play thread: play the file once, report it and queue the next repeat"""
+        emit = self._emit
+        if emit is not None:
+            emit('playback_started', id=playback.reminder_id, path=playback.path,
+                 play=number, plays=playback.plays)
+        try:
+            self.player(playback.path)
+        except Exception as e:
+            if emit is not None:
+                emit('playback_error', id=playback.reminder_id, path=playback.path,
+                     error=str(e))
+        
+        with self._cond:
+            if self._playbacks.get(playback.handle) is playback:
+                if playback.started >= playback.plays:
+                    del self._playbacks[playback.handle]
+                elif not self._stopping:
+                    heapq.heappush(self._heap, (time.monotonic() + playback.interval,
+                                                playback.handle))
+            self._cond.notify_all()
+
+
+class ReminderEvent:
+    """
+    Something the agent did, delivered to its event sinks
+    
+    Kinds: reminder_added, reminder_edited, reminder_deleted,
+    reminder_not_found, reminders_listed, triggered, course_finished,
+    tts_ready, tts_unavailable, tts_error, tts_batch_done,
+    prerender_error, schedule_exported, schedule_imported,
+    import_skipped, file_not_found, simulation_started,
+    simulation_step, simulation_idle, simulation_finished.
+    
+    Data holds the raw values (reminders, ids, paths); formatting is left
+    to the sink.
+    """
+    
+    __slots__ = ('kind', 'timestamp', 'data')
+    
+    def __init__(self, kind: str, data: Dict):
+        self.kind = kind
+        self.timestamp = time.time()
+        self.data = data
+    
+    def __repr__(self) -> str:
+        return f"ReminderEvent({self.kind!r}, {self.data!r})"
+
+
+class EventSink:
+    """
+    Base class for event sinks
+    
+    write() receives events in batches; emit() delivers a single event.
+    """
+    
+    def emit(self, event: ReminderEvent):
+        """Deliver one event"""
+        self.write((event,))
+    
+    def write(self, events):
+        """Deliver a batch of events, in order"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Flush and release resources"""
+
+
+class ConsoleSink(EventSink):
+    """
+    Prints events as the familiar emoji console messages
+    
+    Each batch is formatted and written with a single call.
+    """
+    
+    RULE = "─" * 50
+    
+    def __init__(self, stream=None):
+        """
+        Args:
+            stream: Text stream to write to. If None, uses sys.stdout at
+                write time.
+        """
+        self.stream = stream
+    
+    def write(self, events):
+        lines = []
+        for event in events:
+            text = self.format(event)
+            if text is not None:
+                lines.append(text)
+        if lines:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write("\n".join(lines) + "\n")
+    
+    def format(self, event: ReminderEvent) -> Optional[str]:
+        """Console text for an event, or None to print nothing"""
+        kind, data = event.kind, event.data
+        if kind == 'triggered':
+            reminder = data['reminder']
+            return (f"\n⏰ REMINDER TRIGGERED at {data['time']}\n"
+                    f"💊 Medicine: {reminder['medicine_name']}\n"
+                    f"📢 Message: {reminder['message']}\n{self.RULE}")
+        if kind == 'reminder_added':
+            return f"✅ Reminder added successfully! (ID: {data['id']})"
+        if kind == 'reminder_edited':
+            return f"✏️ Reminder {data['id']} updated successfully."
+        if kind == 'reminder_deleted':
+            return f"🗑️ Reminder {data['id']} deleted successfully."
+        if kind == 'reminder_not_found':
+            return f"❌ Reminder {data['id']} not found."
+        if kind == 'course_finished':
+            return f"🏁 Course finished: {data['reminder']['medicine_name']} (ID: {data['id']})"
+        if kind == 'reminders_listed':
+            return self._format_table(data)
+        if kind == 'tts_ready':
+            # Batch renders are summarized by tts_batch_done
+            if 'id' in data:
+                return None
+            if data['cached']:
+                return f"🔊 Audio from cache: {data['path']}"
+            return f"🔊 Audio generated: {data['path']}"
+        if kind == 'tts_unavailable':
+            return "⚠️ TTS not available. Message would be: " + data['message']
+        if kind == 'tts_error':
+            if 'id' in data:
+                return f"⚠️ TTS Error for reminder {data['id']}: {data['error']}"
+            return f"⚠️ TTS Error: {data['error']}"
+        if kind == 'tts_batch_done':
+            return f"🔊 Audio ready for {data['ready']}/{data['total']} reminder(s)"
+        if kind == 'prerender_error':
+            return f"⚠️ Pre-render Error: {data['error']}"
+        if kind == 'playback_started':
+            return f"🔊 Playing audio (Play {data['play']}/{data['plays']})..."
+        if kind == 'playback_error':
+            return f"⚠️ Playback Error: {data['error']}\nAudio file: {data['path']}"
+        if kind == 'playback_missing':
+            return f"⚠️ No audio for reminder {data['id']}. Message: {data['message']}"
+        if kind == 'schedule_exported':
+            return f"💾 Schedule exported to {data['filename']}"
+        if kind == 'schedule_imported':
+            return f"📥 Schedule imported from {data['filename']}"
+        if kind == 'messages_corrected':
+            return f"🔍 Auto-corrected {data['count']} message(s) in {data['filename']}"
+        if kind == 'import_skipped':
+            return f"⚠️ Skipped {data['count']} invalid record(s) in {data['filename']}"
+        if kind == 'file_not_found':
+            return f"❌ File {data['filename']} not found."
+        if kind == 'simulation_started':
+            return "\n🌅 Starting Day Simulation...\n"
+        if kind == 'simulation_step':
+            return f"\n🕐 Current Time: {data['time']}"
+        if kind == 'simulation_idle':
+            return "   No reminders at this time."
+        if kind == 'simulation_finished':
+            return "\n🌙 Day Simulation Complete!\n"
+        return None
+    
+    @staticmethod
+    def _format_table(data: Dict) -> str:
+        """Table of active reminders for reminders_listed"""
+        reminders = data['reminders']
+        if not reminders:
+            if data['total'] == 0:
+                return "📭 No reminders scheduled yet."
+            return "📭 No active reminders."
+        lines = ["\n" + "=" * 80,
+                 f"{'ID':<5} {'Medicine':<20} {'Time':<10} {'Frequency':<12} {'Message':<30}",
+                 "=" * 80]
+        for r in reminders:
+            lines.append(f"{r['id']:<5} {r['medicine_name']:<20} {r['time']:<10} "
+                         f"{r['frequency']:<12} {r['message'][:28]:<30}")
+        lines.append("=" * 80 + "\n")
+        return "\n".join(lines)
+
+
+class CallbackSink(EventSink):
+    """Passes each batch of events to a function (e.g. to update a UI)"""
+    
+    def __init__(self, callback: Callable[[List[ReminderEvent]], None]):
+        """
+        Args:
+            callback: Called with a list of events
+        """
+        self.callback = callback
+    
+    def write(self, events):
+        self.callback(list(events))
+
+
+class AsyncSink(EventSink):
+    """
+    Hands events to another sink from a background thread
+    
+    emit() only appends to a bounded queue and never blocks; the worker
+    drains it in batches of up to max_batch. When the queue is full, new
+    events are dropped and counted in `dropped` instead of stalling the
+    agent.
+    """
+    
+    def __init__(self, sink: EventSink, max_batch: int = 256, max_queue: int = 10000):
+        """
+        Args:
+            sink: Sink that receives the batches (e.g. ConsoleSink())
+            max_batch: Largest batch passed to sink.write
+            max_queue: Events buffered before new ones are dropped
+        """
+        self.sink = sink
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[ReminderEvent]]" = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+    
+    def emit(self, event: ReminderEvent):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+    
+    def write(self, events):
+        for event in events:
+            self.emit(event)
+    
+    def flush(self):
+        """Wait until every queued event has been written"""
+        self._queue.join()
+    
+    def close(self):
+        """Write what is queued, stop the worker and close the inner sink"""
+        self._queue.put(None)
+        self._thread.join()
+        self.sink.close()
+    
+    def _run(self):
+        """Worker loop: block for one event, then take what else is queued"""
+        while True:
+            event = self._queue.get()
+            taken = 1
+            stopping = event is None
+            batch = [] if stopping else [event]
+            while not stopping and len(batch) < self.max_batch:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if event is None:
+                    stopping = True
+                else:
+                    batch.append(event)
+            if batch:
+                try:
+                    self.sink.write(batch)
+                except Exception:
+                    # A failing sink must not take the agent's events down
+                    pass
+            for _ in range(taken):
+                self._queue.task_done()
+            if stopping:
+                return
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01,
+                   0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+# Trigger lateness is measured against whole minutes, so coarser buckets
+LATENESS_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style, buckets not cumulative)"""
+    
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms with Prometheus text export
+    
+    Recording costs a few dictionary lookups and a bisect under an
+    uncontended lock (one to two microseconds per instrumented call), so
+    it can stay on in production. Set enabled = False to turn recording
+    off entirely.
+    
+    Series are keyed by metric name plus a tuple of (label, value) pairs.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # name -> (type, help text, histogram bounds)
+        self._meta: Dict[str, Tuple[str, str, Optional[Tuple[float, ...]]]] = {}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {}
+    
+    def describe(self, name: str, kind: str, help_text: str,
+                 buckets: Optional[Tuple[float, ...]] = None):
+        """
+        Declare a metric
+        
+        Args:
+            name: Metric name
+            kind: "counter" or "histogram"
+            help_text: Description for the # HELP line
+            buckets: Histogram bucket upper bounds (default LATENCY_BUCKETS)
+        """
+        if kind == 'histogram' and buckets is None:
+            buckets = LATENCY_BUCKETS
+        with self._lock:
+            self._meta[name] = (kind, help_text, buckets)
+    
+    def inc(self, name: str, labels: tuple = (), amount: float = 1):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+    
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        """Record a histogram observation"""
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                meta = self._meta.get(name)
+                bounds = meta[2] if meta is not None and meta[2] else LATENCY_BUCKETS
+                histogram = series[labels] = Histogram(bounds)
+            histogram.observe(value)
+    
+    def record_call(self, labels: tuple, duration: float, failed: bool = False):
+        """Record one agent method call (count, errors, latency) under one lock"""
+        if not self.enabled:
+            return
+        with self._lock:
+            calls = self._counters.get('reminder_agent_calls_total')
+            if calls is None:
+                calls = self._counters['reminder_agent_calls_total'] = {}
+            calls[labels] = calls.get(labels, 0) + 1
+            if failed:
+                errors = self._counters.setdefault('reminder_agent_errors_total', {})
+                errors[labels] = errors.get(labels, 0) + 1
+            durations = self._histograms.get('reminder_agent_call_duration_seconds')
+            if durations is None:
+                durations = self._histograms['reminder_agent_call_duration_seconds'] = {}
+            histogram = durations.get(labels)
+            if histogram is None:
+                histogram = durations[labels] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(duration)
+    
+    def counter_value(self, name: str, labels: tuple = ()) -> float:
+        """Current value of a counter series (0 if never incremented)"""
+        with self._lock:
+            return self._counters.get(name, {}).get(labels, 0)
+    
+    def histogram(self, name: str, labels: tuple = ()) -> Optional[Histogram]:
+        """A histogram series, or None if nothing was recorded"""
+        with self._lock:
+            return self._histograms.get(name, {}).get(labels)
+    
+    def reset(self):
+        """Drop all recorded values (declarations are kept)"""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+    
+    @staticmethod
+    def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        body = ",".join('{}="{}"'.format(
+            key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in pairs)
+        return "{" + body + "}"
+    
+    @staticmethod
+    def _format_value(value: float) -> str:
+        """Write whole numbers exactly and keep full precision otherwise"""
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+        
+        Returns:
+            Text ready to serve at /metrics or write for a textfile collector
+        """
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {labels: (h.bounds, list(h.counts), h.sum, h.count)
+                                 for labels, h in series.items()}
+                          for name, series in self._histograms.items()}
+            meta = dict(self._meta)
+        
+        lines = []
+        for name in sorted(set(counters) | set(histograms)):
+            kind, help_text, _ = meta.get(
+                name, ('histogram' if name in histograms else 'counter', '', None))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(counters.get(name, {}).items()):
+                lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+            for labels, (bounds, counts, total, count) in sorted(histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{self._format_labels(labels, (('le', self._format_value(bound)),))} "
+                                 f"{cumulative}")
+                lines.append(f"{name}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {total:.6f}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+    
+    def write(self, filename: str):
+        """
+        Atomically write the metrics to a file
+        
+        Suitable for the node_exporter textfile collector.
+        """
+        scratch = filename + ".tmp"
+        with open(scratch, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(scratch, filename)
+    
+    def serve(self, port: int = 9464, host: str = "127.0.0.1"):
+        """
+        Serve the metrics over HTTP from a background thread
+        
+        Args:
+            port: TCP port (0 picks a free one; see server.server_port)
+            host: Interface to bind; local-only by default
+            
+        Returns:
+            The running server; call shutdown() on it to stop
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _describe_agent_metrics(registry: MetricsRegistry):
+    """Declare the metrics recorded by MedicineReminderAgent"""
+    registry.describe('reminder_agent_calls_total', 'counter',
+                      "Calls to public MedicineReminderAgent methods")
+    registry.describe('reminder_agent_errors_total', 'counter',
+                      "Agent method calls that raised an exception")
+    registry.describe('reminder_agent_call_duration_seconds', 'histogram',
+                      "Duration of public MedicineReminderAgent methods")
+    registry.describe('reminder_tts_requests_total', 'counter',
+                      "Audio requests by result (cache_hit, synthesized, unavailable, error)")
+    registry.describe('reminder_tts_synthesis_seconds', 'histogram',
+                      "Time spent synthesizing audio on a cache miss")
+    registry.describe('reminder_tts_backend_errors_total', 'counter',
+                      "Failed synthesis attempts by backend (the next backend is tried)")
+    registry.describe('reminder_trigger_lateness_seconds', 'histogram',
+                      "Actual fire time minus the scheduled minute", LATENESS_BUCKETS)
+
+
+# Process-wide registry shared by all agents unless one is passed in
+METRICS = MetricsRegistry()
+_describe_agent_metrics(METRICS)
+
+
+def instrumented(method: Callable) -> Callable:
+    """
+    Record call count, errors and latency of an agent method
+    
+    Metrics go to the agent's registry (agent.metrics); nothing is
+    recorded when it is None or disabled.
+    """
+    labels = (('method', method.__name__),)
+    
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = self.metrics
+        if metrics is None or not metrics.enabled:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException:
+            metrics.record_call(labels, time.perf_counter() - start, failed=True)
+            raise
+        metrics.record_call(labels, time.perf_counter() - start)
+        return result
+    
+    return wrapper
+
+
+class MedicineReminderAgent:
+    """
+    Smart Medicine Reminder Agent for Indian Families
+    
+    Features:
+    - Multilingual reminder support (Hindi, English, mixed)
+    - Custom personalized messages
+    - Voice-based reminders using TTS
+    - Easy schedule management
+    - Export/Import functionality
+    """
+    
+    def __init__(self, tts_cache: Optional[TTSCache] = None,
+                 store: Optional["ReminderStore"] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 sinks: Optional[List[EventSink]] = None,
+                 tts_backends: Optional[List[TTSBackend]] = None):
+        """
+        Initialize the reminder agent
+        
+        Args:
+            tts_cache: Audio cache used by generate_tts. If None, a cache in
+                the "tts_cache" folder is used. Set agent.tts_cache = None
+                to always synthesize fresh audio.
+            store: Optional storage backend (see reminder_storage). When
+                given, reminders are loaded from it and every change is
+                written through to it.
+            metrics: Registry for call counts, latencies and trigger
+                lateness. If None, the process-wide METRICS registry is
+                used. Set agent.metrics = None to record nothing.
+            sinks: Event sinks that receive what the agent does. If None,
+                events are printed by a ConsoleSink; pass [] for a silent
+                agent.
+            tts_backends: Speech engines in order of preference; each miss
+                falls back to the next. If None, they are read from the
+                MEDICINE_REMINDER_TTS environment variable (see
+                tts_backends_from_config).
+        """
+        self.sinks: List[EventSink] = list(sinks) if sinks is not None else [ConsoleSink()]
+        if metrics is not None:
+            _describe_agent_metrics(metrics)
+        self.metrics: Optional[MetricsRegistry] = metrics if metrics is not None else METRICS
+        self.reminders: List[Reminder] = []
+        self.reminder_id_counter = 1
+        self.tts_cache: Optional[TTSCache] = tts_cache if tts_cache is not None else TTSCache()
+        self.tts_backends: List[TTSBackend] = (list(tts_backends) if tts_backends is not None
+                                               else tts_backends_from_config())
+        # A backend that just failed (e.g. gTTS while offline) is tried
+        # last for this many seconds, so it does not delay every trigger
+        self.tts_retry_seconds = 60.0
+        # backend name -> time.monotonic() of its last failure
+        self._tts_failed_at: Dict[str, float] = {}
+        # reminder id -> path of the audio last generated for it
+        self.audio_files: Dict[int, str] = {}
+        self.prerenderer: Optional[TTSPrerenderer] = None
+        # Created by the first play_reminders() call
+        self.playback: Optional[PlaybackQueue] = None
+        # Concurrency limit for generate_tts_batch
+        self.tts_max_workers = 4
+        # Deleted reminders moved out of self.reminders by compaction
+        self.archive: List[Reminder] = []
+        self._tombstones = 0
+        # Compact once this many deleted reminders sit in self.reminders,
+        # or once they make up tombstone_ratio of it (and at least
+        # tombstone_min of them)
+        self.tombstone_limit = 1000
+        self.tombstone_ratio = 0.5
+        self.tombstone_min = 32
+        
+        # reminder id -> reminder, kept in step with self.reminders
+        self._by_id: Dict[int, Reminder] = {}
+        # minute-of-day -> {reminder id: reminder}, active reminders only
+        self._time_index: Dict[int, Dict[int, Reminder]] = {}
+        # Occupied minutes of _time_index in order, for range checks
+        self._slot_minutes: List[int] = []
+        
+        # Materialized views, updated on every mutation. _generation bumps
+        # whenever any of them (or a visible field) changes.
+        self._generation = 0
+        # id -> active reminder, in list order
+        self._active: Dict[int, Reminder] = {}
+        # "HH:MM" -> number of active reminders at that time
+        self._time_counts: Dict[str, int] = {}
+        # id -> {'name', 'time'} of each active reminder, in _active order.
+        # Entries are replaced, never changed, as stats snapshots share them
+        self._medicines: Dict[int, Dict[str, str]] = {}
+        # Active reminders sorted by (minute, id), with their keys for bisect
+        self._sorted_keys: List[Tuple[int, int]] = []
+        self._sorted_active: List[Reminder] = []
+        # While bulk loading, reminders for the sorted view are collected
+        # here and sorted once at the end instead of inserted one by one
+        self._bulk_sorted: Optional[List[Reminder]] = None
+        self._stats_cache: Optional[Tuple[int, Dict]] = None
+        
+        # Scheduler state: heap of (next fire time, minute-of-day), one entry
+        # per occupied minute. Built lazily on the first next_due() call.
+        self.clock: Callable[[], datetime] = datetime.now
+        self._due_heap: List[Tuple[datetime, int]] = []
+        self._heap_minutes: set = set()
+        self._heap_reference: Optional[datetime] = None
+        self._wakeup = threading.Event()
+        self._stop_requested = False
+        # Heap of (last occurrence, id) for reminders on a finite rule
+        # ("once", "7_days"), so finished courses can be retired cheaply
+        self._expiry_heap: List[Tuple[datetime, int]] = []
+        # End of the range the last trigger_due() (or clock-driven
+        # check_and_trigger_reminders()) covered; the next one picks up
+        # from here, so delayed or suspended loops miss nothing
+        self._last_checked: Optional[datetime] = None
+        # Occurrences older than this are skipped rather than caught up on
+        self.max_catch_up: Optional[timedelta] = timedelta(days=1)
+        # reminder id -> fire time of its latest triggered occurrence; an
+        # occurrence fires only if it is later, so none fires twice
+        self._last_fired: Dict[int, datetime] = {}
+        
+        self.store = store
+        if store is not None:
+            self._replace_reminders(store.load())
+            self._maybe_compact_tombstones()
+    
+    def _emit(self, kind: str, **data):
+        """Send one event to the sinks (free when there are none)"""
+        if self.sinks:
+            event = ReminderEvent(kind, data)
+            for sink in self.sinks:
+                sink.emit(event)
+    
+    def _emit_batch(self, events: List[ReminderEvent]):
+        """Send several events to each sink in one write"""
+        for sink in self.sinks:
+            sink.write(events)
+    
+    def _index_reminder(self, reminder: Reminder):
+        """Add an active reminder to the trigger index and views"""
+        if not reminder.active:
+            return
+        self._generation += 1
+        time_text = reminder['time']
+        self._time_counts[time_text] = self._time_counts.get(time_text, 0) + 1
+        self._medicines[reminder.id] = {'name': reminder['medicine_name'], 'time': time_text}
+        if self._bulk_sorted is not None:
+            self._bulk_sorted.append(reminder)
+        else:
+            key = (reminder.minute, reminder.id)
+            position = bisect.bisect_left(self._sorted_keys, key)
+            self._sorted_keys.insert(position, key)
+            self._sorted_active.insert(position, reminder)
+        
+        if reminder.minute < 0:
+            return
+        rule = reminder.rule
+        if rule.is_finite:
+            last = rule.last_occurrence(reminder.anchor)
+            if last is not None:
+                heapq.heappush(self._expiry_heap, (last, reminder.id))
+        
+        for minute in rule.slot_minutes(reminder.minute):
+            bucket = self._time_index.get(minute)
+            if bucket is None:
+                bucket = self._time_index[minute] = {}
+                bisect.insort(self._slot_minutes, minute)
+            bucket[reminder.id] = reminder
+            if self._heap_reference is not None and minute not in self._heap_minutes:
+                now = max(self._heap_reference, self.clock())
+                heapq.heappush(self._due_heap, (next_fire_time(minute, now), minute))
+                self._heap_minutes.add(minute)
+                self._wakeup.set()
+    
+    def _unindex_reminder(self, reminder: Reminder):
+        """Remove a reminder from the trigger index and views"""
+        key = (reminder.minute, reminder.id)
+        position = bisect.bisect_left(self._sorted_keys, key)
+        if position >= len(self._sorted_keys) or self._sorted_active[position] is not reminder:
+            return
+        self._generation += 1
+        del self._sorted_keys[position]
+        del self._sorted_active[position]
+        time_text = reminder['time']
+        remaining = self._time_counts.get(time_text, 0) - 1
+        if remaining > 0:
+            self._time_counts[time_text] = remaining
+        else:
+            self._time_counts.pop(time_text, None)
+        
+        if reminder.minute < 0:
+            return
+        for minute in reminder.rule.slot_minutes(reminder.minute):
+            bucket = self._time_index.get(minute)
+            if bucket is None:
+                continue
+            bucket.pop(reminder.id, None)
+            if not bucket:
+                del self._time_index[minute]
+                del self._slot_minutes[bisect.bisect_left(self._slot_minutes, minute)]
+    
+    def _replace_reminders(self, records: List[Dict]):
+        """Swap in a whole new reminder list and rebuild derived state"""
+        self.reminders = [r if isinstance(r, Reminder) else Reminder.from_dict(r)
+                          for r in records]
+        self.archive = []
+        self._rebuild_indexes()
+        
+        # Update counter to avoid ID conflicts
+        if self.reminders:
+            max_id = max(r['id'] for r in self.reminders)
+            self.reminder_id_counter = max_id + 1
+    
+    def _clear_indexes(self):
+        """Reset all lookup indexes and views to empty"""
+        self._by_id = {}
+        self._tombstones = 0
+        self._generation += 1
+        self._active = {}
+        self._time_counts = {}
+        self._medicines = {}
+        self._sorted_keys = []
+        self._sorted_active = []
+        self._time_index = {}
+        self._slot_minutes = []
+        self._due_heap = []
+        self._heap_minutes = set()
+        self._heap_reference = None
+        self._expiry_heap = []
+        self._last_fired = {}
+        self._wakeup.set()
+    
+    def _add_to_indexes(self, reminder: Reminder):
+        """Register a loaded reminder in the id map and trigger index"""
+        # With duplicate ids in an imported file, the first active one wins
+        existing = self._by_id.get(reminder.id)
+        if existing is None or (not existing.active and reminder.active):
+            self._by_id[reminder.id] = reminder
+        if reminder.active:
+            self._active[reminder.id] = reminder
+        else:
+            self._tombstones += 1
+        self._index_reminder(reminder)
+    
+    def _rebuild_indexes(self):
+        """Rebuild all lookup indexes from self.reminders"""
+        self._clear_indexes()
+        self._bulk_sorted = []
+        try:
+            for reminder in self.reminders:
+                self._add_to_indexes(reminder)
+        finally:
+            self._finish_bulk_index()
+    
+    def _finish_bulk_index(self):
+        """Sort the reminders collected during a bulk load into the sorted view"""
+        pending, self._bulk_sorted = self._bulk_sorted, None
+        pending.sort(key=lambda r: (r.minute, r.id))
+        self._sorted_active = pending
+        self._sorted_keys = [(r.minute, r.id) for r in pending]
+        
+    @instrumented
+    def add_reminder(self, 
+                    medicine_name: str, 
+                    reminder_time: str, 
+                    custom_message: str,
+                    frequency: str = "daily") -> Reminder:
+        """
+        Add a new medicine reminder
+        
+        Args:
+            medicine_name: Name of the medicine
+            reminder_time: Time in HH:MM format (24-hour)
+            custom_message: Personalized reminder message in any language
+            frequency: How often: "daily", "once", "weekly", "7_days",
+                "every_8_hours", "mon,wed,fri" (see parse_frequency)
+            
+        Returns:
+            Reminder containing the details (supports dict-style access)
+        """
+        reminder = Reminder(
+            id=self.reminder_id_counter,
+            medicine_name=medicine_name,
+            time=reminder_time,
+            message=custom_message,
+            frequency=frequency,
+            active=True,
+            created_at=int(self.clock().timestamp())
+        )
+        
+        self.reminders.append(reminder)
+        self._by_id[reminder['id']] = reminder
+        self._active[reminder['id']] = reminder
+        self._index_reminder(reminder)
+        self.reminder_id_counter += 1
+        if self.store is not None:
+            self.store.add(reminder)
+        if self.prerenderer is not None:
+            self.prerenderer.request(reminder['id'])
+        
+        self._emit('reminder_added', id=reminder.id, reminder=reminder)
+        return reminder
+    
+    @instrumented
+    def view_reminders(self) -> List[Dict]:
+        """
+        View all active reminders as a formatted list
+        
+        Returns:
+            List of active reminder dictionaries
+        """
+        active_reminders = list(self._active.values())
+        # A ConsoleSink prints this as a table
+        self._emit('reminders_listed', reminders=active_reminders,
+                   total=len(self.reminders) + len(self.archive))
+        return active_reminders
+    
+    @instrumented
+    def sorted_reminders(self) -> List[Reminder]:
+        """
+        Get active reminders sorted by time (then ID)
+        
+        Served from a list kept sorted as reminders change, so no sorting
+        happens here.
+        
+        Returns:
+            List of active reminders
+        """
+        return list(self._sorted_active)
+    
+    @property
+    def generation(self) -> int:
+        """Counter that changes whenever the schedule changes"""
+        return self._generation
+    
+    @instrumented
+    def get_reminder_by_id(self, reminder_id: int) -> Optional[Dict]:
+        """
+        Get a specific reminder by ID
+        
+        Args:
+            reminder_id: ID of the reminder
+            
+        Returns:
+            Reminder dictionary if found, None otherwise
+        """
+        reminder = self._by_id.get(reminder_id)
+        if reminder is not None and reminder['active']:
+            return reminder
+        return None
+    
+    @instrumented
+    def delete_reminder(self, reminder_id: int) -> bool:
+        """
+        Delete a reminder by ID
+        
+        Args:
+            reminder_id: ID of the reminder to delete
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        reminder = self.get_reminder_by_id(reminder_id)
+        if reminder is not None:
+            self._deactivate(reminder)
+            self._emit('reminder_deleted', id=reminder_id, reminder=reminder)
+            self._maybe_compact_tombstones()
+            return True
+        
+        self._emit('reminder_not_found', id=reminder_id)
+        return False
+    
+    def _deactivate(self, reminder: Reminder):
+        """Soft-delete a reminder: drop it from the indexes and persist"""
+        self._unindex_reminder(reminder)
+        self._active.pop(reminder.id, None)
+        self._medicines.pop(reminder.id, None)
+        self._last_fired.pop(reminder.id, None)
+        reminder['active'] = False
+        self._tombstones += 1
+        if self.store is not None:
+            self.store.update(reminder)
+    
+    def _maybe_compact_tombstones(self):
+        """Compact if deleted reminders have piled up in the hot list"""
+        if self._tombstones < self.tombstone_min:
+            return
+        if (self._tombstones >= self.tombstone_limit or
+                self._tombstones >= self.tombstone_ratio * len(self.reminders)):
+            self.compact_tombstones()
+    
+    @instrumented
+    def compact_tombstones(self) -> int:
+        """
+        Move deleted reminders out of self.reminders into self.archive
+        
+        Scans and the id map then only pay for live reminders. Archived
+        reminders are still counted in get_statistics and included in
+        exports.
+        
+        Returns:
+            Number of reminders archived
+        """
+        live = []
+        moved = 0
+        for reminder in self.reminders:
+            if reminder.active:
+                live.append(reminder)
+                continue
+            self.archive.append(reminder)
+            if self._by_id.get(reminder.id) is reminder:
+                del self._by_id[reminder.id]
+            moved += 1
+        self.reminders = live
+        self._tombstones = 0
+        return moved
+    
+    def _all_reminders(self) -> List[Reminder]:
+        """All reminders, archived ones included, in id order"""
+        if not self.archive:
+            return self.reminders
+        return sorted(self.reminders + self.archive, key=lambda r: r.id)
+    
+    @instrumented
+    def edit_reminder(self, 
+                     reminder_id: int, 
+                     medicine_name: Optional[str] = None,
+                     reminder_time: Optional[str] = None,
+                     custom_message: Optional[str] = None,
+                     frequency: Optional[str] = None) -> bool:
+        """
+        Edit an existing reminder
+        
+        Args:
+            reminder_id: ID of reminder to edit
+            medicine_name: New medicine name (optional)
+            reminder_time: New time (optional)
+            custom_message: New message (optional)
+            frequency: New frequency (optional)
+            
+        Returns:
+            True if edited, False if not found
+        """
+        reminder = self.get_reminder_by_id(reminder_id)
+        if reminder is not None:
+            if medicine_name:
+                reminder['medicine_name'] = medicine_name
+                self._medicines[reminder_id] = {'name': medicine_name, 'time': reminder['time']}
+            if reminder_time or frequency:
+                # The frequency decides which slots a reminder occupies
+                self._unindex_reminder(reminder)
+                if reminder_time:
+                    reminder['time'] = reminder_time
+                if frequency:
+                    reminder['frequency'] = frequency
+                # Courses and intervals count from the new schedule
+                reminder['scheduled_at'] = int(self.clock().timestamp())
+                self._index_reminder(reminder)
+            if custom_message and custom_message != reminder['message']:
+                reminder['message'] = custom_message
+                self.audio_files.pop(reminder_id, None)
+                if self.prerenderer is not None:
+                    self.prerenderer.request(reminder_id)
+            self._generation += 1
+            if self.store is not None:
+                self.store.update(reminder)
+                
+            self._emit('reminder_edited', id=reminder_id, reminder=reminder)
+            return True
+        
+        self._emit('reminder_not_found', id=reminder_id)
+        return False
+    
+    @instrumented
+    def generate_tts(self, message: str, filename: str = "reminder.mp3") -> Optional[str]:
+        """
+        Generate TTS audio from message
+        
+        When the agent has a TTS cache, audio is looked up by content and
+        only synthesized on a miss; the cached file path is returned and
+        filename is not written. Without a cache, the extension of filename
+        is replaced by that of the backend that produced the audio.
+        
+        Args:
+            message: Text to convert to speech
+            filename: Output audio filename (used when there is no cache)
+            
+        Returns:
+            Audio file path if successful, None otherwise
+        """
+        try:
+            audio, cached = self._synthesize(message, filename)
+        except TTSUnavailableError:
+            self._emit('tts_unavailable', message=message)
+            return None
+        except Exception as e:
+            self._emit('tts_error', error=str(e))
+            return None
+        
+        self._emit('tts_ready', path=audio, cached=cached)
+        return audio
+    
+    def _synthesize(self, message: str, filename: str) -> Tuple[str, bool]:
+        """
+        Produce audio for a message, raising on failure
+        
+        Cached audio from any configured backend is used first. On a miss
+        the backends are tried in order of preference, skipping ones that
+        are not installed; backends that failed recently go last.
+        
+        Returns:
+            Tuple of (audio file path, whether it came from the cache)
+        """
+        metrics = self.metrics
+        cache = self.tts_cache
+        backends = self.tts_backends
+        keys = [TTSCache.make_key(message, backend.lang, backend.slow, backend.name)
+                for backend in backends]
+        if cache is not None:
+            for key in keys:
+                cached = cache.get(key)
+                if cached:
+                    if metrics is not None:
+                        metrics.inc('reminder_tts_requests_total', (('result', 'cache_hit'),))
+                    return cached, True
+        
+        now = time.monotonic()
+        candidates = sorted(
+            (pair for pair in zip(backends, keys) if pair[0].is_available()),
+            key=lambda pair: (now - self._tts_failed_at.get(pair[0].name, -math.inf)
+                              < self.tts_retry_seconds))
+        if not candidates:
+            if metrics is not None:
+                metrics.inc('reminder_tts_requests_total', (('result', 'unavailable'),))
+            raise TTSUnavailableError("TTS not available")
+        
+        for backend, key in candidates:
+            start = time.perf_counter()
+            try:
+                if cache is None:
+                    target = os.path.splitext(filename)[0] + backend.extension
+                    backend.synthesize(message, target)
+                else:
+                    scratch = cache.temp_path(key, backend.extension)
+                    backend.synthesize(message, scratch)
+                    target = cache.put(key, scratch, backend.extension)
+            except Exception as e:
+                error = e
+                self._tts_failed_at[backend.name] = time.monotonic()
+                if metrics is not None:
+                    metrics.inc('reminder_tts_backend_errors_total', (('backend', backend.name),))
+                continue
+            self._tts_failed_at.pop(backend.name, None)
+            if metrics is not None:
+                metrics.inc('reminder_tts_requests_total', (('result', 'synthesized'),))
+                metrics.observe('reminder_tts_synthesis_seconds', time.perf_counter() - start,
+                                (('backend', backend.name),))
+            return target, False
+        
+        if metrics is not None:
+            metrics.inc('reminder_tts_requests_total', (('result', 'error'),))
+        raise error
+    
+    @instrumented
+    def generate_tts_batch(self,
+                           reminders: List[Dict],
+                           max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Generate TTS audio for several reminders concurrently
+        
+        Synthesis is network/IO bound, so a thread pool lets all messages
+        of a busy time slot render at once instead of one after another.
+        
+        Args:
+            reminders: Reminder dictionaries to render
+            max_workers: Concurrency limit (defaults to agent.tts_max_workers)
+            
+        Returns:
+            One result per reminder, in order, with keys 'id', 'audio',
+            'ok' and 'error'
+        """
+        def render(reminder: Dict) -> Dict:
+            try:
+                audio, _ = self._synthesize(reminder['message'],
+                                            f"reminder_{reminder['id']}.mp3")
+            except Exception as e:
+                return {'id': reminder['id'], 'audio': None, 'ok': False, 'error': str(e)}
+            self.audio_files[reminder['id']] = audio
+            return {'id': reminder['id'], 'audio': audio, 'ok': True, 'error': None}
+        
+        if max_workers is None:
+            max_workers = self.tts_max_workers
+        
+        if len(reminders) <= 1 or max_workers <= 1:
+            results = [render(reminder) for reminder in reminders]
+        else:
+            # Imported here: concurrent.futures costs ~10 ms at startup
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(reminders)),
+                                    thread_name_prefix="tts") as pool:
+                results = list(pool.map(render, reminders))
+        
+        if self.sinks and results:
+            events = [ReminderEvent('tts_ready', {'id': r['id'], 'path': r['audio']})
+                      for r in results if r['ok']]
+            events.append(ReminderEvent('tts_batch_done', {'ready': len(events),
+                                                           'total': len(results)}))
+            events.extend(ReminderEvent('tts_error', {'id': r['id'], 'error': r['error']})
+                          for r in results if not r['ok'])
+            self._emit_batch(events)
+        return results
+    
+    @instrumented
+    def prerender_reminder(self, reminder: Dict) -> Optional[str]:
+        """
+        Render and remember the audio for one reminder
+        
+        Args:
+            reminder: Reminder dictionary
+            
+        Returns:
+            Audio file path if successful, None otherwise
+        """
+        audio = self.generate_tts(reminder['message'], f"reminder_{reminder['id']}.mp3")
+        if audio:
+            self.audio_files[reminder['id']] = audio
+        return audio
+    
+    @instrumented
+    def prerender_upcoming(self, hours: float = 3, now: Optional[datetime] = None) -> int:
+        """
+        Render audio ahead of time for reminders due within the next N hours
+        
+        Args:
+            hours: Look-ahead window in hours
+            now: Reference time. If None, uses the agent clock.
+            
+        Returns:
+            Number of reminders with audio ready
+        """
+        if now is None:
+            now = self.clock()
+        start = now.hour * 60 + now.minute
+        window = hours * 60
+        
+        # Copy the index first: this runs on the pre-render thread while the
+        # main thread may be adding or deleting reminders
+        due = []
+        for minute, bucket in list(self._time_index.items()):
+            if (minute - start) % (24 * 60) < window:
+                due.extend(list(bucket.values()))
+        
+        results = self.generate_tts_batch(due)
+        return sum(1 for result in results if result['ok'])
+    
+    def start_prerender(self, hours: float = 3, interval: float = 15 * 60) -> TTSPrerenderer:
+        """
+        Start rendering audio in the background ahead of due times
+        
+        Args:
+            hours: Look-ahead window in hours
+            interval: Seconds between full passes over the window
+            
+        Returns:
+            The running TTSPrerenderer
+        """
+        for backend in self.tts_backends:
+            backend.warm()
+        if self.prerenderer is None:
+            self.prerenderer = TTSPrerenderer(self, hours, interval)
+        self.prerenderer.start()
+        return self.prerenderer
+    
+    def stop_prerender(self):
+        """Stop the background pre-render worker"""
+        if self.prerenderer is not None:
+            self.prerenderer.stop()
+    
+    @instrumented
+    def play_reminders(self, reminders: List[Dict], repeat_count: int = 1,
+                       repeat_interval: float = 0.0) -> List[int]:
+        """
+        Play the audio of triggered reminders without blocking
+        
+        Each reminder plays its own rendered file (agent.audio_files).
+        Playback and repeats run on agent.playback, so this returns at
+        once and overlapping reminders do not wait for each other.
+        
+        Args:
+            reminders: Reminder dictionaries, e.g. from trigger_due()
+            repeat_count: Times to play each reminder
+            repeat_interval: Seconds between plays
+            
+        Returns:
+            Playback handles (see PlaybackQueue.cancel)
+        """
+        if self.playback is None:
+            self.playback = PlaybackQueue(emit=self._emit)
+        handles = []
+        for reminder in reminders:
+            audio = self.audio_files.get(reminder['id'])
+            if audio is None:
+                self._emit('playback_missing', id=reminder['id'], message=reminder['message'])
+                continue
+            handles.append(self.playback.play(audio, repeat_count, repeat_interval,
+                                              reminder_id=reminder['id']))
+        return handles
+    
+    @instrumented
+    def check_and_trigger_reminders(self, current_time: Optional[str] = None) -> List[Dict]:
+        """
+        Check if any reminders need to be triggered
+        
+        Without current_time, everything due since the previous check is
+        triggered (see trigger_due), so a check that runs late still fires
+        the minutes it skipped, and an occurrence fires only once however
+        often its minute is checked.
+        
+        An explicit current_time is a manual or simulated check: it fires
+        the reminders of that minute every time it is called and does not
+        count as the occurrence having fired (nor retire a finished
+        course), so the real scheduler still fires it when it comes around.
+        
+        Args:
+            current_time: Time to check (HH:MM format). If None, uses the
+                agent clock.
+            
+        Returns:
+            List of triggered reminders
+        """
+        if current_time is None:
+            return self._trigger_since_last_check(self.clock())
+        
+        minute = time_to_minute(current_time)
+        if minute is None:
+            return []
+        return self._trigger_slot(minute, next_fire_time(minute, self.clock()), record=False)
+    
+    @instrumented
+    def trigger_range(self, start: datetime, end: datetime) -> List[Dict]:
+        """
+        Trigger every occurrence with start < fire time <= end
+        
+        Occupied minutes are found by bisecting the sorted slot list, so a
+        range costs O(log n + k) per day it spans, for k occurrences.
+        Occurrences that already fired are skipped; a reminder never fires
+        for a time at or before its latest fired occurrence, so ranges
+        should move forward in time.
+        
+        Args:
+            start: Range start (exclusive)
+            end: Range end (inclusive)
+            
+        Returns:
+            List of triggered reminders, in fire-time order
+        """
+        return self._trigger_range(start, end, end)
+    
+    def _trigger_range(self, start: datetime, end: datetime,
+                       now: Optional[datetime]) -> List[Dict]:
+        """Trigger the occurrences in (start, end], oldest first"""
+        triggered = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day <= end and self._slot_minutes:
+            minutes = self._slot_minutes
+            first = 0
+            if day <= start:
+                first = bisect.bisect_right(minutes, (start - day).total_seconds() / 60)
+            last = bisect.bisect_right(minutes, (end - day).total_seconds() / 60)
+            # Slice copy: triggering can retire reminders and empty slots
+            for minute in minutes[first:last]:
+                triggered.extend(self._trigger_slot(minute, day + timedelta(minutes=minute), now))
+            day += timedelta(days=1)
+        return triggered
+    
+    def _trigger_since_last_check(self, now: datetime) -> List[Dict]:
+        """Trigger the occurrences in (last check, now] and move the mark to now"""
+        start = self._last_checked
+        if start is None or now < start:
+            # First check, or the clock moved back: cover this minute only
+            start = now.replace(second=0, microsecond=0) - timedelta(microseconds=1)
+        if self.max_catch_up is not None:
+            start = max(start, now - self.max_catch_up)
+        self._last_checked = now
+        return self._trigger_range(start, now, now)
+    
+    def _fires_at(self, reminder: Reminder, fire: datetime) -> bool:
+        """Check a reminder's recurrence rule for one slot time"""
+        rule = reminder.rule
+        if rule is DAILY_RULE:
+            return True
+        return rule.occurs_at(reminder.anchor, fire)
+    
+    def _trigger_slot(self, minute: int, fire: datetime,
+                      now: Optional[datetime] = None, record: bool = True) -> List[Dict]:
+        """
+        Trigger the reminders in one minute slot that recur at `fire`
+        
+        When `now` (the real time of the check) is given, how late the
+        slot fired is recorded in the metrics. With record=False (manual
+        checks) occurrences that already fired are not skipped, the firing
+        is not remembered and finished courses are not retired.
+        """
+        due = self._time_index.get(minute, {})
+        last_fired = self._last_fired
+        triggered = []
+        for reminder in list(due.values()):
+            if not self._fires_at(reminder, fire):
+                continue
+            if record:
+                last = last_fired.get(reminder.id)
+                if last is not None and fire <= last:
+                    continue
+                last_fired[reminder.id] = fire
+            triggered.append(reminder)
+        
+        if triggered and self.sinks:
+            current_time = fire.strftime("%H:%M")
+            self._emit_batch([ReminderEvent('triggered', {'reminder': reminder, 'time': current_time,
+                                                          'fire': fire})
+                              for reminder in triggered])
+        
+        if triggered and now is not None and self.metrics is not None:
+            self.metrics.observe('reminder_trigger_lateness_seconds',
+                                 (now - fire).total_seconds())
+        
+        # Generate TTS for the whole slot at once (cache hits when the
+        # audio was pre-rendered)
+        if triggered:
+            self.generate_tts_batch(triggered)
+        
+        # Courses that just had their last dose are done
+        for reminder in (triggered if record else ()):
+            rule = reminder.rule
+            if rule.is_finite:
+                last = rule.last_occurrence(reminder.anchor)
+                if last is not None and fire >= last:
+                    self._retire(reminder)
+        
+        return triggered
+    
+    def _retire(self, reminder: Reminder):
+        """Deactivate a reminder whose course has finished"""
+        self._deactivate(reminder)
+        self._emit('course_finished', id=reminder.id, reminder=reminder)
+        self._maybe_compact_tombstones()
+    
+    @instrumented
+    def retire_finished(self, now: Optional[datetime] = None) -> int:
+        """
+        Deactivate reminders whose finite course ("once", "7_days") is over
+        
+        Finished courses leave the trigger index and views, so they no
+        longer cost anything on each check. Costs O(log n) per retired
+        reminder.
+        
+        Args:
+            now: Reference time. If None, uses the agent clock.
+            
+        Returns:
+            Number of reminders retired
+        """
+        if now is None:
+            now = self.clock()
+        cutoff = now.replace(second=0, microsecond=0)
+        retired = 0
+        while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+            last, reminder_id = heapq.heappop(self._expiry_heap)
+            reminder = self._by_id.get(reminder_id)
+            # Entries go stale when a reminder is edited or deleted
+            if reminder is None or not reminder.active:
+                continue
+            if reminder.rule.last_occurrence(reminder.anchor) != last:
+                continue
+            self._retire(reminder)
+            retired += 1
+        return retired
+    
+    def expand_occurrences(self, start: datetime, end: datetime,
+                           batch_size: int = 500) -> Iterator[List[Tuple[datetime, Reminder]]]:
+        """
+        Expand every reminder's recurrence rule over a time range
+        
+        Walks the occupied minute slots day by day and applies each
+        reminder's rule, so weekly, weekday, N-day and N-hour reminders
+        appear only when they actually fire.
+        
+        Do not change the schedule while iterating.
+        
+        Args:
+            start: Range start (its minute counts)
+            end: Range end (exclusive)
+            batch_size: Maximum occurrences per yielded batch
+            
+        Yields:
+            Lists of (fire time, reminder), in fire-time order
+        """
+        minutes = list(self._slot_minutes)
+        if not minutes:
+            return
+        start = start.replace(second=0, microsecond=0)
+        midnight = start.replace(hour=0, minute=0)
+        batch = []
+        while midnight < end:
+            for minute in minutes:
+                fire = midnight + timedelta(minutes=minute)
+                if fire < start:
+                    continue
+                if fire >= end:
+                    break
+                for reminder in self._time_index[minute].values():
+                    if self._fires_at(reminder, fire):
+                        batch.append((fire, reminder))
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+            midnight += timedelta(days=1)
+        if batch:
+            yield batch
+    
+    @instrumented
+    def scheduled_minutes(self) -> List[int]:
+        """
+        Get the minutes of the day that have at least one active reminder
+        
+        Returns:
+            Minute-of-day values, unordered
+        """
+        return list(self._time_index)
+    
+    @instrumented
+    def next_due(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Get the time the next reminder is due
+        
+        Args:
+            now: Reference time. If None, uses the agent clock.
+            
+        Returns:
+            Datetime of the next due reminder (may be in the past if it has
+            not been triggered yet), or None if nothing is scheduled
+        """
+        if now is None:
+            now = self.clock()
+        
+        if self._heap_reference is None or now < self._heap_reference:
+            # First use, or time moved backwards: rebuild from the index
+            self._due_heap = [(next_fire_time(m, now), m) for m in self._time_index]
+            heapq.heapify(self._due_heap)
+            self._heap_minutes = set(self._time_index)
+        self._heap_reference = now
+        
+        # Drop slots that were emptied by edits or deletes
+        while self._due_heap:
+            fire, minute = self._due_heap[0]
+            if minute in self._time_index:
+                return fire
+            heapq.heappop(self._due_heap)
+            self._heap_minutes.discard(minute)
+        return None
+    
+    @instrumented
+    def trigger_due(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Trigger every occurrence due since the previous check
+        
+        Evaluates the range (last check, now], so every occurrence in it
+        fires exactly once: a loop that wakes late, or a machine that was
+        suspended, catches up on the minutes it missed (up to
+        max_catch_up back), and calling this twice in one minute fires
+        nothing the second time.
+        
+        Args:
+            now: Reference time. If None, uses the agent clock.
+            
+        Returns:
+            List of triggered reminders, in fire-time order
+        """
+        if now is None:
+            now = self.clock()
+        
+        triggered = self._trigger_since_last_check(now)
+        
+        # Move the slots that came due past now in the sleep heap
+        while True:
+            fire = self.next_due(now)
+            if fire is None or fire > now:
+                break
+            minute = self._due_heap[0][1]
+            heapq.heapreplace(self._due_heap,
+                              (next_fire_time(minute, now + timedelta(minutes=1)), minute))
+        self.retire_finished(now)
+        return triggered
+    
+    def _seconds_until_next(self, now: datetime, deadline: Optional[datetime],
+                            max_sleep: Optional[float]) -> Optional[float]:
+        """Work out how long the scheduler can sleep after a tick"""
+        fire = self.next_due(now)
+        wake = fire
+        if deadline is not None and (wake is None or deadline < wake):
+            wake = deadline
+        delay = None if wake is None else max((wake - now).total_seconds(), 0.0)
+        if max_sleep is not None and (delay is None or delay > max_sleep):
+            delay = max_sleep
+        return delay
+    
+    def run_until(self,
+                  deadline: Optional[datetime] = None,
+                  on_trigger: Optional[Callable[[List[Dict]], None]] = None,
+                  max_sleep: Optional[float] = None) -> List[Dict]:
+        """
+        Run the scheduler, sleeping until each reminder is due
+        
+        Adding or editing reminders from another thread wakes the loop so
+        it can pick up the new schedule.
+        
+        Args:
+            deadline: Stop once this time is reached. If None, runs until
+                stop_scheduler() is called.
+            on_trigger: Called with each batch of triggered reminders
+            max_sleep: Upper bound on a single sleep, in seconds
+            
+        Returns:
+            List of all reminders triggered while running
+        """
+        self._stop_requested = False
+        triggered = []
+        while not self._stop_requested:
+            self._wakeup.clear()
+            now = self.clock()
+            fired = self.trigger_due(now)
+            if fired:
+                triggered.extend(fired)
+                if on_trigger:
+                    on_trigger(fired)
+            if self._stop_requested or (deadline is not None and now >= deadline):
+                break
+            
+            self._wakeup.wait(self._seconds_until_next(now, deadline, max_sleep))
+        return triggered
+    
+    async def run_until_async(self,
+                              deadline: Optional[datetime] = None,
+                              on_trigger: Optional[Callable[[List[Dict]], None]] = None,
+                              max_sleep: Optional[float] = None) -> List[Dict]:
+        """
+        Awaitable version of run_until for asyncio applications
+        
+        Changes made while sleeping are picked up at the next wake-up, so
+        pass max_sleep if reminders may be added for the near future.
+        """
+        import asyncio  # already loaded by any caller; kept off module import
+        
+        self._stop_requested = False
+        triggered = []
+        while not self._stop_requested:
+            now = self.clock()
+            fired = self.trigger_due(now)
+            if fired:
+                triggered.extend(fired)
+                if on_trigger:
+                    on_trigger(fired)
+            if self._stop_requested or (deadline is not None and now >= deadline):
+                break
+            
+            delay = self._seconds_until_next(now, deadline, max_sleep)
+            await asyncio.sleep(3600 if delay is None else delay)
+        return triggered
+    
+    def stop_scheduler(self):
+        """Ask a running run_until loop to return"""
+        self._stop_requested = True
+        self._wakeup.set()
+    
+    @instrumented
+    def simulate_day(self, times_to_check: List[str]):
+        """
+        Simulate checking reminders at multiple times throughout a day
+        
+        Args:
+            times_to_check: List of times in HH:MM format
+        """
+        self._emit('simulation_started')
+        
+        for check_time in sorted(times_to_check):
+            self._emit('simulation_step', time=check_time)
+            triggered = self.check_and_trigger_reminders(check_time)
+            
+            if not triggered:
+                self._emit('simulation_idle', time=check_time)
+        
+        self._emit('simulation_finished')
+    
+    @instrumented
+    def export_schedule(self, filename: str = "medicine_schedule.json",
+                        include_deleted: bool = True):
+        """
+        Export reminder schedule to JSON file
+        
+        Args:
+            filename: Output JSON filename
+            include_deleted: Also write deleted (and archived) reminders
+        """
+        if include_deleted:
+            reminders = self._all_reminders()
+        else:
+            reminders = [r for r in self.reminders if r.active]
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump([r.to_dict() for r in reminders], f, ensure_ascii=False, indent=2)
+        self._emit('schedule_exported', filename=filename)
+    
+    @instrumented
+    def import_schedule(self, filename: str = "medicine_schedule.json", stream: bool = False,
+                        autocorrect: bool = False):
+        """
+        Import reminder schedule from JSON file
+        
+        Args:
+            filename: Input JSON filename
+            stream: Parse records one at a time (JSON array or JSON Lines),
+                validating each as it arrives. Keeps peak memory bounded
+                for very large files; invalid records are skipped.
+            autocorrect: Fix common spelling mistakes in the messages
+                (see AutoCorrector) as they are loaded
+        
+        The current schedule is only replaced once the whole file has
+        loaded; a missing or malformed file leaves it untouched.
+        """
+        try:
+            corrected = [0]
+            if stream:
+                records = iter_schedule_records(filename)
+                if autocorrect:
+                    records = self._autocorrect_records(records, corrected)
+                self._import_stream(filename, records)
+            else:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+                if autocorrect:
+                    records = list(self._autocorrect_records(records, corrected))
+                self._replace_reminders(records)
+            if corrected[0]:
+                self._emit('messages_corrected', count=corrected[0], filename=filename)
+            self._maybe_compact_tombstones()
+            if self.store is not None:
+                self.store.replace_all(self._all_reminders())
+            
+            self._emit('schedule_imported', filename=filename)
+        except FileNotFoundError:
+            self._emit('file_not_found', filename=filename)
+    
+    @staticmethod
+    def _autocorrect_records(records: Iterable, corrected: List[int],
+                             chunk_size: int = 1000) -> Iterator:
+        """
+        Yield records with their messages auto-corrected
+        
+        Records are corrected a chunk at a time through the batch API, so
+        streaming imports stay bounded in memory. Changed records are
+        copied; corrected[0] counts them.
+        """
+        def flush(chunk):
+            messages = [record['message'] for record in chunk if isinstance(record, dict)
+                        and isinstance(record.get('message'), str)]
+            fixed = iter(AUTO_CORRECTOR.correct_batch(messages))
+            for record in chunk:
+                if isinstance(record, dict) and isinstance(record.get('message'), str):
+                    message = next(fixed)
+                    if message != record['message']:
+                        record = dict(record, message=message)
+                        corrected[0] += 1
+                yield record
+        
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield from flush(chunk)
+                chunk = []
+        yield from flush(chunk)
+    
+    def _import_stream(self, filename: str, records: Optional[Iterable] = None):
+        """Load a schedule record by record, then swap it in"""
+        if records is None:
+            records = iter_schedule_records(filename)
+        # Only compact Reminder objects are kept while parsing; the
+        # schedule and indexes are replaced once the whole file has loaded
+        reminders = []
+        skipped = 0
+        for record in records:
+            try:
+                reminders.append(validate_reminder_record(record))
+            except ValueError:
+                skipped += 1
+        
+        self._replace_reminders(reminders)
+        if skipped:
+            self._emit('import_skipped', count=skipped, filename=filename)
+    
+    @instrumented
+    def get_statistics(self) -> Dict:
+        """
+        Get statistics about the reminder schedule
+        
+        The counts are cached until the schedule changes. Every call gets
+        its own dict, 'times' dict and 'medicines' list, so callers may
+        modify them; the entries of 'medicines' are shared between calls.
+        
+        Returns:
+            Dictionary containing various statistics
+        """
+        # Served from the materialized views; rebuilt only when the
+        # schedule has changed since the last call
+        cached = self._stats_cache
+        if cached is None or cached[0] != self._generation:
+            cached = self._stats_cache = (self._generation, self._build_statistics())
+        stats = cached[1]
+        return dict(stats, times=dict(stats['times']), medicines=list(stats['medicines']))
+    
+    def _build_statistics(self) -> Dict:
+        """Collect the statistics from the materialized views"""
+        active_count = len(self._active)
+        stats = {
+            'total_created': self.reminder_id_counter - 1,
+            'active': active_count,
+            'deleted': len(self.reminders) + len(self.archive) - active_count,
+            'times': dict(self._time_counts),
+            'medicines': list(self._medicines.values())
+        }
+        return stats
+    
+    def iter_upcoming(self, hours: float = 24,
+                      now: Optional[datetime] = None) -> Iterator[Tuple[datetime, Reminder]]:
+        """
+        Lazily yield reminder occurrences in the next N hours, in order
+        
+        The window starts at the current minute and runs for N hours,
+        wrapping past midnight; horizons longer than a day yield each
+        reminder once per day. Uses bisect on the sorted active list, so
+        finding the start costs O(log n) and each occurrence O(1).
+        
+        Days on which a reminder's frequency rule does not fire are
+        skipped. Every-N-hours reminders appear at their own time only;
+        use expand_occurrences() to list each dose.
+        
+        Do not change the schedule while iterating.
+        
+        Args:
+            hours: Number of hours to look ahead
+            now: Reference time. If None, uses the agent clock.
+            
+        Yields:
+            Tuples of (fire time, reminder)
+        """
+        if now is None:
+            now = self.clock()
+        window_start = now.replace(second=0, microsecond=0)
+        window_end = window_start + timedelta(hours=hours)
+        midnight = window_start.replace(hour=0, minute=0)
+        keys = self._sorted_keys
+        items = self._sorted_active
+        
+        # Reminders with an unparseable time sort first (minute -1); skip them
+        first = bisect.bisect_left(keys, (0, float('-inf')))
+        if first >= len(keys):
+            return
+        
+        day = 0
+        position = bisect.bisect_left(keys, (window_start.hour * 60 + window_start.minute,
+                                             float('-inf')))
+        while True:
+            if position >= len(keys):
+                day += 1
+                position = first
+            fire = midnight + timedelta(days=day, minutes=keys[position][0])
+            if fire >= window_end:
+                return
+            if self._fires_at(items[position], fire):
+                yield fire, items[position]
+            position += 1
+    
+    @instrumented
+    def get_upcoming_reminders(self, hours: float = 24,
+                               now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Get reminders scheduled within the next N hours
+        
+        Args:
+            hours: Number of hours to look ahead (wraps past midnight; a
+                reminder appears once per day for horizons over 24 hours)
+            now: Reference time. If None, uses the agent clock.
+            
+        Returns:
+            List of upcoming reminders sorted by fire time
+        """
+        return [reminder for _, reminder in self.iter_upcoming(hours, now)]
+
+
+# Sample usage demonstration
+if __name__ == "__main__":
+    print("🤖 Medicine Reminder Agent - Core Module")
+    print("=" * 60)
+    
+    # Create agent instance
+    agent = MedicineReminderAgent()
+    
+    # Add sample reminders
+    agent.add_reminder(
+        "Amlodipine (BP)",
+        "08:00",
+        "Are uncle, aapki BP ki dawai ka time ho gaya hai!"
+    )
+    
+    agent.add_reminder(
+        "Metformin (Diabetes)",
+        "08:30",
+        "Good morning! Time for your diabetes medicine."
+    )
+    
+    # View schedule
+    print("\n📅 Current Schedule:")
+    print(agent.view_reminders())
+    
+    # Get statistics
+    stats = agent.get_statistics()
+    print(f"\n📊 Statistics:")
+    print(f"   Active Reminders: {stats['active']}")
+    print(f"   Total Created: {stats['total_created']}")
+    
+    print("\n✅ Module demonstration complete!")
@@ -0,0 +1,510 @@
+"""
+Mobile App User Interface
+Medicine Reminder App using Kivy Framework
+
+Screens, the reminder list and the app class. Start the app with main.py,
+which reads the schedule before this module pulls in Kivy.
+"""
+
+from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.uix.textinput import TextInput
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.screenmanager import NoTransition, Screen, ScreenManager
+from kivy.clock import Clock
+from kivy.core.window import Window
+
+from medicine_reminder_core import CallbackSink, MedicineReminderAgent
+from datetime import datetime
+import bisect
+
+ROW_HEIGHT = 100
+
+
+class ReminderListItem(RecycleDataViewBehavior, BoxLayout):
+    """
+    Recycled row widget for one reminder
+    
+    Rows are created once for the visible area and re-bound to different
+    reminders as the list scrolls, so only the labels' text changes.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'horizontal'
+        self.size_hint_y = None
+        self.height = ROW_HEIGHT
+        self.padding = 10
+        self.spacing = 10
+        
+        self.reminder_id = None
+        
+        # Reminder info layout
+        info_layout = BoxLayout(orientation='vertical', size_hint_x=0.7)
+        
+        # Medicine name with white text
+        self.name_label = Label(
+            font_size='18sp',
+            halign='left',
+            valign='middle',
+            color=(1, 1, 1, 1)  # White text on black
+        )
+        
+        # Time with white text
+        self.time_label = Label(
+            font_size='16sp',
+            halign='left',
+            valign='middle',
+            color=(0.9, 0.9, 0.9, 1)  # Light gray
+        )
+        for label in (self.name_label, self.time_label):
+            label.bind(size=lambda widget, size: setattr(widget, 'text_size', (size[0], None)))
+        
+        info_layout.add_widget(self.name_label)
+        info_layout.add_widget(self.time_label)
+        
+        # Action buttons layout
+        button_layout = BoxLayout(orientation='horizontal', size_hint_x=0.3)
+        
+        # Edit button - Blue
+        edit_btn = Button(
+            text='✏️ Edit',
+            size_hint_x=0.5,
+            background_color=(0.1, 0.5, 0.9, 1),  # Bright blue
+            color=(1, 1, 1, 1)  # White text
+        )
+        edit_btn.bind(on_press=self.on_edit)
+        
+        # Delete button - Red
+        delete_btn = Button(
+            text='🗑️ Del',
+            size_hint_x=0.5,
+            background_color=(0.9, 0.1, 0.1, 1),  # Bright red
+            color=(1, 1, 1, 1)  # White text
+        )
+        delete_btn.bind(on_press=self.on_delete)
+        
+        button_layout.add_widget(edit_btn)
+        button_layout.add_widget(delete_btn)
+        
+        self.add_widget(info_layout)
+        self.add_widget(button_layout)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        """Bind this row to the reminder at `index`"""
+        self.reminder_id = data['reminder_id']
+        self.name_label.text = data['name_text']
+        self.time_label.text = data['time_text']
+        return super().refresh_view_attrs(rv, index, data)
+    
+    def on_edit(self, instance):
+        """Handle edit button press"""
+        app = App.get_running_app()
+        reminder = app.agent.get_reminder_by_id(self.reminder_id)
+        if reminder is not None:
+            app.show_edit_screen(reminder)
+    
+    def on_delete(self, instance):
+        """Handle delete button press"""
+        App.get_running_app().delete_reminder(self.reminder_id)
+
+
+class ReminderListView(RecycleView):
+    """
+    Virtualized reminder list kept in step with the agent by diffs
+    
+    self.data holds one small dict per reminder, sorted by (time, id) like
+    agent.sorted_reminders(). Agent events insert, update or remove single
+    rows; RecycleView then re-binds only the affected visible rows.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.viewclass = 'ReminderListItem'
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, ROW_HEIGHT),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=10
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        # (minute, id) of each row, parallel to self.data, for bisect
+        self._keys = []
+        self._key_by_id = {}
+    
+    @staticmethod
+    def _row(reminder):
+        return {
+            'reminder_id': reminder['id'],
+            'name_text': f"💊 {reminder['medicine_name']}",
+            'time_text': f"⏰ {reminder['time']}",
+        }
+    
+    @staticmethod
+    def _key(reminder):
+        return (reminder.minute, reminder.id)
+    
+    def set_reminders(self, reminders):
+        """Replace every row (initial load or a whole-schedule import)"""
+        self._keys = [self._key(r) for r in reminders]
+        self._key_by_id = {key[1]: key for key in self._keys}
+        self.data = [self._row(r) for r in reminders]
+    
+    def _position(self, reminder_id):
+        """Row index of a reminder, or None if it is not shown"""
+        key = self._key_by_id.get(reminder_id)
+        if key is None:
+            return None
+        return bisect.bisect_left(self._keys, key)
+    
+    def insert_reminder(self, reminder):
+        """Add one row at its sorted position"""
+        key = self._key(reminder)
+        position = bisect.bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._key_by_id[reminder.id] = key
+        self.data.insert(position, self._row(reminder))
+    
+    def remove_reminder(self, reminder_id):
+        """Remove the row for a reminder, if shown"""
+        position = self._position(reminder_id)
+        if position is None:
+            return
+        del self._keys[position]
+        del self._key_by_id[reminder_id]
+        del self.data[position]
+    
+    def update_reminder(self, reminder):
+        """Update a row in place, moving it if its time changed"""
+        if self._key_by_id.get(reminder.id) == self._key(reminder):
+            self.data[self._position(reminder.id)] = self._row(reminder)
+            return
+        self.remove_reminder(reminder.id)
+        self.insert_reminder(reminder)
+    
+    def apply_events(self, events):
+        """Apply agent events as row diffs"""
+        for event in events:
+            kind = event.kind
+            if kind == 'reminder_added':
+                self.insert_reminder(event.data['reminder'])
+            elif kind == 'reminder_edited':
+                self.update_reminder(event.data['reminder'])
+            elif kind in ('reminder_deleted', 'course_finished'):
+                self.remove_reminder(event.data['id'])
+
+
+class MainScreen(Screen):
+    """Home screen: header, add button and the reminder list (built once)"""
+    
+    def __init__(self, app, **kwargs):
+        super().__init__(**kwargs)
+        self.app = app
+        self.layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        
+        # Header with white text on black
+        header = Label(
+            text='💊 Medicine Reminder',
+            font_size='24sp',
+            size_hint_y=0.1,
+            bold=True,
+            color=(1, 1, 1, 1)  # White text
+        )
+        
+        # Add reminder button with professional green
+        add_btn = Button(
+            text='➕ Add New Reminder',
+            size_hint_y=0.08,
+            background_color=(0.1, 0.8, 0.3, 1),  # Bright green
+            color=(1, 1, 1, 1),  # White text
+            font_size='18sp',
+            bold=True
+        )
+        add_btn.bind(on_press=app.show_add_screen)
+        
+        # Reminders list (virtualized; rows are recycled while scrolling)
+        self.empty_label = Label(
+            text='📭 No reminders scheduled yet.\nTap "Add New Reminder" to get started!',
+            font_size='16sp',
+            size_hint=(1, 0.82),
+            color=(0.7, 0.7, 0.7, 1)  # Gray text
+        )
+        self.reminder_list = ReminderListView(size_hint=(1, 0.82))
+        self.reminder_list.bind(data=lambda rv, data: self.update_empty_state())
+        
+        self.layout.add_widget(header)
+        self.layout.add_widget(add_btn)
+        self.layout.add_widget(self.reminder_list)
+        self.add_widget(self.layout)
+    
+    def update_empty_state(self):
+        """Show the empty-list hint in place of the list when there are no rows"""
+        empty = not self.reminder_list.data
+        showing_hint = self.empty_label.parent is self.layout
+        if empty and not showing_hint:
+            index = self.layout.children.index(self.reminder_list)
+            self.layout.remove_widget(self.reminder_list)
+            self.layout.add_widget(self.empty_label, index=index)
+        elif not empty and showing_hint:
+            index = self.layout.children.index(self.empty_label)
+            self.layout.remove_widget(self.empty_label)
+            self.layout.add_widget(self.reminder_list, index=index)
+
+
+class ReminderFormScreen(Screen):
+    """Add / edit form, built once and refilled for each use"""
+    
+    def __init__(self, app, **kwargs):
+        super().__init__(**kwargs)
+        self.app = app
+        # ID of the reminder being edited, None when adding
+        self.editing_id = None
+        
+        form_screen = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        # Header
+        self.header = Label(
+            text='➕ Add New Reminder',
+            font_size='22sp',
+            size_hint_y=0.1,
+            bold=True
+        )
+        
+        # Form fields
+        form_layout = GridLayout(cols=2, spacing=10, size_hint_y=0.7)
+        
+        # Medicine name
+        form_layout.add_widget(Label(text='Medicine Name:', font_size='16sp'))
+        self.medicine_input = TextInput(
+            hint_text='e.g., Amlodipine (BP)',
+            multiline=False,
+            font_size='16sp'
+        )
+        form_layout.add_widget(self.medicine_input)
+        
+        # Time
+        form_layout.add_widget(Label(text='Time (HH:MM):', font_size='16sp'))
+        self.time_input = TextInput(
+            hint_text='e.g., 08:00',
+            multiline=False,
+            font_size='16sp'
+        )
+        form_layout.add_widget(self.time_input)
+        
+        # Custom message
+        form_layout.add_widget(Label(text='Reminder Message:', font_size='16sp'))
+        self.message_input = TextInput(
+            hint_text='Enter your custom message in any language...',
+            multiline=True,
+            font_size='16sp'
+        )
+        form_layout.add_widget(self.message_input)
+        
+        # Buttons layout
+        button_layout = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=0.1)
+        
+        cancel_btn = Button(
+            text='❌ Cancel',
+            background_color=(0.7, 0.7, 0.7, 1),
+            font_size='18sp'
+        )
+        cancel_btn.bind(on_press=app.back_to_main)
+        
+        save_btn = Button(
+            text='✅ Save Reminder',
+            background_color=(0.2, 0.7, 0.3, 1),
+            font_size='18sp'
+        )
+        save_btn.bind(on_press=app.save_reminder)
+        
+        button_layout.add_widget(cancel_btn)
+        button_layout.add_widget(save_btn)
+        
+        form_screen.add_widget(self.header)
+        form_screen.add_widget(form_layout)
+        form_screen.add_widget(button_layout)
+        self.add_widget(form_screen)
+    
+    def load(self, reminder=None):
+        """Clear the form for a new reminder, or fill it to edit one"""
+        self.editing_id = reminder['id'] if reminder is not None else None
+        self.header.text = '✏️ Edit Reminder' if reminder is not None else '➕ Add New Reminder'
+        self.medicine_input.text = reminder['medicine_name'] if reminder is not None else ''
+        self.time_input.text = reminder['time'] if reminder is not None else ''
+        self.message_input.text = reminder['message'] if reminder is not None else ''
+
+
+class MedicineReminderApp(App):
+    """Main Kivy application for Medicine Reminder"""
+    
+    def __init__(self, agent: MedicineReminderAgent, startup_profile=None, **kwargs):
+        """
+        Args:
+            agent: Agent with the schedule already loaded (see main.load_agent)
+            startup_profile: Optional main.StartupProfile; when given, the
+                build and first-frame times are recorded and the app exits
+                after the first frame
+        """
+        super().__init__(**kwargs)
+        self.agent = agent
+        self.startup_profile = startup_profile
+        self.screen_manager = None
+        self.main_screen = None
+        self.form_screen = None
+        # The app's only scheduler event; see schedule_next_check
+        self._check_event = None
+        
+        # Agent changes reach the list as row diffs (all mutations happen
+        # on the UI thread)
+        self.agent.sinks.append(CallbackSink(self.on_agent_events))
+    
+    def build(self):
+        """Build both screens once; navigation only switches between them"""
+        # Professional Black Background
+        Window.clearcolor = (0, 0, 0, 1)  # Pure black
+        
+        self.screen_manager = ScreenManager(transition=NoTransition())
+        self.main_screen = MainScreen(self, name='main')
+        self.form_screen = ReminderFormScreen(self, name='form')
+        self.screen_manager.add_widget(self.main_screen)
+        self.screen_manager.add_widget(self.form_screen)
+        
+        # Refresh reminders list
+        self.refresh_reminders()
+        
+        # Sleep until the next reminder is due
+        self.schedule_next_check()
+        
+        if self.startup_profile is not None:
+            self.startup_profile.mark('build')
+        return self.screen_manager
+    
+    @property
+    def reminder_list(self):
+        """The main screen's reminder list, or None before build()"""
+        return self.main_screen.reminder_list if self.main_screen is not None else None
+    
+    def refresh_reminders(self):
+        """Reload the whole reminders list from the agent"""
+        # Already sorted by time, maintained by the agent
+        self.reminder_list.set_reminders(self.agent.sorted_reminders())
+        self.main_screen.update_empty_state()
+    
+    def on_agent_events(self, events):
+        """Apply agent mutations to the list without rebuilding it"""
+        if self.reminder_list is None:
+            return
+        if any(event.kind == 'schedule_imported' for event in events):
+            self.refresh_reminders()
+        else:
+            self.reminder_list.apply_events(events)
+    
+    def show_add_screen(self, instance):
+        """Show the add reminder screen"""
+        self.form_screen.load()
+        self.screen_manager.current = 'form'
+    
+    def show_edit_screen(self, reminder_data):
+        """Show the form pre-filled with a reminder"""
+        self.form_screen.load(reminder_data)
+        self.screen_manager.current = 'form'
+    
+    def save_reminder(self, instance):
+        """Save the reminder in the form (new or edited)"""
+        form = self.form_screen
+        medicine = form.medicine_input.text.strip()
+        time = form.time_input.text.strip()
+        message = form.message_input.text.strip()
+        
+        if not medicine or not time or not message:
+            # Show error (in production, use a popup)
+            print("⚠️ Please fill all fields")
+            return
+        
+        if form.editing_id is None:
+            self.agent.add_reminder(
+                medicine_name=medicine,
+                reminder_time=time,
+                custom_message=message
+            )
+        else:
+            self.agent.edit_reminder(
+                form.editing_id,
+                medicine_name=medicine,
+                reminder_time=time,
+                custom_message=message
+            )
+        
+        # Already saved to the store by the agent, and the list updated
+        # from its event
+        self.schedule_next_check()
+        
+        # Return to main screen
+        self.back_to_main(instance)
+    
+    def delete_reminder(self, reminder_id):
+        """Delete a reminder"""
+        # The list drops the row itself when the agent reports the delete
+        self.agent.delete_reminder(reminder_id)
+        self.schedule_next_check()
+    
+    def back_to_main(self, instance):
+        """Return to main screen (the existing one; nothing is rebuilt)"""
+        self.screen_manager.current = 'main'
+    
+    def schedule_next_check(self):
+        """Schedule a single wake-up for the next due reminder"""
+        if self._check_event is not None:
+            self._check_event.cancel()
+            self._check_event = None
+        
+        due = self.agent.next_due()
+        if due is None:
+            return
+        delay = max((due - datetime.now()).total_seconds(), 0)
+        self._check_event = Clock.schedule_once(self.check_reminders, delay)
+    
+    def check_reminders(self, dt):
+        """Trigger due reminders (called when the next reminder is due)"""
+        triggered = self.agent.trigger_due()
+        
+        # In production, this would trigger notifications
+        # For now, just print
+        if triggered:
+            print(f"⏰ {len(triggered)} reminder(s) triggered!")
+        
+        self.schedule_next_check()
+    
+    def on_start(self):
+        """Called once the app window is up"""
+        if self.startup_profile is not None:
+            # Runs on the next frame, i.e. once the first one is drawn
+            Clock.schedule_once(self._first_frame_drawn, 0)
+            return
+        
+        # Render upcoming reminder audio in the background
+        self.agent.start_prerender()
+    
+    def _first_frame_drawn(self, dt):
+        """Startup profiling: record the first frame, report and quit"""
+        self.startup_profile.mark('first_render')
+        self.startup_profile.report()
+        self.stop()
+    
+    def on_stop(self):
+        """Called when app is closing"""
+        self.agent.stop_prerender()
+        
+        # Keep a portable JSON copy of the schedule
+        try:
+            self.agent.export_schedule('app_schedule.json')
+        except:
+            pass
+        self.agent.store.close()
@@ -0,0 +1,315 @@
+"""
+Medicine Reminder Agent - Storage Backends
+
+Pluggable persistence for MedicineReminderAgent. The agent tells its store
+about every mutation, so a backend only writes what changed instead of
+rewriting the whole schedule.
+
+Backends:
+- JSONFileStore: rewrites one JSON file (the original export format)
+- JournalStore: append-only mutation log plus periodic snapshots
+- SQLiteStore: single-row writes to a SQLite database in WAL mode
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+REMINDER_FIELDS = ('id', 'medicine_name', 'time', 'message', 'frequency', 'active', 'created_at')
+# Fields a reminder only has sometimes ('scheduled_at' after a time or
+# frequency edit); stored as nullable columns
+OPTIONAL_FIELDS = ('scheduled_at',)
+COLUMNS = REMINDER_FIELDS + OPTIONAL_FIELDS
+
+
+class ReminderStore:
+    """
+    Base class for reminder storage backends
+
+    The agent calls add() for new reminders, update() after an edit or
+    delete (deletes are soft: 'active' becomes False) and replace_all()
+    when a whole schedule is imported.
+    """
+
+    def load(self) -> List[Dict]:
+        """
+        Load all stored reminders
+
+        Returns:
+            List of reminder dictionaries in id order
+        """
+        raise NotImplementedError
+
+    def add(self, reminder: Dict):
+        """Persist a newly created reminder"""
+        raise NotImplementedError
+
+    def update(self, reminder: Dict):
+        """Persist changes to an existing reminder"""
+        raise NotImplementedError
+
+    def replace_all(self, reminders: List[Dict]):
+        """Replace the stored schedule with the given reminders"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the store"""
+
+
+class JSONFileStore(ReminderStore):
+    """
+    Store that rewrites a single JSON file on every change
+
+    Simple and human-readable, but each write costs O(n). Suitable for
+    small schedules only.
+    """
+
+    def __init__(self, filename: str = "medicine_schedule.json"):
+        """
+        Args:
+            filename: JSON file holding the schedule
+        """
+        self.filename = filename
+        # id -> latest record, in file order
+        self._state: Dict[int, Dict] = {}
+
+    def load(self) -> List[Dict]:
+        self._state = {}
+        if os.path.exists(self.filename):
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                for reminder in json.load(f):
+                    self._state[reminder['id']] = reminder
+        return list(self._state.values())
+
+    def add(self, reminder: Dict):
+        self._state[reminder['id']] = reminder
+        self._write()
+
+    def update(self, reminder: Dict):
+        self._state[reminder['id']] = reminder
+        self._write()
+
+    def replace_all(self, reminders: List[Dict]):
+        self._state = {r['id']: r for r in reminders}
+        self._write()
+
+    def _write(self):
+        """Rewrite the whole file"""
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            json.dump([dict(r) for r in self._state.values()], f, ensure_ascii=False, indent=2)
+
+
+class JournalStore(ReminderStore):
+    """
+    Store that appends each change to a journal and compacts periodically
+
+    Every add, edit or delete is one JSON line appended to <base>.journal,
+    so writes are O(1). On load the latest snapshot (<base>.snapshot.json)
+    is read and the journal replayed on top of it. Once the journal grows
+    past compact_bytes it is folded into a fresh snapshot.
+
+    Each journal line carries the full reminder record, so replaying a
+    line twice is harmless. That keeps a crash during compaction safe.
+    """
+
+    def __init__(self, base: str = "medicine_schedule", compact_bytes: int = 1024 * 1024,
+                 fsync: bool = False):
+        """
+        Args:
+            base: Path prefix for the snapshot and journal files
+            compact_bytes: Journal size that triggers compaction
+            fsync: Force each journal write to disk (survives power loss,
+                not just a process crash, at the cost of slower writes)
+        """
+        self.snapshot_path = base + ".snapshot.json"
+        self.journal_path = base + ".journal"
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self._state: Dict[int, Dict] = {}
+        self._journal = None
+        self._journal_bytes = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> List[Dict]:
+        with self._lock:
+            self._state = {}
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    for reminder in json.load(f):
+                        self._state[reminder['id']] = reminder
+
+            if os.path.exists(self.journal_path):
+                valid_bytes = 0
+                with open(self.journal_path, 'rb') as f:
+                    for line in f:
+                        try:
+                            if not line.endswith(b"\n"):
+                                raise ValueError("incomplete line")
+                            entry = json.loads(line.decode('utf-8'))
+                        except ValueError:
+                            # Torn final write from a crash; everything
+                            # before it is intact
+                            break
+                        reminder = entry['reminder']
+                        self._state[reminder['id']] = reminder
+                        valid_bytes += len(line)
+                if valid_bytes < os.path.getsize(self.journal_path):
+                    # Cut the torn tail off, or the next append would be
+                    # glued onto it and lost on every later load
+                    with open(self.journal_path, 'r+b') as f:
+                        f.truncate(valid_bytes)
+                self._journal_bytes = valid_bytes
+
+            reminders = sorted(self._state.values(), key=lambda r: r['id'])
+        if self._journal_bytes >= self.compact_bytes:
+            self.compact()
+        return reminders
+
+    def add(self, reminder: Dict):
+        self._append('add', reminder)
+
+    def update(self, reminder: Dict):
+        self._append('edit' if reminder['active'] else 'delete', reminder)
+
+    def replace_all(self, reminders: List[Dict]):
+        with self._lock:
+            self._state = {r['id']: r for r in reminders}
+            self._write_snapshot()
+
+    def _append(self, op: str, reminder: Dict):
+        """Append one mutation to the journal, compacting if it got too big"""
+        line = json.dumps({'op': op, 'reminder': dict(reminder)}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._state[reminder['id']] = reminder
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._journal_bytes += len(line.encode('utf-8'))
+            needs_compaction = self._journal_bytes >= self.compact_bytes
+        if needs_compaction:
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into a new snapshot and start an empty journal"""
+        with self._lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        """Atomically write the snapshot, then truncate the journal (lock held)"""
+        scratch = self.snapshot_path + ".tmp"
+        reminders = sorted(self._state.values(), key=lambda r: r['id'])
+        with open(scratch, 'w', encoding='utf-8') as f:
+            json.dump([dict(r) for r in reminders], f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(scratch, self.snapshot_path)
+
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, 'w', encoding='utf-8')
+        self._journal_bytes = 0
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class SQLiteStore(ReminderStore):
+    """
+    Store backed by a SQLite database in write-ahead-log mode
+
+    Every add or edit is a single-row INSERT or UPDATE in its own short
+    transaction, so the cost of a write does not grow with the schedule.
+    The time and active columns are indexed for schedule queries.
+    """
+
+    def __init__(self, filename: str = "medicine_schedule.db"):
+        """
+        Open (and create if needed) the database
+
+        Args:
+            filename: SQLite database file, or ":memory:"
+        """
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS reminders ("
+                " id INTEGER PRIMARY KEY,"
+                " medicine_name TEXT NOT NULL,"
+                " time TEXT NOT NULL,"
+                " message TEXT NOT NULL,"
+                " frequency TEXT NOT NULL,"
+                " active INTEGER NOT NULL,"
+                " created_at TEXT NOT NULL,"
+                " scheduled_at TEXT)"
+            )
+            # Databases created before a column existed
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(reminders)")}
+            for field in OPTIONAL_FIELDS:
+                if field not in existing:
+                    self._conn.execute(f"ALTER TABLE reminders ADD COLUMN {field} TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_time ON reminders (time)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_active ON reminders (active)")
+
+    @staticmethod
+    def _row(reminder: Dict) -> tuple:
+        """Convert a reminder to a row tuple in column order"""
+        return (reminder['id'], reminder['medicine_name'], reminder['time'],
+                reminder['message'], reminder['frequency'], int(bool(reminder['active'])),
+                reminder['created_at'], reminder.get('scheduled_at'))
+
+    def load(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM reminders ORDER BY id"
+            ).fetchall()
+        reminders = []
+        for row in rows:
+            reminder = dict(zip(COLUMNS, row))
+            reminder['active'] = bool(reminder['active'])
+            for field in OPTIONAL_FIELDS:
+                if reminder[field] is None:
+                    del reminder[field]
+            reminders.append(reminder)
+        return reminders
+
+    def add(self, reminder: Dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO reminders ({', '.join(COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._row(reminder),
+            )
+
+    def update(self, reminder: Dict):
+        row = self._row(reminder)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE reminders SET medicine_name = ?, time = ?, message = ?,"
+                " frequency = ?, active = ?, created_at = ?, scheduled_at = ? WHERE id = ?",
+                row[1:] + row[:1],
+            )
+
+    def replace_all(self, reminders: List[Dict]):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM reminders")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO reminders ({', '.join(COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._row(r) for r in reminders),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
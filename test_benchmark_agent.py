@@ -0,0 +1,52 @@
+"""
+Smoke tests for the benchmark suite
+Run with: python -m pytest test_benchmark_agent.py
+"""
+
+import unittest
+
+from benchmark_agent import compare_results, percentile, run_benchmarks
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test cases for benchmark_agent"""
+
+    def test_small_run_reports_every_operation(self):
+        """Test that a tiny run produces a result per operation"""
+        results = run_benchmarks([50], ops=5, bulk_ops=1)
+
+        self.assertEqual(len(results['runs']), 1)
+        run = results['runs'][0]
+        self.assertEqual(run['size'], 50)
+        self.assertGreater(run['agent_memory_bytes'], 0)
+        names = {op['operation'] for op in run['operations']}
+        for name in ('add_reminder', 'edit_reminder', 'delete_reminder',
+                     'check_and_trigger_reminders', 'get_statistics',
+                     'get_upcoming_reminders', 'export_schedule', 'import_schedule'):
+            self.assertIn(name, names)
+        for op in run['operations']:
+            self.assertGreater(op['calls'], 0)
+            self.assertLessEqual(op['latency_us']['p50'], op['latency_us']['max'])
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_compare_flags_slowdowns(self):
+        """Test that only operations past the threshold are reported"""
+        def results(p50_add, p50_edit):
+            return {'runs': [{'size': 100, 'operations': [
+                {'operation': 'add_reminder', 'latency_us': {'p50': p50_add}},
+                {'operation': 'edit_reminder', 'latency_us': {'p50': p50_edit}},
+            ]}]}
+
+        regressions = compare_results(results(30.0, 11.0), results(10.0, 10.0), threshold=1.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('add_reminder', regressions[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
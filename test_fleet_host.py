@@ -0,0 +1,154 @@
+"""
+Test suite for the multi-tenant fleet host
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from medicine_reminder_core import MedicineReminderAgent
+from fleet_host import FleetHost
+
+
+class TestFleetHost(unittest.TestCase):
+    """Test cases for FleetHost"""
+    
+    def setUp(self):
+        """Set up a host whose loader keeps schedules in a dict"""
+        self.schedules = {}
+        self.loads = []
+        self.unloads = []
+        
+        def loader(tenant_id):
+            self.loads.append(tenant_id)
+            agent = MedicineReminderAgent()
+            for medicine, reminder_time in self.schedules.get(tenant_id, []):
+                agent.add_reminder(medicine, reminder_time, f"{medicine} ka time")
+            return agent
+        
+        def unloader(tenant_id, agent):
+            self.unloads.append(tenant_id)
+            self.schedules[tenant_id] = [
+                (r['medicine_name'], r['time']) for r in agent.reminders if r['active']
+            ]
+        
+        self.host = FleetHost(loader, unloader, idle_seconds=0)
+        self.host.clock = lambda: datetime(2025, 11, 15, 7, 0)
+    
+    def test_tick_fires_across_tenants(self):
+        """Test that one tick fires every due tenant and skips the rest"""
+        self.schedules = {
+            'sharma': [("BP", "08:00")],
+            'gupta': [("Sugar", "08:00"), ("Thyroid", "06:30")],
+            'khan': [("Heart", "21:00")],
+        }
+        for tenant_id in self.schedules:
+            self.host.register_tenant(tenant_id)
+        self.host.evict_idle()
+        self.loads.clear()
+        
+        fired = self.host.tick(datetime(2025, 11, 15, 8, 0))
+        
+        self.assertEqual([t for t, _ in fired], ['gupta', 'sharma'])
+        self.assertEqual(sorted(self.loads), ['gupta', 'sharma'])
+    
+    def test_idle_tenants_are_unloaded(self):
+        """Test that idle agents are dropped but still indexed"""
+        self.schedules = {'sharma': [("BP", "08:00")]}
+        self.host.register_tenant('sharma')
+        
+        self.assertEqual(self.host.evict_idle(), 1)
+        self.assertEqual(self.host.loaded_count, 0)
+        self.assertEqual(self.host.due_tenants(8 * 60), {'sharma'})
+    
+    def test_max_loaded(self):
+        """Test that the least recently used agent is unloaded at the cap"""
+        self.host.max_loaded = 2
+        for tenant_id in ('a', 'b', 'c'):
+            self.host.agent(tenant_id)
+        
+        self.assertEqual(self.host.loaded_count, 2)
+        self.assertEqual(self.unloads, ['a'])
+    
+    def test_mutations_update_global_index(self):
+        """Test that edits through the host move tenants between slots"""
+        self.host.add_reminder('sharma', "BP", "08:00", "BP ki dawai")
+        self.host.edit_reminder('sharma', 1, reminder_time="09:15")
+        
+        self.assertEqual(self.host.due_tenants(8 * 60), set())
+        self.assertEqual(self.host.due_tenants(9 * 60 + 15), {'sharma'})
+        
+        self.host.delete_reminder('sharma', 1)
+        self.assertIsNone(self.host.next_due())
+    
+    def test_tick_drops_retired_reminders(self):
+        """Test that a fired one-time reminder leaves the global index"""
+        self.host.add_reminder('sharma', "Antibiotic", "08:00", "Antibiotic", frequency="once")
+        self.host.add_reminder('sharma', "BP", "09:00", "BP")
+        
+        fired = self.host.tick(datetime(2025, 11, 15, 8, 0))
+        
+        self.assertEqual([t for t, _ in fired], ['sharma'])
+        self.assertEqual(self.host.due_tenants(8 * 60), set())
+        self.assertEqual(self.host.next_due(), datetime(2025, 11, 15, 9, 0))
+    
+    def test_tick_covers_skipped_minutes_once(self):
+        """Test that a late tick catches up and a repeat tick fires nothing"""
+        self.host.add_reminder('sharma', "BP", "08:00", "BP")
+        self.host.add_reminder('gupta', "Sugar", "08:01", "Sugar")
+        self.host.tick(datetime(2025, 11, 15, 7, 59))
+        
+        fired = self.host.tick(datetime(2025, 11, 15, 8, 1, 30))
+        self.assertEqual([t for t, _ in fired], ['gupta', 'sharma'])
+        self.assertEqual(self.host.tick(datetime(2025, 11, 15, 8, 1, 45)), [])
+    
+    def test_tick_survives_unload(self):
+        """Test that an unloaded and reloaded tenant does not fire twice"""
+        self.schedules = {'sharma': [("BP", "08:00")]}
+        self.host.register_tenant('sharma')
+        self.assertEqual(len(self.host.tick(datetime(2025, 11, 15, 8, 0))), 1)
+        self.host.evict_idle()
+        
+        self.assertEqual(self.host.tick(datetime(2025, 11, 15, 8, 0, 40)), [])
+    
+    def test_tick_uses_host_time_for_rules(self):
+        """Test that weekday rules are checked on the tick's date"""
+        self.host.add_reminder('sharma', "BP", "08:00", "BP", frequency="mon")
+        
+        self.assertEqual(self.host.tick(datetime(2025, 11, 15, 8, 0)), [])
+        fired = self.host.tick(datetime(2025, 11, 17, 8, 0))
+        self.assertEqual([t for t, _ in fired], ['sharma'])
+    
+    def test_next_due_wraps(self):
+        """Test the next occupied minute across tenants"""
+        self.host.add_reminder('a', "BP", "06:00", "BP")
+        self.host.add_reminder('b', "Sugar", "22:00", "Sugar")
+        
+        self.assertEqual(self.host.next_due(), datetime(2025, 11, 15, 22, 0))
+        self.assertEqual(self.host.next_due(datetime(2025, 11, 15, 23, 0)),
+                         datetime(2025, 11, 16, 6, 0))
+    
+    def test_run_until(self):
+        """Test that the shared loop wakes only for occupied minutes"""
+        self.host.add_reminder('a', "BP", "07:30", "BP")
+        self.host.add_reminder('b', "Sugar", "08:00", "Sugar")
+        
+        now = [datetime(2025, 11, 15, 7, 0)]
+        waits = []
+        
+        def fake_wait(timeout=None):
+            waits.append(timeout)
+            now[0] += timedelta(seconds=timeout)
+            return False
+        
+        self.host.clock = lambda: now[0]
+        self.host._wakeup.wait = fake_wait
+        fired = []
+        count = self.host.run_until(datetime(2025, 11, 15, 9, 0),
+                                    on_trigger=lambda t, r: fired.append(t))
+        
+        self.assertEqual(count, 2)
+        self.assertEqual(fired, ['a', 'b'])
+        self.assertEqual(waits, [1800, 1800, 3600])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,253 +1,1761 @@
-"""
-Test suite for Medicine Reminder Agent
-Demonstrates testing capabilities for the core module
-"""
-
-import unittest
-from datetime import datetime
-import os
-import json
-from medicine_reminder_core import MedicineReminderAgent
-
-
-class TestMedicineReminderAgent(unittest.TestCase):
-    """Test cases for MedicineReminderAgent class"""
-    
-    def setUp(self):
-        """Set up test fixture before each test method"""
-        self.agent = MedicineReminderAgent()
-    
-    def tearDown(self):
-        """Clean up after each test method"""
-        # Remove test files if they exist
-        test_files = ['test_schedule.json', 'test_reminder.mp3']
-        for file in test_files:
-            if os.path.exists(file):
-                os.remove(file)
-    
-    def test_initialization(self):
-        """Test agent initialization"""
-        self.assertEqual(len(self.agent.reminders), 0)
-        self.assertEqual(self.agent.reminder_id_counter, 1)
-    
-    def test_add_reminder(self):
-        """Test adding a reminder"""
-        reminder = self.agent.add_reminder(
-            medicine_name="Test Medicine",
-            reminder_time="10:00",
-            custom_message="Test message"
-        )
-        
-        self.assertEqual(reminder['id'], 1)
-        self.assertEqual(reminder['medicine_name'], "Test Medicine")
-        self.assertEqual(reminder['time'], "10:00")
-        self.assertEqual(reminder['message'], "Test message")
-        self.assertTrue(reminder['active'])
-        self.assertEqual(len(self.agent.reminders), 1)
-    
-    def test_add_multiple_reminders(self):
-        """Test adding multiple reminders"""
-        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
-        self.agent.add_reminder("Medicine 2", "14:00", "Message 2")
-        self.agent.add_reminder("Medicine 3", "20:00", "Message 3")
-        
-        self.assertEqual(len(self.agent.reminders), 3)
-        self.assertEqual(self.agent.reminder_id_counter, 4)
-    
-    def test_view_reminders_empty(self):
-        """Test viewing reminders when none exist"""
-        reminders = self.agent.view_reminders()
-        self.assertEqual(len(reminders), 0)
-    
-    def test_view_reminders(self):
-        """Test viewing reminders"""
-        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
-        self.agent.add_reminder("Medicine 2", "14:00", "Message 2")
-        
-        reminders = self.agent.view_reminders()
-        self.assertEqual(len(reminders), 2)
-        self.assertIn('medicine_name', reminders[0].keys())
-        self.assertIn('time', reminders[0].keys())
-    
-    def test_delete_reminder(self):
-        """Test deleting a reminder"""
-        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
-        
-        result = self.agent.delete_reminder(1)
-        self.assertTrue(result)
-        
-        reminders = self.agent.view_reminders()
-        self.assertEqual(len(reminders), 0)
-    
-    def test_delete_nonexistent_reminder(self):
-        """Test deleting a non-existent reminder"""
-        result = self.agent.delete_reminder(999)
-        self.assertFalse(result)
-    
-    def test_edit_reminder(self):
-        """Test editing a reminder"""
-        self.agent.add_reminder("Original Medicine", "10:00", "Original message")
-        
-        result = self.agent.edit_reminder(
-            reminder_id=1,
-            medicine_name="Updated Medicine",
-            reminder_time="11:00",
-            custom_message="Updated message"
-        )
-        
-        self.assertTrue(result)
-        
-        reminder = self.agent.get_reminder_by_id(1)
-        self.assertIsNotNone(reminder)
-        if reminder:  # Type guard for linter
-            self.assertEqual(reminder['medicine_name'], "Updated Medicine")
-            self.assertEqual(reminder['time'], "11:00")
-            self.assertEqual(reminder['message'], "Updated message")
-    
-    def test_edit_partial_reminder(self):
-        """Test editing only some fields of a reminder"""
-        self.agent.add_reminder("Original Medicine", "10:00", "Original message")
-        
-        self.agent.edit_reminder(reminder_id=1, medicine_name="New Medicine")
-        
-        reminder = self.agent.get_reminder_by_id(1)
-        self.assertIsNotNone(reminder)
-        if reminder:  # Type guard for linter
-            self.assertEqual(reminder['medicine_name'], "New Medicine")
-            self.assertEqual(reminder['time'], "10:00")  # Unchanged
-            self.assertEqual(reminder['message'], "Original message")  # Unchanged
-    
-    def test_check_reminders_no_match(self):
-        """Test checking reminders when none match current time"""
-        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
-        
-        triggered = self.agent.check_and_trigger_reminders("09:00")
-        self.assertEqual(len(triggered), 0)
-    
-    def test_check_reminders_with_match(self):
-        """Test checking reminders when time matches"""
-        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
-        
-        triggered = self.agent.check_and_trigger_reminders("10:00")
-        self.assertEqual(len(triggered), 1)
-        self.assertEqual(triggered[0]['medicine_name'], "Test Medicine")
-    
-    def test_check_multiple_reminders_same_time(self):
-        """Test checking when multiple reminders are at same time"""
-        self.agent.add_reminder("Medicine 1", "10:00", "Message 1")
-        self.agent.add_reminder("Medicine 2", "10:00", "Message 2")
-        
-        triggered = self.agent.check_and_trigger_reminders("10:00")
-        self.assertEqual(len(triggered), 2)
-    
-    def test_export_schedule(self):
-        """Test exporting schedule to JSON"""
-        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
-        
-        self.agent.export_schedule("test_schedule.json")
-        
-        self.assertTrue(os.path.exists("test_schedule.json"))
-        
-        with open("test_schedule.json", 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]['medicine_name'], "Test Medicine")
-    
-    def test_import_schedule(self):
-        """Test importing schedule from JSON"""
-        # Create a test schedule file
-        test_data = [
-            {
-                'id': 1,
-                'medicine_name': 'Test Medicine',
-                'time': '10:00',
-                'message': 'Test message',
-                'frequency': 'daily',
-                'active': True,
-                'created_at': '2025-11-15 10:00:00'
-            }
-        ]
-        
-        with open("test_schedule.json", 'w', encoding='utf-8') as f:
-            json.dump(test_data, f)
-        
-        self.agent.import_schedule("test_schedule.json")
-        
-        self.assertEqual(len(self.agent.reminders), 1)
-        self.assertEqual(self.agent.reminders[0]['medicine_name'], 'Test Medicine')
-    
-    def test_get_statistics(self):
-        """Test getting statistics"""
-        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
-        self.agent.add_reminder("Medicine 2", "08:00", "Message 2")
-        self.agent.add_reminder("Medicine 3", "14:00", "Message 3")
-        self.agent.delete_reminder(3)
-        
-        stats = self.agent.get_statistics()
-        
-        self.assertEqual(stats['total_created'], 3)
-        self.assertEqual(stats['active'], 2)
-        self.assertEqual(stats['deleted'], 1)
-        self.assertEqual(stats['times']['08:00'], 2)
-    
-    def test_get_upcoming_reminders(self):
-        """Test getting upcoming reminders"""
-        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
-        self.agent.add_reminder("Medicine 2", "14:00", "Message 2")
-        self.agent.add_reminder("Medicine 3", "20:00", "Message 3")
-        
-        upcoming = self.agent.get_upcoming_reminders()
-        
-        # Should return reminders sorted by time
-        self.assertGreaterEqual(len(upcoming), 0)
-    
-    def test_multilingual_message(self):
-        """Test adding reminder with multilingual message"""
-        hindi_message = "Are uncle, aapki dawai ka time ho gaya hai!"
-        
-        reminder = self.agent.add_reminder(
-            medicine_name="Test Medicine",
-            reminder_time="10:00",
-            custom_message=hindi_message
-        )
-        
-        self.assertEqual(reminder['message'], hindi_message)
-
-
-class TestReminderFrequency(unittest.TestCase):
-    """Test cases for reminder frequency features"""
-    
-    def setUp(self):
-        """Set up test fixture"""
-        self.agent = MedicineReminderAgent()
-    
-    def test_daily_frequency(self):
-        """Test daily frequency reminder"""
-        reminder = self.agent.add_reminder(
-            "Daily Medicine",
-            "10:00",
-            "Take daily",
-            frequency="daily"
-        )
-        
-        self.assertEqual(reminder['frequency'], "daily")
-    
-    def test_custom_frequency(self):
-        """Test custom frequency reminder"""
-        reminder = self.agent.add_reminder(
-            "Weekly Medicine",
-            "10:00",
-            "Take weekly",
-            frequency="weekly"
-        )
-        
-        self.assertEqual(reminder['frequency'], "weekly")
-
-
-if __name__ == '__main__':
-    print("🧪 Running Medicine Reminder Agent Tests\n")
-    print("=" * 60)
-    
-    # Run tests
-    unittest.main(verbosity=2)
+"""
+Test suite for Medicine Reminder Agent
+Demonstrates testing capabilities for the core module
+"""
+
+import unittest
+from datetime import datetime, timedelta
+import os
+import io
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from unittest import mock
+import medicine_reminder_core
+from medicine_reminder_core import MedicineReminderAgent, Reminder, TTSCache, iter_schedule_records
+
+
+class TestMedicineReminderAgent(unittest.TestCase):
+    """Test cases for MedicineReminderAgent class"""
+    
+    def setUp(self):
+        """Set up test fixture before each test method"""
+        self.agent = MedicineReminderAgent()
+    
+    def tearDown(self):
+        """Clean up after each test method"""
+        # Remove test files if they exist
+        test_files = ['test_schedule.json', 'test_reminder.mp3']
+        for file in test_files:
+            if os.path.exists(file):
+                os.remove(file)
+    
+    def test_initialization(self):
+        """Test agent initialization"""
+        self.assertEqual(len(self.agent.reminders), 0)
+        self.assertEqual(self.agent.reminder_id_counter, 1)
+    
+    def test_add_reminder(self):
+        """Test adding a reminder"""
+        reminder = self.agent.add_reminder(
+            medicine_name="Test Medicine",
+            reminder_time="10:00",
+            custom_message="Test message"
+        )
+        
+        self.assertEqual(reminder['id'], 1)
+        self.assertEqual(reminder['medicine_name'], "Test Medicine")
+        self.assertEqual(reminder['time'], "10:00")
+        self.assertEqual(reminder['message'], "Test message")
+        self.assertTrue(reminder['active'])
+        self.assertEqual(len(self.agent.reminders), 1)
+    
+    def test_add_multiple_reminders(self):
+        """Test adding multiple reminders"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "14:00", "Message 2")
+        self.agent.add_reminder("Medicine 3", "20:00", "Message 3")
+        
+        self.assertEqual(len(self.agent.reminders), 3)
+        self.assertEqual(self.agent.reminder_id_counter, 4)
+    
+    def test_view_reminders_empty(self):
+        """Test viewing reminders when none exist"""
+        reminders = self.agent.view_reminders()
+        self.assertEqual(len(reminders), 0)
+    
+    def test_view_reminders(self):
+        """Test viewing reminders"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "14:00", "Message 2")
+        
+        reminders = self.agent.view_reminders()
+        self.assertEqual(len(reminders), 2)
+        self.assertIn('medicine_name', reminders[0].keys())
+        self.assertIn('time', reminders[0].keys())
+    
+    def test_delete_reminder(self):
+        """Test deleting a reminder"""
+        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
+        
+        result = self.agent.delete_reminder(1)
+        self.assertTrue(result)
+        
+        reminders = self.agent.view_reminders()
+        self.assertEqual(len(reminders), 0)
+    
+    def test_delete_nonexistent_reminder(self):
+        """Test deleting a non-existent reminder"""
+        result = self.agent.delete_reminder(999)
+        self.assertFalse(result)
+    
+    def test_edit_reminder(self):
+        """Test editing a reminder"""
+        self.agent.add_reminder("Original Medicine", "10:00", "Original message")
+        
+        result = self.agent.edit_reminder(
+            reminder_id=1,
+            medicine_name="Updated Medicine",
+            reminder_time="11:00",
+            custom_message="Updated message"
+        )
+        
+        self.assertTrue(result)
+        
+        reminder = self.agent.get_reminder_by_id(1)
+        self.assertIsNotNone(reminder)
+        if reminder:  # Type guard for linter
+            self.assertEqual(reminder['medicine_name'], "Updated Medicine")
+            self.assertEqual(reminder['time'], "11:00")
+            self.assertEqual(reminder['message'], "Updated message")
+    
+    def test_edit_partial_reminder(self):
+        """Test editing only some fields of a reminder"""
+        self.agent.add_reminder("Original Medicine", "10:00", "Original message")
+        
+        self.agent.edit_reminder(reminder_id=1, medicine_name="New Medicine")
+        
+        reminder = self.agent.get_reminder_by_id(1)
+        self.assertIsNotNone(reminder)
+        if reminder:  # Type guard for linter
+            self.assertEqual(reminder['medicine_name'], "New Medicine")
+            self.assertEqual(reminder['time'], "10:00")  # Unchanged
+            self.assertEqual(reminder['message'], "Original message")  # Unchanged
+    
+    def test_check_reminders_no_match(self):
+        """Test checking reminders when none match current time"""
+        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
+        
+        triggered = self.agent.check_and_trigger_reminders("09:00")
+        self.assertEqual(len(triggered), 0)
+    
+    def test_check_reminders_with_match(self):
+        """Test checking reminders when time matches"""
+        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
+        
+        triggered = self.agent.check_and_trigger_reminders("10:00")
+        self.assertEqual(len(triggered), 1)
+        self.assertEqual(triggered[0]['medicine_name'], "Test Medicine")
+    
+    def test_check_multiple_reminders_same_time(self):
+        """Test checking when multiple reminders are at same time"""
+        self.agent.add_reminder("Medicine 1", "10:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "10:00", "Message 2")
+        
+        triggered = self.agent.check_and_trigger_reminders("10:00")
+        self.assertEqual(len(triggered), 2)
+    
+    def test_export_schedule(self):
+        """Test exporting schedule to JSON"""
+        self.agent.add_reminder("Test Medicine", "10:00", "Test message")
+        
+        self.agent.export_schedule("test_schedule.json")
+        
+        self.assertTrue(os.path.exists("test_schedule.json"))
+        
+        with open("test_schedule.json", 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['medicine_name'], "Test Medicine")
+    
+    def test_import_schedule(self):
+        """Test importing schedule from JSON"""
+        # Create a test schedule file
+        test_data = [
+            {
+                'id': 1,
+                'medicine_name': 'Test Medicine',
+                'time': '10:00',
+                'message': 'Test message',
+                'frequency': 'daily',
+                'active': True,
+                'created_at': '2025-11-15 10:00:00'
+            }
+        ]
+        
+        with open("test_schedule.json", 'w', encoding='utf-8') as f:
+            json.dump(test_data, f)
+        
+        self.agent.import_schedule("test_schedule.json")
+        
+        self.assertEqual(len(self.agent.reminders), 1)
+        self.assertEqual(self.agent.reminders[0]['medicine_name'], 'Test Medicine')
+    
+    def test_get_statistics(self):
+        """Test getting statistics"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "08:00", "Message 2")
+        self.agent.add_reminder("Medicine 3", "14:00", "Message 3")
+        self.agent.delete_reminder(3)
+        
+        stats = self.agent.get_statistics()
+        
+        self.assertEqual(stats['total_created'], 3)
+        self.assertEqual(stats['active'], 2)
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(stats['times']['08:00'], 2)
+    
+    def test_get_upcoming_reminders(self):
+        """Test getting upcoming reminders"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "14:00", "Message 2")
+        self.agent.add_reminder("Medicine 3", "20:00", "Message 3")
+        
+        upcoming = self.agent.get_upcoming_reminders()
+        
+        # Should return reminders sorted by time
+        self.assertGreaterEqual(len(upcoming), 0)
+    
+    def test_multilingual_message(self):
+        """Test adding reminder with multilingual message"""
+        hindi_message = "Are uncle, aapki dawai ka time ho gaya hai!"
+        
+        reminder = self.agent.add_reminder(
+            medicine_name="Test Medicine",
+            reminder_time="10:00",
+            custom_message=hindi_message
+        )
+        
+        self.assertEqual(reminder['message'], hindi_message)
+
+
+class TestReminderFrequency(unittest.TestCase):
+    """Test cases for reminder frequency features"""
+    
+    def setUp(self):
+        """Set up test fixture"""
+        self.agent = MedicineReminderAgent()
+    
+    def test_daily_frequency(self):
+        """Test daily frequency reminder"""
+        reminder = self.agent.add_reminder(
+            "Daily Medicine",
+            "10:00",
+            "Take daily",
+            frequency="daily"
+        )
+        
+        self.assertEqual(reminder['frequency'], "daily")
+    
+    def test_custom_frequency(self):
+        """Test custom frequency reminder"""
+        reminder = self.agent.add_reminder(
+            "Weekly Medicine",
+            "10:00",
+            "Take weekly",
+            frequency="weekly"
+        )
+        
+        self.assertEqual(reminder['frequency'], "weekly")
+
+
+class TestTriggerIndex(unittest.TestCase):
+    """Test cases for the minute-of-day trigger index"""
+    
+    def setUp(self):
+        """Set up test fixture"""
+        self.agent = MedicineReminderAgent()
+    
+    def test_deleted_reminder_not_triggered(self):
+        """Test that deleted reminders leave the index"""
+        self.agent.add_reminder("Medicine 1", "10:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "10:00", "Message 2")
+        self.agent.delete_reminder(1)
+        
+        triggered = self.agent.check_and_trigger_reminders("10:00")
+        self.assertEqual([r['id'] for r in triggered], [2])
+    
+    def test_edited_time_moves_bucket(self):
+        """Test that editing the time re-indexes the reminder"""
+        self.agent.add_reminder("Medicine 1", "10:00", "Message 1")
+        self.agent.edit_reminder(1, reminder_time="11:30")
+        
+        self.assertEqual(len(self.agent.check_and_trigger_reminders("10:00")), 0)
+        self.assertEqual(len(self.agent.check_and_trigger_reminders("11:30")), 1)
+    
+    def test_unpadded_time_matches(self):
+        """Test that H:MM and HH:MM refer to the same minute"""
+        self.agent.add_reminder("Medicine 1", "8:05", "Message 1")
+        
+        triggered = self.agent.check_and_trigger_reminders("08:05")
+        self.assertEqual(len(triggered), 1)
+    
+    def test_import_rebuilds_index(self):
+        """Test that importing a schedule rebuilds the index"""
+        test_data = [
+            {'id': 4, 'medicine_name': 'A', 'time': '07:15', 'message': 'a',
+             'frequency': 'daily', 'active': True, 'created_at': '2025-11-15 10:00:00'},
+            {'id': 5, 'medicine_name': 'B', 'time': '07:15', 'message': 'b',
+             'frequency': 'daily', 'active': False, 'created_at': '2025-11-15 10:00:00'},
+        ]
+        with open("test_schedule.json", 'w', encoding='utf-8') as f:
+            json.dump(test_data, f)
+        
+        self.agent.add_reminder("Old Medicine", "07:15", "Old")
+        self.agent.import_schedule("test_schedule.json")
+        os.remove("test_schedule.json")
+        
+        triggered = self.agent.check_and_trigger_reminders("07:15")
+        self.assertEqual([r['id'] for r in triggered], [4])
+
+
+class TestIdLookup(unittest.TestCase):
+    """Test cases for the id -> reminder map"""
+    
+    def setUp(self):
+        """Set up test fixture"""
+        self.agent = MedicineReminderAgent()
+    
+    def test_lookup_returns_list_entry(self):
+        """Test that lookups return the same object held in the list"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "09:00", "Message 2")
+        
+        self.assertIs(self.agent.get_reminder_by_id(2), self.agent.reminders[1])
+    
+    def test_deleted_reminder_not_found(self):
+        """Test that deleted reminders can't be fetched, edited or re-deleted"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.delete_reminder(1)
+        
+        self.assertIsNone(self.agent.get_reminder_by_id(1))
+        self.assertFalse(self.agent.edit_reminder(1, medicine_name="New"))
+        self.assertFalse(self.agent.delete_reminder(1))
+    
+    def test_import_rebuilds_map(self):
+        """Test that importing replaces the id map"""
+        test_data = [
+            {'id': 7, 'medicine_name': 'A', 'time': '07:15', 'message': 'a',
+             'frequency': 'daily', 'active': True, 'created_at': '2025-11-15 10:00:00'},
+        ]
+        with open("test_schedule.json", 'w', encoding='utf-8') as f:
+            json.dump(test_data, f)
+        
+        self.agent.add_reminder("Old Medicine", "08:00", "Old")
+        self.agent.import_schedule("test_schedule.json")
+        os.remove("test_schedule.json")
+        
+        self.assertIsNone(self.agent.get_reminder_by_id(1))
+        self.assertTrue(self.agent.edit_reminder(7, medicine_name="B"))
+        self.assertEqual(self.agent.reminders[0]['medicine_name'], "B")
+
+
+class TestTTSCache(unittest.TestCase):
+    """Test cases for the content-addressed TTS cache"""
+    
+    def setUp(self):
+        """Set up a cache in a temporary folder"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = TTSCache(os.path.join(self.tmpdir, 'cache'), max_bytes=25)
+    
+    def tearDown(self):
+        """Remove the temporary folder"""
+        shutil.rmtree(self.tmpdir)
+    
+    def _store(self, key, size):
+        """Put a file of the given size into the cache"""
+        scratch = self.cache.temp_path(key)
+        with open(scratch, 'wb') as f:
+            f.write(b'x' * size)
+        return self.cache.put(key, scratch)
+    
+    def test_key_depends_on_all_parts(self):
+        """Test that every synthesis parameter changes the key"""
+        base = TTSCache.make_key("Dawai lo", "hi", False, "gtts")
+        self.assertEqual(base, TTSCache.make_key("Dawai lo", "hi", False, "gtts"))
+        self.assertNotEqual(base, TTSCache.make_key("Dawai lo", "en", False, "gtts"))
+        self.assertNotEqual(base, TTSCache.make_key("Dawai lo", "hi", True, "gtts"))
+        self.assertNotEqual(base, TTSCache.make_key("Dawai lo", "hi", False, "pyttsx3"))
+    
+    def test_hit_and_miss(self):
+        """Test looking up stored and missing audio"""
+        path = self._store('a', 10)
+        self.assertEqual(self.cache.get('a'), path)
+        self.assertIsNone(self.cache.get('b'))
+    
+    def test_lru_eviction_by_size(self):
+        """Test that the least recently used entry is evicted over budget"""
+        self._store('a', 10)
+        self._store('b', 10)
+        self.cache.get('a')
+        self._store('c', 10)
+        
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertEqual(self.cache.total_bytes, 20)
+    
+    def test_reload_from_disk(self):
+        """Test that a new cache instance finds existing audio"""
+        self._store('a', 10)
+        reopened = TTSCache(self.cache.directory, max_bytes=25)
+        self.assertEqual(len(reopened), 1)
+        self.assertEqual(reopened.total_bytes, 10)
+    
+    def test_extension_survives_reload(self):
+        """Test that non-mp3 audio keeps its extension and scratch files are ignored"""
+        scratch = self.cache.temp_path('b', '.wav')
+        with open(scratch, 'wb') as f:
+            f.write(b'w' * 5)
+        path = self.cache.put('b', scratch, '.wav')
+        self.assertTrue(path.endswith('b.wav'))
+        
+        with open(self.cache.temp_path('c', '.wav'), 'wb') as f:
+            f.write(b'partial')
+        reopened = TTSCache(self.cache.directory, max_bytes=25)
+        self.assertEqual(len(reopened), 1)
+        self.assertEqual(reopened.get('b'), path)
+    
+    def test_generate_tts_synthesizes_once(self):
+        """Test that repeated messages are served from the cache"""
+        calls = []
+        
+        class FakeTTS:
+            def __init__(self, text, lang, slow):
+                calls.append(text)
+            
+            def save(self, filename):
+                with open(filename, 'wb') as f:
+                    f.write(b'mp3')
+        
+        agent = MedicineReminderAgent(tts_cache=self.cache)
+        with mock.patch.object(medicine_reminder_core, 'gTTS', FakeTTS), \
+                mock.patch.object(medicine_reminder_core, 'TTS_AVAILABLE', True):
+            first = agent.generate_tts("Dawai ka time")
+            second = agent.generate_tts("Dawai ka time")
+        
+        self.assertEqual(first, second)
+        self.assertEqual(calls, ["Dawai ka time"])
+        self.assertTrue(os.path.exists(first))
+
+
+class TestTTSPrerender(unittest.TestCase):
+    """Test cases for ahead-of-time audio rendering"""
+    
+    def setUp(self):
+        """Set up an agent whose TTS records what it renders"""
+        self.agent = MedicineReminderAgent()
+        self.agent.clock = lambda: datetime(2025, 11, 15, 22, 0)
+        self.rendered = []
+        
+        def fake_synthesize(message, filename):
+            self.rendered.append(message)
+            return f"{message}.mp3", False
+        
+        self.agent._synthesize = fake_synthesize
+    
+    def tearDown(self):
+        """Stop any running worker"""
+        self.agent.stop_prerender()
+    
+    def test_window_wraps_past_midnight(self):
+        """Test that only reminders inside the look-ahead window are rendered"""
+        self.agent.add_reminder("Medicine 1", "23:30", "Late")
+        self.agent.add_reminder("Medicine 2", "00:30", "After midnight")
+        self.agent.add_reminder("Medicine 3", "08:00", "Morning")
+        self.agent.add_reminder("Medicine 4", "21:00", "Already passed")
+        
+        ready = self.agent.prerender_upcoming(hours=3)
+        
+        self.assertEqual(ready, 2)
+        self.assertEqual(sorted(self.rendered), ["After midnight", "Late"])
+        self.assertEqual(self.agent.audio_files[2], "After midnight.mp3")
+    
+    def test_trigger_uses_rendered_audio(self):
+        """Test that triggering records the reminder's audio"""
+        self.agent.add_reminder("Medicine 1", "23:30", "Late")
+        self.agent.check_and_trigger_reminders("23:30")
+        self.assertEqual(self.agent.audio_files[1], "Late.mp3")
+    
+    def test_edit_message_rerenders(self):
+        """Test that the worker re-renders a reminder whose message changed"""
+        self.agent.add_reminder("Medicine 1", "23:30", "Old message")
+        worker = self.agent.start_prerender(hours=3, interval=60)
+        
+        self.agent.edit_reminder(1, custom_message="New message")
+        worker.stop(timeout=5)
+        
+        self.assertIn("New message", self.rendered)
+        self.assertEqual(self.agent.audio_files[1], "New message.mp3")
+
+
+class TestTTSBatch(unittest.TestCase):
+    """Test cases for parallel TTS synthesis"""
+    
+    def setUp(self):
+        """Set up an agent with a slow, partly failing TTS"""
+        self.agent = MedicineReminderAgent()
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        
+        def fake_synthesize(message, filename):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(0.05)
+            with self.lock:
+                self.active -= 1
+            if message == "bad":
+                raise RuntimeError("network down")
+            return f"{message}.mp3", False
+        
+        self.agent._synthesize = fake_synthesize
+    
+    def test_per_item_results(self):
+        """Test that each reminder reports success or failure in order"""
+        for i, message in enumerate(["one", "bad", "three"]):
+            self.agent.add_reminder(f"Medicine {i}", "08:00", message)
+        
+        results = self.agent.generate_tts_batch(self.agent.reminders)
+        
+        self.assertEqual([r['id'] for r in results], [1, 2, 3])
+        self.assertEqual([r['ok'] for r in results], [True, False, True])
+        self.assertEqual(results[1]['error'], "network down")
+        self.assertEqual(self.agent.audio_files, {1: "one.mp3", 3: "three.mp3"})
+    
+    def test_concurrency_limit(self):
+        """Test that no more than max_workers render at once"""
+        for i in range(8):
+            self.agent.add_reminder(f"Medicine {i}", "08:00", f"Message {i}")
+        
+        self.agent.generate_tts_batch(self.agent.reminders, max_workers=3)
+        self.assertEqual(self.peak, 3)
+    
+    def test_trigger_renders_slot_in_parallel(self):
+        """Test that a busy time slot is synthesized concurrently"""
+        for i in range(6):
+            self.agent.add_reminder(f"Medicine {i}", "08:00", f"Message {i}")
+        
+        triggered = self.agent.check_and_trigger_reminders("08:00")
+        
+        self.assertEqual(len(triggered), 6)
+        self.assertGreater(self.peak, 1)
+        self.assertEqual(len(self.agent.audio_files), 6)
+
+
+class FakeBackend(medicine_reminder_core.TTSBackend):
+    """TTS backend that records calls and can be told to fail"""
+    
+    def __init__(self, name, extension='.mp3', available=True, fail=False):
+        super().__init__()
+        self.name = name
+        self.extension = extension
+        self.available = available
+        self.fail = fail
+        self.calls = []
+    
+    def is_available(self):
+        return self.available
+    
+    def synthesize(self, text, path):
+        self.calls.append(text)
+        if self.fail:
+            raise ConnectionError("offline")
+        with open(path, 'wb') as f:
+            f.write(self.name.encode())
+
+
+class TestTTSBackends(unittest.TestCase):
+    """Test cases for pluggable TTS backends and fallback"""
+    
+    def setUp(self):
+        """Set up an agent with an online and an offline backend"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.online = FakeBackend('online', fail=True)
+        self.offline = FakeBackend('offline', extension='.wav')
+        self.metrics = medicine_reminder_core.MetricsRegistry()
+        self.agent = MedicineReminderAgent(tts_cache=TTSCache(os.path.join(self.tmpdir, 'cache')),
+                                           metrics=self.metrics, sinks=[],
+                                           tts_backends=[self.online, self.offline])
+    
+    def tearDown(self):
+        """Remove the temporary folder"""
+        shutil.rmtree(self.tmpdir)
+    
+    def test_falls_back_when_backend_fails(self):
+        """Test that a failing backend hands over to the next one"""
+        audio = self.agent.generate_tts("Dawai ka time")
+        
+        self.assertTrue(audio.endswith('.wav'))
+        self.assertEqual(self.online.calls, ["Dawai ka time"])
+        self.assertEqual(self.offline.calls, ["Dawai ka time"])
+        self.assertEqual(self.metrics.counter_value(
+            'reminder_tts_backend_errors_total', (('backend', 'online'),)), 1)
+        
+        # Served from the cache, whichever backend produced it
+        self.assertEqual(self.agent.generate_tts("Dawai ka time"), audio)
+        self.assertEqual(len(self.offline.calls), 1)
+    
+    def test_failed_backend_tried_last(self):
+        """Test that a backend that just failed does not delay the next request"""
+        self.agent.generate_tts("First")
+        self.agent.generate_tts("Second")
+        self.assertEqual(self.online.calls, ["First"])
+        
+        self.agent.tts_retry_seconds = 0
+        self.online.fail = False
+        self.agent.generate_tts("Third")
+        self.agent.generate_tts("Fourth")
+        self.assertEqual(self.online.calls, ["First", "Third", "Fourth"])
+        self.assertEqual(len(self.offline.calls), 2)
+    
+    def test_unavailable_backends_skipped(self):
+        """Test that engines that are not installed are never called"""
+        self.online.available = False
+        self.offline.available = False
+        
+        self.assertIsNone(self.agent.generate_tts("Dawai ka time"))
+        self.assertEqual(self.online.calls + self.offline.calls, [])
+        self.assertEqual(self.metrics.counter_value(
+            'reminder_tts_requests_total', (('result', 'unavailable'),)), 1)
+    
+    def test_all_backends_failing(self):
+        """Test that the error is reported once every backend failed"""
+        self.offline.fail = True
+        self.assertIsNone(self.agent.generate_tts("Dawai ka time"))
+        self.assertEqual(self.metrics.counter_value(
+            'reminder_tts_requests_total', (('result', 'error'),)), 1)
+    
+    def test_uncached_output_uses_backend_extension(self):
+        """Test that without a cache the file is named for the backend's format"""
+        self.agent.tts_cache = None
+        target = os.path.join(self.tmpdir, "reminder_1.mp3")
+        audio = self.agent.generate_tts("Dawai ka time", target)
+        self.assertEqual(audio, os.path.join(self.tmpdir, "reminder_1.wav"))
+        self.assertTrue(os.path.exists(audio))
+    
+    def test_backends_from_config(self):
+        """Test building the fallback chain by name"""
+        backends = medicine_reminder_core.tts_backends_from_config(" pyttsx3, gtts ")
+        self.assertEqual([b.name for b in backends], ['pyttsx3', 'gtts'])
+        self.assertEqual(backends[0].lang, 'hi')
+        
+        with mock.patch.dict(os.environ, {'MEDICINE_REMINDER_TTS': 'pyttsx3'}):
+            agent = MedicineReminderAgent(tts_cache=None, sinks=[])
+        self.assertEqual([b.name for b in agent.tts_backends], ['pyttsx3'])
+        
+        with self.assertRaises(ValueError):
+            medicine_reminder_core.tts_backends_from_config("espeak")
+    
+    def test_pyttsx3_engines_stay_warm(self):
+        """Test that the offline backend reuses a fixed pool of engines"""
+        engines = []
+        
+        class FakeEngine:
+            def __init__(self):
+                engines.append(self)
+                self.pending = []
+            
+            def getProperty(self, name):
+                return [] if name == 'voices' else 200
+            
+            def setProperty(self, name, value):
+                pass
+            
+            def save_to_file(self, text, path):
+                self.pending.append(path)
+            
+            def runAndWait(self):
+                for path in self.pending:
+                    with open(path, 'wb') as f:
+                        f.write(b'RIFF')
+                self.pending = []
+            
+            def stop(self):
+                pass
+        
+        fake_module = mock.Mock(Engine=FakeEngine)
+        backend = medicine_reminder_core.Pyttsx3Backend(pool_size=2)
+        with mock.patch.object(medicine_reminder_core, 'pyttsx3', fake_module), \
+                mock.patch.object(medicine_reminder_core, 'PYTTSX3_AVAILABLE', True):
+            self.agent.tts_backends = [backend]
+            for i in range(6):
+                self.agent.add_reminder(f"Medicine {i}", "08:00", f"Message {i}")
+            results = self.agent.generate_tts_batch(self.agent.reminders)
+            backend.close()
+        
+        self.assertTrue(all(r['ok'] for r in results))
+        self.assertTrue(all(r['audio'].endswith(backend.extension) for r in results))
+        self.assertEqual(len(engines), 2)
+
+
+class TestPlaybackQueue(unittest.TestCase):
+    """Test cases for non-blocking audio playback with repeats"""
+    
+    def setUp(self):
+        """Set up a queue whose player records what it plays"""
+        self.played = []
+        self.events = []
+        self.lock = threading.Lock()
+        
+        def player(path):
+            with self.lock:
+                self.played.append((path, time.monotonic()))
+            if path == "slow.mp3":
+                time.sleep(0.3)
+            if path == "broken.mp3":
+                raise RuntimeError("no audio device")
+        
+        def emit(kind, **data):
+            self.events.append((kind, data))
+        
+        self.queue = medicine_reminder_core.PlaybackQueue(player=player, emit=emit)
+    
+    def tearDown(self):
+        """Stop the timer thread"""
+        self.queue.stop(timeout=5)
+    
+    def test_repeats_on_timer(self):
+        """Test that play() returns at once and repeats at the interval"""
+        start = time.monotonic()
+        self.queue.play("a.mp3", repeat=3, interval=0.05, reminder_id=1)
+        self.assertLess(time.monotonic() - start, 0.05)
+        
+        self.assertTrue(self.queue.wait(timeout=5))
+        times = [t for _, t in self.played]
+        self.assertEqual(len(times), 3)
+        self.assertGreaterEqual(times[2] - times[0], 0.09)
+        started = [data for kind, data in self.events if kind == 'playback_started']
+        self.assertEqual([(d['id'], d['play'], d['plays']) for d in started],
+                         [(1, 1, 3), (1, 2, 3), (1, 3, 3)])
+    
+    def test_repeats_do_not_overlap(self):
+        """Test that a repeat waits for the previous play of the file to end"""
+        playing = []
+        peak = []
+        
+        def player(path):
+            with self.lock:
+                playing.append(path)
+                peak.append(len(playing))
+            time.sleep(0.05)
+            with self.lock:
+                playing.remove(path)
+        
+        self.queue.player = player
+        self.queue.play("a.mp3", repeat=3, interval=0)
+        self.assertTrue(self.queue.wait(timeout=5))
+        self.assertEqual(peak, [1, 1, 1])
+    
+    def test_overlapping_reminders_do_not_wait(self):
+        """Test that a long play does not delay another reminder"""
+        start = time.monotonic()
+        self.queue.play("slow.mp3")
+        self.queue.play("b.mp3")
+        self.assertTrue(self.queue.wait(timeout=5))
+        
+        fast = [t for path, t in self.played if path == "b.mp3"]
+        self.assertLess(fast[0] - start, 0.2)
+    
+    def test_cancel_drops_remaining_repeats(self):
+        """Test that cancel() stops further plays"""
+        handle = self.queue.play("a.mp3", repeat=3, interval=10)
+        time.sleep(0.05)
+        self.assertTrue(self.queue.cancel(handle))
+        self.assertTrue(self.queue.wait(timeout=5))
+        self.assertEqual(len(self.played), 1)
+        self.assertFalse(self.queue.cancel(handle))
+    
+    def test_player_errors_reported(self):
+        """Test that a failing player is reported and does not stop the queue"""
+        self.queue.play("broken.mp3", reminder_id=7)
+        self.queue.play("a.mp3")
+        self.assertTrue(self.queue.wait(timeout=5))
+        
+        errors = [data for kind, data in self.events if kind == 'playback_error']
+        self.assertEqual(errors, [{'id': 7, 'path': "broken.mp3", 'error': "no audio device"}])
+        self.assertEqual(len(self.played), 2)
+    
+    def test_agent_plays_each_reminders_audio(self):
+        """Test that triggered reminders play their own rendered audio"""
+        events = []
+        agent = MedicineReminderAgent(tts_cache=None, sinks=[medicine_reminder_core.CallbackSink(
+            events.extend)])
+        agent._synthesize = lambda message, filename: (filename, False)
+        agent.playback = self.queue
+        agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        agent.add_reminder("Medicine 2", "08:00", "Message 2")
+        
+        triggered = agent.check_and_trigger_reminders("08:00")
+        agent.audio_files.pop(2)
+        handles = agent.play_reminders(triggered, repeat_count=2, repeat_interval=0.01)
+        
+        self.assertEqual(len(handles), 1)
+        self.assertTrue(self.queue.wait(timeout=5))
+        self.assertEqual([path for path, _ in self.played], ["reminder_1.mp3"] * 2)
+        self.assertIn('playback_missing', [event.kind for event in events])
+    
+    def test_play_audio_missing_file(self):
+        """Test that the default player rejects files that do not exist"""
+        with self.assertRaises(FileNotFoundError):
+            medicine_reminder_core.play_audio("no_such_file.mp3")
+
+
+class TestAutoCorrect(unittest.TestCase):
+    """Test cases for the compiled message auto-corrector"""
+    
+    def test_multi_word_phrases(self):
+        """Test that phrases spanning words are matched, longest first"""
+        text, changes = medicine_reminder_core.auto_correct_message("Dwai ka tym ho  gya")
+        self.assertEqual(text, "Dawai ka time ho gaya")
+        self.assertEqual(changes, ["'Dwai' → 'Dawai'", "'tym' → 'time'",
+                                   "'ho  gya' → 'ho gaya'"])
+    
+    def test_punctuation_and_case(self):
+        """Test words next to punctuation and case preservation"""
+        text, _ = medicine_reminder_core.auto_correct_message("(DWAI), subha: bp-check!")
+        self.assertEqual(text, "(DAWAI), subah: BP-check!")
+    
+    def test_whole_words_only(self):
+        """Test that keys inside longer words are left alone"""
+        text, changes = medicine_reminder_core.auto_correct_message("dwaiyan aur tymepass")
+        self.assertEqual(text, "dwaiyan aur tymepass")
+        self.assertEqual(changes, [])
+    
+    def test_batch(self):
+        """Test correcting many messages at once"""
+        corrector = medicine_reminder_core.AutoCorrector({'tym': 'time', 'ho gya': 'ho gaya'})
+        self.assertEqual(corrector.correct_batch(["tym ho gya", "ok", "tym ho gya"]),
+                         ["time ho gaya", "ok", "time ho gaya"])
+    
+    def test_import_autocorrect(self):
+        """Test that imports can correct every message, streaming or not"""
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        path = os.path.join(test_dir, 'schedule.json')
+        records = [{'id': i, 'medicine_name': f"Medicine {i}", 'time': "08:00",
+                    'message': "Dwai ka tym" if i % 2 else "Dawai lo"} for i in range(1, 6)]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        
+        for stream in (False, True):
+            events = []
+            agent = MedicineReminderAgent(tts_cache=None, sinks=[
+                medicine_reminder_core.CallbackSink(events.extend)])
+            agent.import_schedule(path, stream=stream, autocorrect=True)
+            
+            self.assertEqual([r['message'] for r in agent.reminders],
+                             ["Dawai ka time", "Dawai lo"] * 2 + ["Dawai ka time"])
+            corrected = [e.data['count'] for e in events if e.kind == 'messages_corrected']
+            self.assertEqual(corrected, [3])
+        
+        # The file itself is not changed
+        with open(path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), records)
+
+
+class TestStreamingImport(unittest.TestCase):
+    """Test cases for record-by-record schedule import"""
+    
+    def setUp(self):
+        """Set up test fixture"""
+        self.agent = MedicineReminderAgent()
+        self.records = [
+            {'id': i, 'medicine_name': f'Medicine {i}', 'time': '08:00',
+             'message': f'Dawai {i} ka time', 'frequency': 'daily',
+             'active': i != 2, 'created_at': '2025-11-15 10:00:00'}
+            for i in range(1, 6)
+        ]
+    
+    def tearDown(self):
+        """Remove test files"""
+        for name in ('test_schedule.json', 'test_schedule.jsonl'):
+            if os.path.exists(name):
+                os.remove(name)
+    
+    def test_array_across_small_chunks(self):
+        """Test that records spanning chunk boundaries parse correctly"""
+        with open("test_schedule.json", 'w', encoding='utf-8') as f:
+            json.dump(self.records, f, indent=2)
+        
+        parsed = list(iter_schedule_records("test_schedule.json", chunk_size=7))
+        self.assertEqual(parsed, self.records)
+    
+    def test_stream_import_array(self):
+        """Test streaming import of the export format"""
+        with open("test_schedule.json", 'w', encoding='utf-8') as f:
+            json.dump(self.records, f)
+        
+        self.agent.import_schedule("test_schedule.json", stream=True)
+        
+        self.assertEqual(len(self.agent.reminders), 5)
+        self.assertEqual(self.agent.reminder_id_counter, 6)
+        self.assertIsNone(self.agent.get_reminder_by_id(2))
+        self.assertEqual(len(self.agent.check_and_trigger_reminders("08:00")), 4)
+    
+    def test_stream_import_json_lines(self):
+        """Test streaming import of JSON Lines, skipping bad records"""
+        with open("test_schedule.jsonl", 'w', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+            f.write(json.dumps({'id': 'x', 'medicine_name': 'Bad'}) + "\n")
+        
+        self.agent.import_schedule("test_schedule.jsonl", stream=True)
+        
+        self.assertEqual(len(self.agent.reminders), 5)
+        self.assertEqual(self.agent.get_reminder_by_id(5)['message'], 'Dawai 5 ka time')
+    
+    def test_empty_array(self):
+        """Test streaming an empty schedule"""
+        with open("test_schedule.json", 'w', encoding='utf-8') as f:
+            f.write("[ ]")
+        
+        self.agent.import_schedule("test_schedule.json", stream=True)
+        self.assertEqual(len(self.agent.reminders), 0)
+    
+    def test_failed_stream_keeps_schedule(self):
+        """Test that a missing or malformed file leaves the schedule untouched"""
+        self.agent.add_reminder("Medicine 1", "09:00", "Message 1")
+        
+        self.agent.import_schedule("missing_schedule.json", stream=True)
+        self.assertEqual(len(self.agent.reminders), 1)
+        
+        with open("test_schedule.jsonl", 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.records[0]) + "\n")
+            f.write('{"id": 2, "medicine_name": \n')
+        with self.assertRaises(ValueError):
+            self.agent.import_schedule("test_schedule.jsonl", stream=True)
+        
+        self.assertEqual([r['medicine_name'] for r in self.agent.view_reminders()], ["Medicine 1"])
+        self.assertEqual(self.agent.scheduled_minutes(), [9 * 60])
+
+
+class TestReminderRecord(unittest.TestCase):
+    """Test cases for the compact Reminder record"""
+    
+    def setUp(self):
+        """Set up a sample record"""
+        self.record = {
+            'id': 3,
+            'medicine_name': 'Amlodipine (BP)',
+            'time': '08:05',
+            'message': 'Dawai ka time',
+            'frequency': 'daily',
+            'active': True,
+            'created_at': '2025-11-15 10:00:00'
+        }
+    
+    def test_compact_storage(self):
+        """Test that time and created_at are stored as ints"""
+        reminder = Reminder.from_dict(self.record)
+        
+        self.assertEqual(reminder.minute, 8 * 60 + 5)
+        self.assertIsInstance(reminder.created_ts, int)
+        self.assertFalse(hasattr(reminder, '__dict__'))
+    
+    def test_dict_compatible(self):
+        """Test dict-style access and conversion"""
+        reminder = Reminder.from_dict(self.record)
+        
+        self.assertEqual(reminder['time'], '08:05')
+        self.assertEqual(reminder['created_at'], '2025-11-15 10:00:00')
+        self.assertEqual(reminder.to_dict(), self.record)
+        self.assertEqual(dict(reminder), self.record)
+        self.assertEqual(reminder, self.record)
+        self.assertEqual(reminder.get('missing', 'default'), 'default')
+    
+    def test_setting_time_updates_minute(self):
+        """Test that assigning 'time' re-parses it"""
+        reminder = Reminder.from_dict(self.record)
+        reminder['time'] = '21:30'
+        self.assertEqual(reminder.minute, 21 * 60 + 30)
+    
+    def test_unusual_values_round_trip(self):
+        """Test that unparseable values and extra keys are preserved"""
+        self.record['time'] = 'after lunch'
+        self.record['created_at'] = ''
+        self.record['notes'] = 'with water'
+        
+        reminder = Reminder.from_dict(self.record)
+        
+        self.assertEqual(reminder.minute, -1)
+        self.assertEqual(reminder.to_dict(), self.record)
+    
+    def test_export_import_round_trip(self):
+        """Test that exported records re-import unchanged"""
+        agent = MedicineReminderAgent()
+        agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        agent.export_schedule("test_schedule.json")
+        
+        other = MedicineReminderAgent()
+        other.import_schedule("test_schedule.json")
+        os.remove("test_schedule.json")
+        
+        self.assertIsInstance(other.reminders[0], Reminder)
+        self.assertEqual(other.reminders[0], agent.reminders[0])
+
+
+class TestTombstoneCompaction(unittest.TestCase):
+    """Test cases for moving deleted reminders out of the hot list"""
+    
+    def setUp(self):
+        """Set up an agent with low compaction thresholds"""
+        self.agent = MedicineReminderAgent()
+        self.agent.tombstone_min = 4
+        self.agent.tombstone_limit = 10
+        self.agent.tombstone_ratio = 0.5
+        for i in range(10):
+            self.agent.add_reminder(f"Medicine {i}", "08:00", f"Message {i}")
+    
+    def test_below_threshold_keeps_tombstones(self):
+        """Test that a few deletes do not compact"""
+        for reminder_id in (1, 2, 3):
+            self.agent.delete_reminder(reminder_id)
+        
+        self.assertEqual(len(self.agent.reminders), 10)
+        self.assertEqual(len(self.agent.archive), 0)
+    
+    def test_ratio_triggers_compaction(self):
+        """Test that compaction runs once deletes pass the share threshold"""
+        for reminder_id in range(1, 6):
+            self.agent.delete_reminder(reminder_id)
+        
+        self.assertEqual(len(self.agent.reminders), 5)
+        self.assertEqual(len(self.agent.archive), 5)
+        self.assertTrue(all(r['active'] for r in self.agent.reminders))
+    
+    def test_statistics_stay_correct(self):
+        """Test that archived reminders are still counted"""
+        for reminder_id in range(1, 7):
+            self.agent.delete_reminder(reminder_id)
+        
+        stats = self.agent.get_statistics()
+        self.assertEqual(stats['total_created'], 10)
+        self.assertEqual(stats['active'], 4)
+        self.assertEqual(stats['deleted'], 6)
+    
+    def test_export_includes_archive(self):
+        """Test that exports keep archived reminders unless asked not to"""
+        for reminder_id in range(1, 6):
+            self.agent.delete_reminder(reminder_id)
+        
+        self.agent.export_schedule("test_schedule.json")
+        with open("test_schedule.json", 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual([r['id'] for r in data], list(range(1, 11)))
+        
+        self.agent.export_schedule("test_schedule.json", include_deleted=False)
+        with open("test_schedule.json", 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        os.remove("test_schedule.json")
+        self.assertEqual([r['id'] for r in data], list(range(6, 11)))
+    
+    def test_import_compacts(self):
+        """Test that importing a tombstone-heavy schedule compacts it"""
+        for reminder_id in range(1, 4):
+            self.agent.delete_reminder(reminder_id)
+        self.agent.export_schedule("test_schedule.json")
+        
+        other = MedicineReminderAgent()
+        other.tombstone_min = 2
+        other.tombstone_ratio = 0.25
+        other.import_schedule("test_schedule.json")
+        os.remove("test_schedule.json")
+        
+        self.assertEqual(len(other.reminders), 7)
+        self.assertEqual(other.get_statistics()['deleted'], 3)
+        self.assertEqual(other.reminder_id_counter, 11)
+
+
+class TestMaterializedViews(unittest.TestCase):
+    """Test cases for incrementally maintained statistics and views"""
+    
+    def setUp(self):
+        """Set up test fixture"""
+        self.agent = MedicineReminderAgent()
+    
+    def test_stats_cached_until_change(self):
+        """Test that repeated polls reuse the stats until a mutation"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        first = self.agent.get_statistics()
+        cached = self.agent._stats_cache
+        self.assertEqual(self.agent.get_statistics(), first)
+        self.assertIs(self.agent._stats_cache, cached)
+        
+        self.agent.edit_reminder(1, medicine_name="Renamed")
+        second = self.agent.get_statistics()
+        self.assertIsNot(self.agent._stats_cache, cached)
+        self.assertEqual(second['medicines'], [{'name': "Renamed", 'time': "08:00"}])
+    
+    def test_stats_changes_do_not_leak(self):
+        """Test that modifying returned stats does not affect later calls"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        stats = self.agent.get_statistics()
+        stats['times']['08:00'] += 5
+        stats['medicines'].clear()
+        stats['active'] = 0
+        
+        again = self.agent.get_statistics()
+        self.assertEqual(again['times'], {'08:00': 1})
+        self.assertEqual(len(again['medicines']), 1)
+        self.assertEqual(again['active'], 1)
+    
+    def test_medicines_follow_edits(self):
+        """Test the medicines view across add, edit and delete"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "09:00", "Message 2")
+        self.agent.add_reminder("Medicine 3", "10:00", "Message 3")
+        first = self.agent.get_statistics()
+        
+        self.agent.edit_reminder(1, reminder_time="21:00")
+        self.agent.edit_reminder(3, medicine_name="Renamed")
+        self.agent.delete_reminder(2)
+        
+        self.assertEqual(self.agent.get_statistics()['medicines'], [
+            {'name': "Medicine 1", 'time': "21:00"},
+            {'name': "Renamed", 'time': "10:00"},
+        ])
+        self.assertEqual(first['medicines'][0], {'name': "Medicine 1", 'time': "08:00"})
+        self.assertEqual(len(first['medicines']), 3)
+    
+    def test_time_counts_follow_edits(self):
+        """Test per-time counts across add, edit and delete"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "08:00", "Message 2")
+        self.agent.edit_reminder(2, reminder_time="20:00")
+        self.agent.add_reminder("Medicine 3", "20:00", "Message 3")
+        self.agent.delete_reminder(1)
+        
+        stats = self.agent.get_statistics()
+        self.assertEqual(stats['times'], {'20:00': 2})
+        self.assertEqual(stats['active'], 2)
+        self.assertEqual(stats['deleted'], 1)
+    
+    def test_sorted_view(self):
+        """Test that the sorted list stays ordered by time then id"""
+        self.agent.add_reminder("Medicine 1", "21:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "06:00", "Message 2")
+        self.agent.add_reminder("Medicine 3", "06:00", "Message 3")
+        self.agent.edit_reminder(1, reminder_time="05:00")
+        self.agent.delete_reminder(2)
+        
+        ids = [r['id'] for r in self.agent.sorted_reminders()]
+        self.assertEqual(ids, [1, 3])
+    
+    def test_generation_changes_on_mutation(self):
+        """Test that every mutation bumps the generation counter"""
+        start = self.agent.generation
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        after_add = self.agent.generation
+        self.agent.edit_reminder(1, frequency="weekly")
+        after_edit = self.agent.generation
+        self.agent.delete_reminder(1)
+        
+        self.assertLess(start, after_add)
+        self.assertLess(after_add, after_edit)
+        self.assertLess(after_edit, self.agent.generation)
+    
+    def test_views_match_full_recompute(self):
+        """Test views against a from-scratch computation after many changes"""
+        times = ["06:00", "08:00", "08:30", "13:00", "21:00"]
+        for i in range(40):
+            self.agent.add_reminder(f"Medicine {i}", times[i % 5], f"Message {i}")
+        for i in range(1, 41, 3):
+            self.agent.edit_reminder(i, reminder_time=times[(i * 7) % 5])
+        for i in range(2, 41, 4):
+            self.agent.delete_reminder(i)
+        
+        active = [r for r in self.agent.reminders if r['active']]
+        expected_times = {}
+        for r in active:
+            expected_times[r['time']] = expected_times.get(r['time'], 0) + 1
+        
+        stats = self.agent.get_statistics()
+        self.assertEqual(stats['times'], expected_times)
+        self.assertEqual(stats['active'], len(active))
+        self.assertEqual(self.agent.sorted_reminders(),
+                         sorted(active, key=lambda r: (r['time'], r['id'])))
+        self.assertEqual(self.agent.view_reminders(), active)
+
+
+class TestUpcomingReminders(unittest.TestCase):
+    """Test cases for the sorted look-ahead window"""
+    
+    def setUp(self):
+        """Set up an agent with reminders spread over the day"""
+        self.agent = MedicineReminderAgent()
+        self.now = datetime(2025, 11, 15, 20, 0, 30)
+        self.agent.clock = lambda: self.now
+        for name, reminder_time in [("Morning", "08:00"), ("Night", "22:00"),
+                                    ("Late", "23:45"), ("Early", "01:30"),
+                                    ("Evening", "20:00")]:
+            self.agent.add_reminder(name, reminder_time, f"{name} dawai")
+    
+    def _names(self, reminders):
+        return [r['medicine_name'] for r in reminders]
+    
+    def test_window_limits_results(self):
+        """Test that hours bounds the window"""
+        upcoming = self.agent.get_upcoming_reminders(hours=3)
+        self.assertEqual(self._names(upcoming), ["Evening", "Night"])
+    
+    def test_window_wraps_past_midnight(self):
+        """Test that reminders after midnight are included in order"""
+        upcoming = self.agent.get_upcoming_reminders(hours=6)
+        self.assertEqual(self._names(upcoming), ["Evening", "Night", "Late", "Early"])
+    
+    def test_multi_day_horizon_repeats(self):
+        """Test that a 48 hour window yields each reminder twice"""
+        occurrences = list(self.agent.iter_upcoming(hours=48))
+        
+        self.assertEqual(len(occurrences), 10)
+        self.assertEqual(occurrences[0][0], datetime(2025, 11, 15, 20, 0))
+        self.assertEqual(occurrences[-1][0], datetime(2025, 11, 17, 8, 0))
+        fire_times = [fire for fire, _ in occurrences]
+        self.assertEqual(fire_times, sorted(fire_times))
+    
+    def test_generator_is_lazy(self):
+        """Test that the first occurrence is available without a full pass"""
+        fire, reminder = next(self.agent.iter_upcoming(hours=24 * 365))
+        self.assertEqual(reminder['medicine_name'], "Evening")
+    
+    def test_deleted_and_untimed_skipped(self):
+        """Test that deleted and unparseable-time reminders are not returned"""
+        self.agent.delete_reminder(2)
+        self.agent.add_reminder("Whenever", "after lunch", "Dawai")
+        
+        upcoming = self.agent.get_upcoming_reminders(hours=6)
+        self.assertEqual(self._names(upcoming), ["Evening", "Late", "Early"])
+
+
+class TestRecurrenceRules(unittest.TestCase):
+    """Test cases for frequency parsing and recurrence-aware triggering"""
+    
+    def setUp(self):
+        """Set up test fixture with a controllable clock"""
+        self.agent = MedicineReminderAgent()
+        self.now = datetime(2025, 11, 15, 9, 0)  # a Saturday
+        self.agent.clock = lambda: self.now
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test files"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _load(self, *entries):
+        """Import reminders created at 2025-11-15 07:00 from (time, frequency) pairs"""
+        records = [
+            {'id': i, 'medicine_name': f'Medicine {i}', 'time': time_text,
+             'message': f'Message {i}', 'frequency': frequency, 'active': True,
+             'created_at': '2025-11-15 07:00:00'}
+            for i, (time_text, frequency) in enumerate(entries, start=1)
+        ]
+        path = os.path.join(self.test_dir, 'schedule.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        self.agent.import_schedule(path)
+    
+    def _fired_ids(self, start, end):
+        """Ids of reminders per occurrence between start and end"""
+        return [(fire, r['id']) for batch in self.agent.expand_occurrences(start, end)
+                for fire, r in batch]
+    
+    def test_parse_frequency(self):
+        """Test the supported frequency spellings"""
+        parse = medicine_reminder_core.parse_frequency
+        self.assertEqual(parse("daily").kind, 'daily')
+        self.assertEqual(parse("something odd").kind, 'daily')
+        self.assertEqual(parse("once").kind, 'once')
+        self.assertEqual((parse("7_days").kind, parse("7_days").count), ('days', 7))
+        self.assertEqual((parse("every 8 hours").kind, parse("every_8_hours").count), ('hours', 8))
+        self.assertEqual(parse("weekdays").weekdays, frozenset(range(5)))
+        self.assertEqual(parse("Mon, Wed, Fri").weekdays, frozenset((0, 2, 4)))
+        self.assertIs(parse("weekly"), parse("weekly"))
+    
+    def test_once_fires_once_and_retires(self):
+        """Test that a one-off reminder fires on its day and then leaves the index"""
+        self._load(("08:00", "daily"), ("21:00", "once"))
+        
+        self.now = datetime(2025, 11, 15, 21, 0)
+        triggered = self.agent.trigger_due()
+        
+        self.assertEqual([r['id'] for r in triggered], [2])
+        self.assertIsNone(self.agent.get_reminder_by_id(2))
+        self.assertEqual(self.agent.scheduled_minutes(), [8 * 60])
+        self.assertEqual(self.agent.get_statistics()['active'], 1)
+    
+    def test_manual_check_does_not_retire(self):
+        """Test that a manual check of a one-off reminder keeps it scheduled"""
+        self._load(("21:00", "once"))
+        
+        self.now = datetime(2025, 11, 15, 20, 0)
+        self.assertEqual([r['id'] for r in self.agent.check_and_trigger_reminders("21:00")], [1])
+        self.assertIsNotNone(self.agent.get_reminder_by_id(1))
+        
+        self.now = datetime(2025, 11, 15, 21, 0)
+        self.assertEqual([r['id'] for r in self.agent.trigger_due()], [1])
+        self.assertIsNone(self.agent.get_reminder_by_id(1))
+    
+    def test_added_reminder_anchored_on_agent_clock(self):
+        """Test that a new reminder's course counts from the agent clock"""
+        self.agent.add_reminder("Antibiotic", "08:00", "Antibiotic", frequency="3_days")
+        
+        self.assertEqual(self.agent.get_reminder_by_id(1)['created_at'], "2025-11-15 09:00:00")
+        self.now = datetime(2025, 11, 16, 8, 0)
+        self.assertEqual([r['id'] for r in self.agent.trigger_due()], [1])
+    
+    def test_edit_reanchors_schedule(self):
+        """Test that changing the time counts the rule from the edit, not creation"""
+        self._load(("12:00", "once"))
+        
+        self.now = datetime(2025, 11, 15, 13, 0)
+        self.agent.edit_reminder(1, reminder_time="11:00")
+        self.assertEqual(self.agent.get_reminder_by_id(1)['scheduled_at'], "2025-11-15 13:00:00")
+        self.assertEqual(self.agent.trigger_due(), [])
+        self.assertIsNotNone(self.agent.get_reminder_by_id(1))
+        
+        self.now = datetime(2025, 11, 16, 11, 0)
+        self.assertEqual([r['id'] for r in self.agent.trigger_due()], [1])
+        self.assertIsNone(self.agent.get_reminder_by_id(1))
+    
+    def test_once_for_passed_time_fires_tomorrow(self):
+        """Test that a one-off reminder created after its time waits a day"""
+        self._load(("06:00", "once"))
+        
+        self.now = datetime(2025, 11, 15, 6, 0)
+        self.assertEqual(self.agent.check_and_trigger_reminders("06:00"), [])
+        self.now = datetime(2025, 11, 16, 6, 0)
+        self.assertEqual(len(self.agent.check_and_trigger_reminders("06:00")), 1)
+    
+    def test_course_of_days(self):
+        """Test that an N-day course fires N times"""
+        self._load(("08:00", "3_days"))
+        
+        occurrences = self._fired_ids(datetime(2025, 11, 15), datetime(2025, 11, 25))
+        self.assertEqual([fire.day for fire, _ in occurrences], [15, 16, 17])
+    
+    def test_weekly_and_weekdays(self):
+        """Test weekly and day-of-week rules over two weeks"""
+        self._load(("08:00", "weekly"), ("09:00", "weekdays"))
+        
+        occurrences = self._fired_ids(datetime(2025, 11, 15), datetime(2025, 11, 29))
+        weekly = [fire.day for fire, rid in occurrences if rid == 1]
+        weekdays = [fire.day for fire, rid in occurrences if rid == 2]
+        
+        self.assertEqual(weekly, [15, 22])
+        self.assertEqual(weekdays, [17, 18, 19, 20, 21, 24, 25, 26, 27, 28])
+    
+    def test_every_n_hours(self):
+        """Test that an hourly rule fires at every interval from its anchor"""
+        self._load(("08:00", "every_8_hours"))
+        
+        self.assertEqual(self.agent.scheduled_minutes(), [0, 8 * 60, 16 * 60])
+        occurrences = self._fired_ids(datetime(2025, 11, 15), datetime(2025, 11, 16, 12, 0))
+        self.assertEqual([fire for fire, _ in occurrences],
+                         [datetime(2025, 11, 15, 8, 0), datetime(2025, 11, 15, 16, 0),
+                          datetime(2025, 11, 16, 0, 0), datetime(2025, 11, 16, 8, 0)])
+    
+    def test_trigger_due_respects_rule(self):
+        """Test that the scheduler skips days a weekly reminder does not fire"""
+        self._load(("10:00", "weekly"))
+        
+        self.now = datetime(2025, 11, 16, 10, 0)
+        self.assertEqual(self.agent.trigger_due(), [])
+        self.now = datetime(2025, 11, 22, 10, 0)
+        self.assertEqual(len(self.agent.trigger_due()), 1)
+    
+    def test_retire_finished_missed_course(self):
+        """Test that courses which ended unobserved are retired"""
+        self._load(("08:00", "2_days"), ("08:00", "daily"))
+        
+        self.assertEqual(self.agent.retire_finished(datetime(2025, 11, 16, 8, 0)), 0)
+        self.assertEqual(self.agent.retire_finished(datetime(2025, 11, 16, 8, 1)), 1)
+        self.assertEqual([r['id'] for r in self.agent.sorted_reminders()], [2])
+    
+    def test_edit_frequency_reindexes(self):
+        """Test that changing the frequency moves the reminder's slots"""
+        self._load(("08:00", "every_12_hours"))
+        self.agent.edit_reminder(1, frequency="daily")
+        
+        self.assertEqual(self.agent.scheduled_minutes(), [8 * 60])
+        self.assertEqual(self.agent.retire_finished(datetime(2030, 1, 1)), 0)
+    
+    def test_expand_occurrences_batches(self):
+        """Test that expansion yields bounded batches"""
+        self._load(*[("08:00", "daily")] * 5)
+        
+        batches = list(self.agent.expand_occurrences(datetime(2025, 11, 15),
+                                                     datetime(2025, 11, 17), batch_size=4))
+        self.assertEqual([len(b) for b in batches], [4, 4, 2])
+
+
+class TestNextDueScheduler(unittest.TestCase):
+    """Test cases for the next-due scheduler"""
+    
+    def setUp(self):
+        """Set up test fixture with a controllable clock"""
+        self.agent = MedicineReminderAgent()
+        self.now = datetime(2025, 11, 15, 9, 0)
+        self.agent.clock = lambda: self.now
+    
+    def test_next_due_empty(self):
+        """Test next_due with no reminders"""
+        self.assertIsNone(self.agent.next_due())
+    
+    def test_next_due_wraps_to_tomorrow(self):
+        """Test that earlier slots are due the next day"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "21:00", "Message 2")
+        
+        self.assertEqual(self.agent.next_due(), datetime(2025, 11, 15, 21, 0))
+        self.agent.delete_reminder(2)
+        self.assertEqual(self.agent.next_due(), datetime(2025, 11, 16, 8, 0))
+    
+    def test_added_reminder_updates_heap(self):
+        """Test that reminders added after the heap exists are scheduled"""
+        self.agent.add_reminder("Medicine 1", "21:00", "Message 1")
+        self.agent.next_due()
+        self.agent.add_reminder("Medicine 2", "10:00", "Message 2")
+        
+        self.assertEqual(self.agent.next_due(), datetime(2025, 11, 15, 10, 0))
+    
+    def test_trigger_due_fires_once(self):
+        """Test that a due slot fires once and moves to the next day"""
+        self.agent.add_reminder("Medicine 1", "09:00", "Message 1")
+        
+        self.assertEqual(len(self.agent.trigger_due()), 1)
+        self.assertEqual(len(self.agent.trigger_due()), 0)
+        self.assertEqual(self.agent.next_due(), datetime(2025, 11, 16, 9, 0))
+    
+    def test_run_until_sleeps_to_each_reminder(self):
+        """Test that run_until wakes at each due time and stops at the deadline"""
+        self.agent.add_reminder("Medicine 1", "09:30", "Message 1")
+        self.agent.add_reminder("Medicine 2", "11:00", "Message 2")
+        
+        waits = []
+        
+        def fake_wait(timeout=None):
+            waits.append(timeout)
+            self.now += timedelta(seconds=timeout)
+            return False
+        
+        self.agent._wakeup.wait = fake_wait
+        triggered = self.agent.run_until(datetime(2025, 11, 15, 12, 0))
+        
+        self.assertEqual([r['id'] for r in triggered], [1, 2])
+        self.assertEqual(waits, [1800, 5400, 3600])
+
+
+class TestRangeTrigger(unittest.TestCase):
+    """Test cases for missed-tick-safe range triggering"""
+    
+    def setUp(self):
+        """Set up a silent agent with a controllable clock"""
+        self.agent = MedicineReminderAgent(tts_cache=None, sinks=[])
+        self.agent.generate_tts_batch = lambda reminders, max_workers=None: []
+        self.now = datetime(2025, 11, 15, 7, 59)
+        self.agent.clock = lambda: self.now
+    
+    def test_late_check_fires_skipped_minutes(self):
+        """Test that a loop waking late still fires every minute it skipped"""
+        for i, time_text in enumerate(["08:00", "08:01", "08:02", "08:03"]):
+            self.agent.add_reminder(f"Medicine {i}", time_text, f"Message {i}")
+        self.assertEqual(self.agent.trigger_due(), [])
+        
+        self.now = datetime(2025, 11, 15, 8, 2, 30)
+        self.assertEqual([r['id'] for r in self.agent.trigger_due()], [1, 2, 3])
+        self.assertEqual(self.agent.trigger_due(), [])
+        self.assertEqual(self.agent.next_due(), datetime(2025, 11, 15, 8, 3))
+    
+    def test_same_minute_fires_once(self):
+        """Test that repeated checks within a minute do not fire twice"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.now = datetime(2025, 11, 15, 8, 0, 5)
+        
+        self.assertEqual(len(self.agent.check_and_trigger_reminders()), 1)
+        self.now = datetime(2025, 11, 15, 8, 0, 35)
+        self.assertEqual(self.agent.check_and_trigger_reminders(), [])
+        self.assertEqual(self.agent.trigger_due(), [])
+    
+    def test_manual_check_does_not_suppress_next_occurrence(self):
+        """Test that an explicit HH:MM check leaves the real occurrence to fire"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.now = datetime(2025, 11, 15, 14, 0)
+        self.agent.trigger_due()
+        
+        # Maps to tomorrow 08:00, and fires again when repeated (simulate_day)
+        self.assertEqual(len(self.agent.check_and_trigger_reminders("08:00")), 1)
+        self.assertEqual(len(self.agent.check_and_trigger_reminders("08:00")), 1)
+        
+        self.now = datetime(2025, 11, 16, 8, 0)
+        self.assertEqual([r['id'] for r in self.agent.trigger_due()], [1])
+    
+    def test_resume_after_suspend(self):
+        """Test that occurrences during a suspend fire once each, in order"""
+        events = []
+        self.agent.sinks = [medicine_reminder_core.CallbackSink(events.extend)]
+        self.agent.add_reminder("Medicine 1", "23:00", "Night")
+        self.agent.add_reminder("Medicine 2", "07:00", "Morning")
+        self.now = datetime(2025, 11, 15, 22, 0)
+        self.agent.trigger_due()
+        
+        self.now = datetime(2025, 11, 16, 8, 0)
+        triggered = self.agent.trigger_due()
+        
+        self.assertEqual([r['id'] for r in triggered], [1, 2])
+        fires = [e.data['fire'] for e in events if e.kind == 'triggered']
+        self.assertEqual(fires, [datetime(2025, 11, 15, 23, 0), datetime(2025, 11, 16, 7, 0)])
+    
+    def test_catch_up_is_bounded(self):
+        """Test that a long suspend only catches up on the last max_catch_up"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.trigger_due()
+        
+        self.now = datetime(2025, 11, 18, 9, 0)
+        self.assertEqual(len(self.agent.trigger_due()), 1)
+        
+        self.agent.max_catch_up = None
+        self.agent.add_reminder("Medicine 2", "10:00", "Message 2")
+        self.now = datetime(2025, 11, 21, 11, 0)
+        self.assertEqual([r['id'] for r in self.agent.trigger_due()], [2, 1, 2, 1, 2, 1, 2])
+    
+    def test_trigger_range_applies_rules(self):
+        """Test explicit ranges with recurrence rules and exclusive start"""
+        self.agent.add_reminder("Medicine 1", "00:00", "Midnight", frequency="weekly")
+        self.agent.add_reminder("Medicine 2", "12:00", "Noon")
+        # Created after midnight, so the weekly reminder first fires on the 16th
+        self.agent.get_reminder_by_id(1)['created_at'] = '2025-11-15 07:00:00'
+        
+        start = datetime(2025, 11, 15, 0, 0)
+        triggered = self.agent.trigger_range(start, datetime(2025, 11, 22, 0, 0))
+        self.assertEqual([r['id'] for r in triggered], [2, 1] + [2] * 6)
+        
+        # Overlapping ranges only fire what is new
+        triggered = self.agent.trigger_range(start, datetime(2025, 11, 23, 0, 0))
+        self.assertEqual([r['id'] for r in triggered], [2, 1])
+    
+    def test_slot_list_follows_index(self):
+        """Test that the sorted slot list stays in step with edits and deletes"""
+        self.agent.add_reminder("Medicine 1", "20:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "08:00", "Message 2", frequency="every_12_hours")
+        self.agent.add_reminder("Medicine 3", "08:00", "Message 3")
+        self.agent.edit_reminder(1, reminder_time="06:30")
+        self.agent.delete_reminder(2)
+        
+        self.assertEqual(self.agent._slot_minutes, sorted(self.agent._time_index))
+        self.assertEqual(self.agent._slot_minutes, [6 * 60 + 30, 8 * 60])
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the metrics registry and agent instrumentation"""
+    
+    def setUp(self):
+        """Set up test fixture with a private registry"""
+        self.metrics = medicine_reminder_core.MetricsRegistry()
+        self.agent = MedicineReminderAgent(tts_cache=None, metrics=self.metrics,
+                                           tts_backends=[medicine_reminder_core.GTTSBackend()])
+    
+    def test_method_calls_counted_and_timed(self):
+        """Test that public methods record a count and a latency"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.add_reminder("Medicine 2", "09:00", "Message 2")
+        self.agent.get_statistics()
+        
+        labels = (('method', 'add_reminder'),)
+        self.assertEqual(self.metrics.counter_value('reminder_agent_calls_total', labels), 2)
+        histogram = self.metrics.histogram('reminder_agent_call_duration_seconds', labels)
+        self.assertEqual(histogram.count, 2)
+        self.assertEqual(self.metrics.counter_value(
+            'reminder_agent_calls_total', (('method', 'get_statistics'),)), 1)
+    
+    def test_errors_counted(self):
+        """Test that exceptions are counted and re-raised"""
+        with mock.patch.object(self.agent, '_deactivate', side_effect=RuntimeError("boom")):
+            self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+            with self.assertRaises(RuntimeError):
+                self.agent.delete_reminder(1)
+        
+        labels = (('method', 'delete_reminder'),)
+        self.assertEqual(self.metrics.counter_value('reminder_agent_errors_total', labels), 1)
+        self.assertEqual(self.metrics.counter_value('reminder_agent_calls_total', labels), 1)
+    
+    def test_disabled_records_nothing(self):
+        """Test that a disabled registry stays empty"""
+        self.metrics.enabled = False
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.assertEqual(self.metrics.counter_value(
+            'reminder_agent_calls_total', (('method', 'add_reminder'),)), 0)
+    
+    def test_trigger_lateness(self):
+        """Test that the scheduler records how late a slot fired"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        now = datetime(2025, 11, 15, 8, 0, 3)
+        self.agent.clock = lambda: now
+        self.agent.trigger_due()
+        
+        histogram = self.metrics.histogram('reminder_trigger_lateness_seconds')
+        self.assertEqual(histogram.count, 1)
+        self.assertAlmostEqual(histogram.sum, 3.0)
+    
+    def test_tts_results_counted(self):
+        """Test that TTS requests are counted by result"""
+        with mock.patch.object(medicine_reminder_core, 'TTS_AVAILABLE', False):
+            self.agent.generate_tts("Dawai ka time")
+        
+        self.assertEqual(self.metrics.counter_value(
+            'reminder_tts_requests_total', (('result', 'unavailable'),)), 1)
+        self.assertEqual(self.metrics.counter_value(
+            'reminder_agent_calls_total', (('method', 'generate_tts'),)), 1)
+    
+    def test_prometheus_text(self):
+        """Test the exposition format, file export and HTTP endpoint"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        text = self.metrics.render()
+        
+        self.assertIn("# TYPE reminder_agent_calls_total counter", text)
+        self.assertIn('reminder_agent_calls_total{method="add_reminder"} 1', text)
+        self.assertIn('reminder_agent_call_duration_seconds_bucket{method="add_reminder",le="+Inf"} 1',
+                      text)
+        self.assertIn('reminder_agent_call_duration_seconds_count{method="add_reminder"} 1', text)
+        
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, 'agent.prom')
+            self.metrics.write(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                self.assertIn('reminder_agent_calls_total', f.read())
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        server = self.metrics.serve(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertIn(b'reminder_agent_calls_total', response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    
+    def test_large_counters_rendered_exactly(self):
+        """Test that counters past a million are not rounded"""
+        self.metrics.inc('reminder_agent_calls_total', (('method', 'add_reminder'),), amount=1234567)
+        self.metrics.inc('reminder_agent_calls_total', (('method', 'edit_reminder'),), amount=0.25)
+        text = self.metrics.render()
+        
+        self.assertIn('reminder_agent_calls_total{method="add_reminder"} 1234567\n', text)
+        self.assertIn('reminder_agent_calls_total{method="edit_reminder"} 0.25\n', text)
+
+class TestEventSinks(unittest.TestCase):
+    """Test cases for agent events and sinks"""
+    
+    def setUp(self):
+        """Set up test fixture that collects events"""
+        self.events = []
+        sink = medicine_reminder_core.CallbackSink(self.events.extend)
+        self.agent = MedicineReminderAgent(tts_cache=None, sinks=[sink])
+    
+    def kinds(self):
+        """Kinds of the collected events, in order"""
+        return [event.kind for event in self.events]
+    
+    def test_mutation_events(self):
+        """Test that add, edit and delete are reported with their reminder"""
+        self.agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        self.agent.edit_reminder(1, reminder_time="09:00")
+        self.agent.delete_reminder(1)
+        self.agent.delete_reminder(1)
+        
+        self.assertEqual(self.kinds(), ['reminder_added', 'reminder_edited',
+                                        'reminder_deleted', 'reminder_not_found'])
+        self.assertEqual(self.events[0].data['reminder']['medicine_name'], "Medicine 1")
+        self.assertEqual(self.events[1].data['id'], 1)
+    
+    def test_triggered_events_batched(self):
+        """Test that a slot's triggers reach the sink in one batch"""
+        batches = []
+        self.agent.sinks = [medicine_reminder_core.CallbackSink(batches.append)]
+        for i in range(3):
+            self.agent.add_reminder(f"Medicine {i}", "08:00", f"Message {i}")
+        batches.clear()
+        
+        with mock.patch.object(self.agent, 'generate_tts_batch'):
+            self.agent.check_and_trigger_reminders("08:00")
+        
+        self.assertEqual(len(batches), 1)
+        self.assertEqual([e.kind for e in batches[0]], ['triggered'] * 3)
+        self.assertEqual(batches[0][0].data['time'], "08:00")
+    
+    def test_silent_agent(self):
+        """Test that an agent without sinks prints nothing"""
+        agent = MedicineReminderAgent(tts_cache=None, sinks=[])
+        with mock.patch('sys.stdout') as stdout:
+            agent.add_reminder("Medicine 1", "08:00", "Message 1")
+            agent.view_reminders()
+            agent.check_and_trigger_reminders("08:00")
+        stdout.write.assert_not_called()
+    
+    def test_console_sink_format(self):
+        """Test that the console sink keeps the familiar messages"""
+        stream = io.StringIO()
+        agent = MedicineReminderAgent(tts_cache=None,
+                                      sinks=[medicine_reminder_core.ConsoleSink(stream)])
+        agent.add_reminder("Amlodipine", "08:00", "BP ki dawai")
+        with mock.patch.object(agent, 'generate_tts_batch'):
+            agent.check_and_trigger_reminders("08:00")
+        
+        output = stream.getvalue()
+        self.assertIn("✅ Reminder added successfully! (ID: 1)", output)
+        self.assertIn("⏰ REMINDER TRIGGERED at 08:00", output)
+        self.assertIn("💊 Medicine: Amlodipine", output)
+    
+    def test_async_sink(self):
+        """Test that the async sink delivers everything and drops when full"""
+        inner = []
+        sink = medicine_reminder_core.AsyncSink(medicine_reminder_core.CallbackSink(inner.extend))
+        self.agent.sinks = [sink]
+        for i in range(50):
+            self.agent.add_reminder(f"Medicine {i}", "08:00", "Message")
+        sink.close()
+        
+        self.assertEqual(len(inner), 50)
+        self.assertEqual([e.data['id'] for e in inner], list(range(1, 51)))
+        
+        blocked = threading.Event()
+        slow = medicine_reminder_core.CallbackSink(lambda events: blocked.wait(5))
+        small = medicine_reminder_core.AsyncSink(slow, max_queue=2)
+        for i in range(10):
+            small.emit(medicine_reminder_core.ReminderEvent('reminder_added', {'id': i}))
+        self.assertGreater(small.dropped, 0)
+        blocked.set()
+        small.close()
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test cases for keeping heavy imports off module load"""
+    
+    def test_import_skips_heavy_modules(self):
+        """Test that importing the core module does not load TTS or asyncio"""
+        code = ("import sys, medicine_reminder_core; "
+                "print(','.join(m for m in ('gtts', 'pyttsx3', 'asyncio', 'concurrent.futures', 'hashlib') "
+                "if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        self.assertEqual(output.stdout.strip(), "")
+    
+    def test_gtts_loaded_on_first_use(self):
+        """Test that the TTS backend is imported once, when first needed"""
+        with mock.patch.object(medicine_reminder_core, 'TTS_AVAILABLE', None), \
+                mock.patch.object(medicine_reminder_core, 'gTTS', None), \
+                mock.patch.dict(sys.modules, {'gtts': None}):
+            self.assertFalse(medicine_reminder_core.tts_available())
+            self.assertIs(medicine_reminder_core.TTS_AVAILABLE, False)
+            
+            agent = MedicineReminderAgent(tts_cache=None, sinks=[],
+                                          tts_backends=[medicine_reminder_core.GTTSBackend()])
+            self.assertIsNone(agent.generate_tts("Dawai ka time"))
+
+
+if __name__ == '__main__':
+    print("🧪 Running Medicine Reminder Agent Tests\n")
+    print("=" * 60)
+    
+    # Run tests
+    unittest.main(verbosity=2)
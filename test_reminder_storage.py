@@ -0,0 +1,239 @@
+"""
+Test suite for the reminder storage backends
+"""
+
+import unittest
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from medicine_reminder_core import MedicineReminderAgent
+from reminder_storage import JournalStore, JSONFileStore, SQLiteStore
+
+
+class TestSQLiteStore(unittest.TestCase):
+    """Test cases for the SQLite/WAL storage backend"""
+    
+    def setUp(self):
+        """Set up a database in a temporary folder"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = os.path.join(self.tmpdir, 'schedule.db')
+        self.store = SQLiteStore(self.db)
+    
+    def tearDown(self):
+        """Close the database and remove the temporary folder"""
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+    
+    def test_schedule_start_persists(self):
+        """Test that the schedule start set by an edit survives a reload"""
+        agent = MedicineReminderAgent(store=self.store)
+        agent.add_reminder("Medicine 1", "08:00", "Message 1", frequency="3_days")
+        agent.add_reminder("Medicine 2", "09:00", "Message 2")
+        agent.edit_reminder(1, frequency="5_days")
+        scheduled_at = agent.get_reminder_by_id(1)['scheduled_at']
+        self.store.close()
+        
+        self.store = SQLiteStore(self.db)
+        reloaded = MedicineReminderAgent(store=self.store)
+        self.assertEqual(reloaded.get_reminder_by_id(1)['scheduled_at'], scheduled_at)
+        self.assertNotIn('scheduled_at', reloaded.get_reminder_by_id(2))
+    
+    def test_adds_missing_columns(self):
+        """Test that a database from before scheduled_at is upgraded"""
+        self.store.close()
+        os.remove(self.db)
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE reminders (id INTEGER PRIMARY KEY, medicine_name TEXT NOT NULL,"
+                     " time TEXT NOT NULL, message TEXT NOT NULL, frequency TEXT NOT NULL,"
+                     " active INTEGER NOT NULL, created_at TEXT NOT NULL)")
+        conn.execute("INSERT INTO reminders VALUES (1, 'Medicine 1', '08:00', 'Message 1',"
+                     " 'daily', 1, '2025-11-15 07:00:00')")
+        conn.commit()
+        conn.close()
+        
+        self.store = SQLiteStore(self.db)
+        agent = MedicineReminderAgent(store=self.store)
+        agent.edit_reminder(1, reminder_time="08:30")
+        self.assertEqual(self.store.load()[0]['time'], "08:30")
+    
+    def test_wal_mode(self):
+        """Test that the database uses write-ahead logging"""
+        mode = self.store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+    
+    def test_indexes_exist(self):
+        """Test that time and active status are indexed"""
+        names = {row[0] for row in self.store._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn('idx_reminders_time', names)
+        self.assertIn('idx_reminders_active', names)
+    
+    def test_agent_changes_persist(self):
+        """Test that add, edit and delete are written through"""
+        agent = MedicineReminderAgent(store=self.store)
+        agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        agent.add_reminder("Medicine 2", "09:00", "Message 2")
+        agent.edit_reminder(1, reminder_time="08:15")
+        agent.delete_reminder(2)
+        self.store.close()
+        
+        self.store = SQLiteStore(self.db)
+        reloaded = MedicineReminderAgent(store=self.store)
+        
+        self.assertEqual(len(reloaded.reminders), 2)
+        self.assertEqual(reloaded.get_reminder_by_id(1)['time'], "08:15")
+        self.assertIsNone(reloaded.get_reminder_by_id(2))
+        self.assertEqual(reloaded.reminder_id_counter, 3)
+        self.assertEqual(len(reloaded.check_and_trigger_reminders("08:15")), 1)
+    
+    def test_import_replaces_rows(self):
+        """Test that importing a schedule replaces the stored rows"""
+        source = MedicineReminderAgent()
+        source.add_reminder("Imported", "07:00", "Message")
+        path = os.path.join(self.tmpdir, 'schedule.json')
+        source.export_schedule(path)
+        
+        agent = MedicineReminderAgent(store=self.store)
+        agent.add_reminder("Old", "06:00", "Old message")
+        agent.import_schedule(path)
+        
+        rows = self.store.load()
+        self.assertEqual([r['medicine_name'] for r in rows], ["Imported"])
+
+
+class TestJournalStore(unittest.TestCase):
+    """Test cases for the append-only journal backend"""
+    
+    def setUp(self):
+        """Set up journal files in a temporary folder"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.base = os.path.join(self.tmpdir, 'schedule')
+    
+    def tearDown(self):
+        """Remove the temporary folder"""
+        shutil.rmtree(self.tmpdir)
+    
+    def _reload(self, **kwargs):
+        """Open a fresh agent on the same journal files"""
+        return MedicineReminderAgent(store=JournalStore(self.base, **kwargs))
+    
+    def test_mutations_are_appended(self):
+        """Test that each change adds one journal line"""
+        store = JournalStore(self.base)
+        agent = MedicineReminderAgent(store=store)
+        agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        agent.edit_reminder(1, custom_message="Updated")
+        agent.delete_reminder(1)
+        store.close()
+        
+        with open(self.base + ".journal", encoding='utf-8') as f:
+            ops = [json.loads(line)['op'] for line in f]
+        self.assertEqual(ops, ['add', 'edit', 'delete'])
+    
+    def test_replay_without_export(self):
+        """Test that state is rebuilt from the journal alone"""
+        store = JournalStore(self.base)
+        agent = MedicineReminderAgent(store=store)
+        agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        agent.add_reminder("Medicine 2", "09:00", "Message 2")
+        agent.edit_reminder(2, reminder_time="09:30")
+        agent.delete_reminder(1)
+        store.close()
+        
+        reloaded = self._reload()
+        self.assertIsNone(reloaded.get_reminder_by_id(1))
+        self.assertEqual(reloaded.get_reminder_by_id(2)['time'], "09:30")
+        self.assertEqual(reloaded.reminder_id_counter, 3)
+    
+    def test_torn_last_line_is_ignored(self):
+        """Test that a partial final write does not break loading"""
+        store = JournalStore(self.base)
+        agent = MedicineReminderAgent(store=store)
+        agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        store.close()
+        with open(self.base + ".journal", 'a', encoding='utf-8') as f:
+            f.write('{"op": "add", "remin')
+        
+        reloaded = self._reload()
+        self.assertEqual(len(reloaded.reminders), 1)
+    
+    def test_appends_after_torn_line_survive(self):
+        """Test that writes after a crash are not glued onto the torn line"""
+        store = JournalStore(self.base)
+        agent = MedicineReminderAgent(store=store)
+        agent.add_reminder("Medicine 1", "08:00", "Message 1")
+        agent.add_reminder("Medicine 2", "09:00", "Message 2")
+        store.close()
+        with open(self.base + ".journal", 'a', encoding='utf-8') as f:
+            f.write('{"op": "add", "remin')
+        
+        store = JournalStore(self.base)
+        agent = MedicineReminderAgent(store=store)
+        agent.add_reminder("Medicine 3", "10:00", "Message 3")
+        agent.add_reminder("Medicine 4", "11:00", "Message 4")
+        store.close()
+        
+        reloaded = self._reload()
+        self.assertEqual([r['id'] for r in reloaded.reminders], [1, 2, 3, 4])
+    
+    def test_compaction(self):
+        """Test that a large journal is folded into a snapshot"""
+        store = JournalStore(self.base, compact_bytes=2000)
+        agent = MedicineReminderAgent(store=store)
+        for i in range(30):
+            agent.add_reminder(f"Medicine {i}", "08:00", f"Message {i}")
+        agent.delete_reminder(5)
+        store.close()
+        
+        self.assertTrue(os.path.exists(self.base + ".snapshot.json"))
+        self.assertLess(os.path.getsize(self.base + ".journal"), 2000)
+        
+        reloaded = self._reload(compact_bytes=2000)
+        self.assertEqual(len(reloaded.reminders), 30)
+        self.assertIsNone(reloaded.get_reminder_by_id(5))
+        self.assertEqual(reloaded.get_reminder_by_id(30)['medicine_name'], "Medicine 29")
+
+
+class TestJSONFileStore(unittest.TestCase):
+    """Test cases for the whole-file JSON backend"""
+    
+    def test_round_trip(self):
+        """Test that changes are saved to the JSON file"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'schedule.json')
+            agent = MedicineReminderAgent(store=JSONFileStore(path))
+            agent.add_reminder("Medicine 1", "08:00", "Message 1")
+            agent.edit_reminder(1, custom_message="Updated")
+            
+            reloaded = MedicineReminderAgent(store=JSONFileStore(path))
+            self.assertEqual(reloaded.get_reminder_by_id(1)['message'], "Updated")
+        finally:
+            shutil.rmtree(tmpdir)
+    
+    def test_changes_after_reload_saved(self):
+        """Test that edits and deletes of reloaded reminders are saved"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'schedule.json')
+            agent = MedicineReminderAgent(store=JSONFileStore(path))
+            agent.add_reminder("Medicine 1", "08:00", "Message 1")
+            agent.add_reminder("Medicine 2", "09:00", "Message 2")
+            
+            reloaded = MedicineReminderAgent(store=JSONFileStore(path))
+            reloaded.edit_reminder(1, medicine_name="EDITED")
+            reloaded.delete_reminder(2)
+            reloaded.add_reminder("Medicine 3", "10:00", "Message 3")
+            
+            final = MedicineReminderAgent(store=JSONFileStore(path))
+            self.assertEqual(final.get_reminder_by_id(1)['medicine_name'], "EDITED")
+            self.assertIsNone(final.get_reminder_by_id(2))
+            self.assertEqual([r['id'] for r in final.view_reminders()], [1, 3])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)